@@ -0,0 +1,93 @@
+"""
+Microbenchmark for the cost of constructing :py:class:`stl.Facet` objects.
+
+Reports the time taken per facet and the memory retained per facet for the
+different ways of building one, e.g.::
+
+    python benchmarks/facet_construction.py --count 100000
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+
+from stl.types import Facet, Vector3d
+
+
+def _raw_facet(i):
+    f = float(i)
+    return (
+        (0.0, 0.0, 1.0),
+        ((f, 0.0, 0.0), (f + 1.0, 0.0, 0.0), (f, 1.0, 0.0)),
+    )
+
+
+def _vector_facet(i):
+    normal, vertices = _raw_facet(i)
+    return Vector3d(*normal), tuple(Vector3d(*v) for v in vertices)
+
+
+def _build(inputs):
+    return [Facet(normal, vertices) for normal, vertices in inputs]
+
+
+def _build_fast(inputs):
+    return [Facet.from_vectors(n, vertices) for n, vertices in inputs]
+
+
+CASES = [
+    ('Facet(tuples)', _raw_facet, _build),
+    ('Facet(Vector3d)', _vector_facet, _build),
+    ('Facet.from_vectors', _vector_facet, _build_fast),
+]
+
+
+def _bytes_per_facet(make_input, build, count):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        facets = build([make_input(i) for i in range(count)])
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del facets
+    return (after - before) / float(count)
+
+
+def run(count, repeat):
+    results = []
+    for name, make_input, build in CASES:
+        inputs = [make_input(i) for i in range(count)]
+        seconds = min(timeit.repeat(
+            lambda: build(inputs), number=1, repeat=repeat,
+        ))
+        results.append({
+            'case': name,
+            'count': count,
+            'ns_per_facet': seconds * 1e9 / count,
+            'bytes_per_facet': _bytes_per_facet(make_input, build, count),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0],
+    )
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print('%-20s %14s %16s' % ('case', 'ns/facet', 'bytes/facet'))
+    for result in run(args.count, args.repeat):
+        print('%-20s %14.1f %16.1f' % (
+            result['case'],
+            result['ns_per_facet'],
+            result['bytes_per_facet'],
+        ))
+
+
+if __name__ == '__main__':
+    main()
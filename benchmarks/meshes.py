@@ -0,0 +1,98 @@
+"""
+Synthetic meshes for the benchmarks.
+
+The meshes are height fields over a square grid with seeded random heights,
+so that they are reproducible, have realistic shared edges and contain
+almost no coplanar neighbours.
+"""
+
+import os
+import struct
+
+import numpy
+
+
+def make_triangles(count, seed=0):
+    """
+    Return ``(normals, vertices)`` float32 arrays of shape ``(count, 3)``
+    and ``(count, 3, 3)`` describing ``count`` triangles.
+    """
+    side = int(numpy.ceil(numpy.sqrt(count / 2.0))) + 1
+    rng = numpy.random.RandomState(seed)
+    heights = rng.uniform(0.0, 1.0, size=(side, side))
+    xs, ys = numpy.meshgrid(
+        numpy.arange(side, dtype=numpy.float64),
+        numpy.arange(side, dtype=numpy.float64),
+        indexing='ij',
+    )
+    grid = numpy.stack([xs, ys, heights], axis=-1)
+
+    p00 = grid[:-1, :-1].reshape(-1, 3)
+    p10 = grid[1:, :-1].reshape(-1, 3)
+    p01 = grid[:-1, 1:].reshape(-1, 3)
+    p11 = grid[1:, 1:].reshape(-1, 3)
+    lower = numpy.stack([p00, p10, p11], axis=1)
+    upper = numpy.stack([p00, p11, p01], axis=1)
+    vertices = numpy.concatenate([lower, upper])[:count]
+
+    normals = numpy.cross(
+        vertices[:, 1] - vertices[:, 0],
+        vertices[:, 2] - vertices[:, 1],
+    )
+    normals /= numpy.linalg.norm(normals, axis=1)[:, numpy.newaxis]
+    return normals.astype(numpy.float32), vertices.astype(numpy.float32)
+
+
+def write_binary_mesh(path, count, seed=0):
+    normals, vertices = make_triangles(count, seed)
+    records = numpy.zeros(count, dtype=[
+        ('normal', '<f4', (3,)),
+        ('vertices', '<f4', (3, 3)),
+        ('attributes', '<u2'),
+    ])
+    records['normal'] = normals
+    records['vertices'] = vertices
+    with open(path, 'wb') as f:
+        f.write(b'solid synthetic'.ljust(80, b'\0'))
+        f.write(struct.pack('<I', count))
+        f.write(records.tobytes())
+
+
+def write_ascii_mesh(path, count, seed=0, chunk_size=100000):
+    normals, vertices = make_triangles(count, seed)
+    facet_format = (
+        '  facet normal %r %r %r\n'
+        '    outer loop\n'
+        '      vertex %r %r %r\n'
+        '      vertex %r %r %r\n'
+        '      vertex %r %r %r\n'
+        '    endloop\n'
+        '  endfacet\n'
+    )
+    with open(path, 'w') as f:
+        f.write('solid synthetic\n')
+        for start in range(0, count, chunk_size):
+            rows = numpy.concatenate([
+                normals[start:start + chunk_size],
+                vertices[start:start + chunk_size].reshape(-1, 9),
+            ], axis=1).astype(numpy.float64).tolist()
+            f.write(''.join(facet_format % tuple(row) for row in rows))
+        f.write('endsolid synthetic\n')
+
+
+def mesh_path(workdir, count, format, seed=0):
+    """
+    Return the path of the synthetic mesh with the given parameters in
+    ``workdir``, generating it first if it doesn't exist yet.
+    """
+    path = os.path.join(
+        workdir, 'synthetic-%d-%d.%s.stl' % (count, seed, format),
+    )
+    if not os.path.exists(path):
+        partial = path + '.partial'
+        if format == 'ascii':
+            write_ascii_mesh(partial, count, seed)
+        else:
+            write_binary_mesh(partial, count, seed)
+        os.rename(partial, path)
+    return path
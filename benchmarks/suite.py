@@ -0,0 +1,292 @@
+"""
+Benchmark suite for parsing, writing and geometry operations on synthetic
+meshes, reporting the results as JSON.
+
+Each case runs in its own subprocess so that its memory use isn't polluted
+by the cases before it. For example::
+
+    python benchmarks/suite.py --sizes 1000,100000 --output results.json
+
+Sizes up to 10M facets are supported, given enough time, memory and disk
+space in ``--workdir`` for the generated meshes. The ``stl`` package must be
+importable, e.g. after ``pip install -e .``.
+
+``peak_rss_bytes`` is the peak resident set size while the case itself runs,
+leaving out the parse that sets up the cases needing a solid, and
+``start_rss_bytes`` is the size when it starts, solid included. Both need
+Linux, where the peak can be reset, and are ``null`` elsewhere.
+``process_peak_rss_bytes`` is the peak of the whole subprocess, setup
+included, so it is only comparable between cases with the same setup.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import stl
+import stl.ascii
+import stl.binary
+from meshes import mesh_path
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def _parse_binary(path):
+    with open(path, 'rb') as f:
+        return stl.binary.parse(f)
+
+
+def _parse_ascii(path):
+    with open(path, 'r') as f:
+        return stl.ascii.parse(f)
+
+
+class _CountingSink(object):
+    """
+    Write target that discards the data, only counting its size.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data)
+
+
+def _write_binary(solid):
+    sink = _CountingSink()
+    stl.binary.write(solid, sink)
+    return sink.count
+
+
+def _write_ascii(solid):
+    sink = _CountingSink()
+    stl.ascii.write(solid, sink)
+    return sink.count
+
+
+def _surface_area(solid):
+    return solid.surface_area
+
+
+def _sort_facets(solid):
+    solid.sort_facets()
+
+
+def _remove_planar_edges(solid):
+    return solid.remove_planar_edges()
+
+
+#: Each case maps to ``(format, needs a parsed solid, function)``.
+#: Functions that don't need a solid are given the path of the mesh in the
+#: given format. Writers return the number of bytes they wrote.
+CASES = {
+    'parse_binary': ('binary', False, _parse_binary),
+    'parse_ascii': ('ascii', False, _parse_ascii),
+    'write_binary': ('binary', True, _write_binary),
+    'write_ascii': ('ascii', True, _write_ascii),
+    'surface_area': ('binary', True, _surface_area),
+    'sort_facets': ('binary', True, _sort_facets),
+    'remove_planar_edges': ('binary', True, _remove_planar_edges),
+}
+
+#: Cases whose cost grows too quickly to run at the larger sizes by default.
+QUADRATIC_CASES = set(['remove_planar_edges'])
+
+
+def _process_peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _reset_peak_rss():
+    """
+    Reset the peak RSS reported as ``VmHWM`` by :py:func:`_status_bytes` to
+    the current RSS, returning whether that is supported.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def _status_bytes(field):
+    """
+    Return a memory size from Linux's ``/proc/self/status``, such as
+    ``VmRSS`` or ``VmHWM``, the peak RSS since it was last reset.
+    """
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def run_case(case, size, workdir, repeat, allocations):
+    """
+    Run a single case in this process and return its result dictionary.
+    """
+    format, needs_solid, function = CASES[case]
+    path = mesh_path(workdir, size, format)
+    source_path = mesh_path(workdir, size, 'binary')
+
+    def setup():
+        return _parse_binary(source_path) if needs_solid else path
+
+    timings = []
+    starts = []
+    peaks = []
+    for i in range(repeat):
+        argument = setup()
+        gc.collect()
+        reset = _reset_peak_rss()
+        if reset:
+            starts.append(_status_bytes('VmRSS'))
+        start = time.perf_counter()
+        written = function(argument)
+        timings.append(time.perf_counter() - start)
+        if reset:
+            peaks.append(_status_bytes('VmHWM'))
+        del argument
+
+    best = min(timings)
+    if case.startswith('write_'):
+        file_bytes = written
+    else:
+        file_bytes = os.path.getsize(path)
+    result = {
+        'case': case,
+        'format': format,
+        'facets': size,
+        'file_bytes': file_bytes,
+        'seconds': best,
+        'seconds_all': timings,
+        'facets_per_second': size / best if best else None,
+        'bytes_per_second': file_bytes / best if best else None,
+        'start_rss_bytes': max(starts) if starts else None,
+        'peak_rss_bytes': max(peaks) if peaks else None,
+        'process_peak_rss_bytes': _process_peak_rss_bytes(),
+    }
+
+    if allocations:
+        argument = setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function(argument)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result['alloc_peak_bytes'] = peak
+        result['alloc_retained_bytes'] = current
+
+    return result
+
+
+def _run_case_subprocess(case, size, args):
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        '--run-case', case,
+        '--sizes', str(size),
+        '--workdir', args.workdir,
+        '--repeat', str(args.repeat),
+    ]
+    if args.allocations:
+        command.append('--allocations')
+    output = subprocess.check_output(command)
+    return json.loads(output.decode())
+
+
+def _metadata():
+    import numpy
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'numpy': numpy.__version__,
+        'stl_path': os.path.dirname(os.path.abspath(stl.__file__)),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n\n')[0],
+    )
+    parser.add_argument(
+        '--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+        help='comma-separated facet counts (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--cases', default=','.join(sorted(CASES)),
+        help='comma-separated cases to run (default: all)',
+    )
+    parser.add_argument(
+        '--workdir', default=os.path.join(tempfile.gettempdir(), 'stl-bench'),
+        help='directory holding the generated meshes (default: %(default)s)',
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--max-quadratic-facets', type=int, default=1000,
+        help='largest size to run the quadratic cases at '
+             '(default: %(default)s)',
+    )
+    parser.add_argument(
+        '--allocations', action='store_true',
+        help='also measure allocations with tracemalloc in a separate run',
+    )
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    if not os.path.isdir(args.workdir):
+        os.makedirs(args.workdir)
+
+    if args.run_case:
+        result = run_case(
+            args.run_case, sizes[0], args.workdir, args.repeat,
+            args.allocations,
+        )
+        print(json.dumps(result))
+        return
+
+    cases = args.cases.split(',')
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error('unknown cases: %s' % ', '.join(unknown))
+
+    results = []
+    for size in sizes:
+        for case in cases:
+            if case in QUADRATIC_CASES and size > args.max_quadratic_facets:
+                continue
+            sys.stderr.write('%s @ %d facets\n' % (case, size))
+            results.append(_run_case_subprocess(case, size, args))
+
+    report = json.dumps(
+        {'metadata': _metadata(), 'results': results},
+        indent=2, sort_keys=True,
+    )
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
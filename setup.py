@@ -12,6 +12,11 @@ setup(
     description="Read and write STL 3D geometry files in both the ASCII and the binary flavor",
 
     packages=['stl'],
+    entry_points={
+        'console_scripts': [
+            'stl-convert = stl.conversion:main',
+        ],
+    },
     install_requires=[
     ],
     setup_requires=[
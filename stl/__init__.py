@@ -1,11 +1,47 @@
 
-import stl.ascii
-import stl.binary
+import importlib
+import sys
+
+from stl.types import Solid, Facet, Vector3d, merge
+from stl.instrumentation import Instrumentation
+
+# Names imported on first use, since they pull in NumPy and the format
+# modules, mapped to the module that defines them (or ``None`` for
+# submodules themselves).
+_LAZY = {
+    'ascii': None,
+    'binary': None,
+    'convert': 'stl.conversion',
+    'compare': 'stl.comparison',
+    'read_info': 'stl.info',
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(
+            "module %r has no attribute %r" % (__name__, name),
+        )
+    module = _LAZY[name]
+    if module is None:
+        value = importlib.import_module('%s.%s' % (__name__, name))
+    else:
+        value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
-from stl.types import Solid, Facet, Vector3d
 
+if sys.version_info < (3, 7):
+    # Module ``__getattr__`` needs Python 3.7.
+    for _name in _LAZY:
+        __getattr__(_name)
 
-def read_ascii_file(file):
+
+def read_ascii_file(file, instrument=None, dtype=None):
     """
     Read an STL file in the *ASCII* format.
 
@@ -15,11 +51,35 @@ def read_ascii_file(file):
 
     If the file is invalid in any way, raises
     :py:class:`stl.ascii.SyntaxError`.
+
+    If ``instrument`` is an :py:class:`stl.Instrumentation` then timing
+    and volume statistics for the read are recorded in it.
+
+    If ``dtype`` is given, typically ``numpy.float32`` or
+    ``numpy.float64``, the geometry is read into arrays of that type and
+    the solid is backed by them, as by :py:meth:`stl.Solid.from_arrays`,
+    rather than by :py:class:`stl.Facet` objects.
     """
-    return stl.ascii.parse(file)
+    from stl.ascii import parse
+    return parse(file, instrument=instrument, dtype=dtype)
 
 
-def read_binary_file(file):
+def read_ascii_solids(file):
+    """
+    Read every solid from an STL file in the *ASCII* format, for files
+    that contain several ``solid ... endsolid`` blocks.
+
+    Takes a :py:class:`file`-like object (supporting a ``read`` method)
+    and returns a :py:class:`list` of :py:class:`stl.Solid` objects.
+
+    If the file is invalid in any way, raises
+    :py:class:`stl.ascii.SyntaxError`.
+    """
+    from stl.ascii import parse_all
+    return parse_all(file)
+
+
+def read_binary_file(file, instrument=None, dtype=None):
     """
     Read an STL file in the *binary* format.
 
@@ -29,8 +89,17 @@ def read_binary_file(file):
 
     If the file is invalid in any way, raises
     :py:class:`stl.binary.FormatError`.
+
+    If ``instrument`` is an :py:class:`stl.Instrumentation` then timing
+    and volume statistics for the read are recorded in it.
+
+    If ``dtype`` is given, typically ``numpy.float32`` or
+    ``numpy.float64``, the geometry is read into arrays of that type and
+    the solid is backed by them, as by :py:meth:`stl.Solid.from_arrays`,
+    rather than by :py:class:`stl.Facet` objects.
     """
-    return stl.binary.parse(file)
+    from stl.binary import parse
+    return parse(file, instrument=instrument, dtype=dtype)
 
 
 def convert_to_stream(data):
@@ -46,7 +115,7 @@ def convert_to_stream(data):
             return BytesIO(data.encode())
 
 
-def read_ascii_string(data):
+def read_ascii_string(data, instrument=None, dtype=None):
     """
     Read geometry from a :py:class:`str` containing data in the STL *ASCII*
     format.
@@ -54,10 +123,12 @@ def read_ascii_string(data):
     This is just a wrapper around :py:func:`read_ascii_file` that first wraps
     the provided string in a :py:class:`StringIO.StringIO` object.
     """
-    return read_ascii_file(convert_to_stream(data))
+    return read_ascii_file(
+        convert_to_stream(data), instrument=instrument, dtype=dtype,
+    )
 
 
-def read_binary_string(data):
+def read_binary_string(data, instrument=None, dtype=None):
     """
     Read geometry from a :py:class:`str` containing data in the STL *binary*
     format.
@@ -65,4 +136,6 @@ def read_binary_string(data):
     This is just a wrapper around :py:func:`read_binary_file` that first wraps
     the provided string in a :py:class:`StringIO.StringIO` object.
     """
-    return read_binary_file(convert_to_stream(data))
+    return read_binary_file(
+        convert_to_stream(data), instrument=instrument, dtype=dtype,
+    )
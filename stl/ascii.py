@@ -1,5 +1,12 @@
 
+import io
+import itertools
+import json
+import os
+import re
+import numpy
 from stl.types import *
+from stl.instrumentation import stage
 
 
 class KeywordToken(str):
@@ -155,64 +162,63 @@ class SyntaxError(ValueError):
     pass
 
 
-def parse(file):
-    scanner = Scanner(file)
-
+def _parse_header(scanner):
     scanner.require_token(KeywordToken, "solid")
-    name = str(scanner.require_token(KeywordToken))
-
-    ret = Solid(name=name)
-
-    def parse_facet():
-        scanner.require_token(KeywordToken, "facet")
-        scanner.require_token(KeywordToken, "normal")
-        normal_x = scanner.require_token(NumberToken)
-        normal_y = scanner.require_token(NumberToken)
-        normal_z = scanner.require_token(NumberToken)
-        normal = Vector3d(
-            x=normal_x,
-            y=normal_y,
-            z=normal_z,
+    return str(scanner.require_token(KeywordToken))
+
+
+def _parse_facet(scanner, build):
+    scanner.require_token(KeywordToken, "facet")
+    scanner.require_token(KeywordToken, "normal")
+    normal_x = scanner.require_token(NumberToken)
+    normal_y = scanner.require_token(NumberToken)
+    normal_z = scanner.require_token(NumberToken)
+    # The coordinates are unwrapped from their tokens so that the facet
+    # doesn't keep the tokens' position attributes alive.
+    normal = Vector3d(
+        x=float(normal_x),
+        y=float(normal_y),
+        z=float(normal_z),
+    )
+
+    scanner.require_token(KeywordToken, "outer")
+    scanner.require_token(KeywordToken, "loop")
+    vertices = []
+    for i in range(3):
+        scanner.require_token(KeywordToken, "vertex")
+        vertex_x = scanner.require_token(NumberToken)
+        vertex_y = scanner.require_token(NumberToken)
+        vertex_z = scanner.require_token(NumberToken)
+        vertices.append(
+            Vector3d(
+                x=float(vertex_x),
+                y=float(vertex_y),
+                z=float(vertex_z),
+            )
         )
 
-        scanner.require_token(KeywordToken, "outer")
-        scanner.require_token(KeywordToken, "loop")
-        vertices = []
-        for i in range(3):
-            scanner.require_token(KeywordToken, "vertex")
-            vertex_x = scanner.require_token(NumberToken)
-            vertex_y = scanner.require_token(NumberToken)
-            vertex_z = scanner.require_token(NumberToken)
-            vertices.append(
-                Vector3d(
-                    x=vertex_x,
-                    y=vertex_y,
-                    z=vertex_z,
-                )
-            )
+    ret = build(normal, tuple(vertices))
 
-        ret = Facet(
-            normal=normal,
-            vertices=vertices,
-        )
+    scanner.require_token(KeywordToken, "endloop")
+    scanner.require_token(KeywordToken, "endfacet")
 
-        scanner.require_token(KeywordToken, "endloop")
-        scanner.require_token(KeywordToken, "endfacet")
+    return ret
 
-        return ret
 
+def _iter_facets(scanner, build):
+    """
+    Yield facets until the ``endsolid`` keyword, which is left unconsumed.
+    """
     while True:
         token = scanner.peek_token()
         token_type = type(token)
 
         if token_type is KeywordToken and token == 'endsolid':
-            break
+            return
         elif token_type is KeywordToken and token == 'facet':
-            facet = parse_facet()
-            ret.facets.append(facet)
+            yield _parse_facet(scanner, build)
         else:
             got_token_type = _token_type_name(token_type)
-            expected_token_type = _token_type_name(token_type)
             raise SyntaxError(
                 "Unexpected %s %r at line %i, column %i" % (
                     got_token_type,
@@ -222,6 +228,8 @@ def parse(file):
                 )
             )
 
+
+def _parse_footer(scanner, name):
     scanner.require_token(KeywordToken, "endsolid")
     end_name = str(scanner.require_token(KeywordToken))
     if name != end_name:
@@ -231,21 +239,302 @@ def parse(file):
             )
         )
 
+
+def _collect_coordinates(normal, vertices):
+    """
+    Build function for reading into arrays, which returns each facet's
+    twelve coordinates rather than a :py:class:`stl.Facet`.
+    """
+    return normal + vertices[0] + vertices[1] + vertices[2]
+
+
+def parse(file, instrument=None, dtype=None):
+    build = Facet.from_vectors if dtype is None else _collect_coordinates
+    if instrument is not None:
+        file = instrument.wrap_file(file)
+        build = instrument.timed('build', build, counts_facets=True)
+
+    scanner = Scanner(file)
+
+    with stage(instrument, 'header'):
+        name = _parse_header(scanner)
+
+    if dtype is not None:
+        with stage(instrument, 'decode'):
+            coordinates = numpy.fromiter(
+                itertools.chain.from_iterable(_iter_facets(scanner, build)),
+                dtype=dtype,
+            ).reshape(-1, 12)
+            _parse_footer(scanner, name)
+        return Solid.from_arrays(
+            name, coordinates[:, :3], coordinates[:, 3:].reshape(-1, 3, 3),
+        )
+
+    ret = Solid(name=name)
+
+    with stage(instrument, 'decode'):
+        ret.facets.extend(_iter_facets(scanner, build))
+        _parse_footer(scanner, name)
+
     return ret
 
 
-def write(solid, file):
-    name = solid.name
-    if name is None:
-        name = "unnamed"
+def parse_all(file):
+    """
+    Parse every ``solid ... endsolid`` block in ``file``, returning a list
+    of :py:class:`stl.Solid` objects in file order.
+    """
+    scanner = Scanner(file)
+    solids = []
+    while True:
+        name = _parse_header(scanner)
+        solid = Solid(name=name)
+        solid.facets.extend(_iter_facets(scanner, Facet.from_vectors))
+        _parse_footer(scanner, name)
+        solids.append(solid)
+        if scanner.peek_token() is None:
+            return solids
+
 
-    file.write("solid %s\n" % name)
-    for facet in solid.facets:
-        #sys.stderr.write("facet to write: %s\n" % facet.vertices)
-        file.write("  facet normal %g %g %g\n" % (facet.normal or Vector3d(0,0,0)))
+class AsciiStlReader(object):
+    """
+    Reader for STL files in the *ASCII* format that produces facets one at
+    a time rather than building a whole :py:class:`stl.Solid`.
+
+    The header is read on construction, making the solid's name available
+    as :py:attr:`name`. Iterating over the reader then yields each
+    :py:class:`stl.Facet` in turn and checks the end of the solid. It can
+    only be iterated once.
+
+    If the file is invalid in any way, raises :py:class:`SyntaxError`.
+    """
+
+    #: The name given to the solid by the file.
+    name = None
+
+    def __init__(self, file):
+        self.scanner = Scanner(file)
+        self.name = _parse_header(self.scanner)
+
+    def __iter__(self):
+        for facet in _iter_facets(self.scanner, Facet.from_vectors):
+            yield facet
+        _parse_footer(self.scanner, self.name)
+
+
+def _write_facets(facets, file):
+    count = 0
+    for facet in facets:
+        file.write(
+            "  facet normal %g %g %g\n" % (
+                facet.normal or Vector3d(0, 0, 0)
+            )
+        )
         file.write("    outer loop\n")
         for vertex in facet.vertices:
             file.write("      vertex %g %g %g\n" % vertex)
         file.write("    endloop\n")
         file.write("  endfacet\n")
-    file.write("endsolid %s\n" % name)
+        count += 1
+    return count
+
+
+# Text of a triangular facet, formatted from its normal and vertices'
+# twelve coordinates.
+_FACET_TEMPLATE = (
+    "  facet normal %g %g %g\n"
+    "    outer loop\n" +
+    "      vertex %g %g %g\n" * 3 +
+    "    endloop\n"
+    "  endfacet\n"
+)
+
+# Number of facets formatted at a time when writing arrays.
+_WRITE_CHUNK = 1 << 14
+
+
+def _write_arrays(normals, vertices, file, instrument):
+    for start in range(0, len(vertices), _WRITE_CHUNK):
+        stop = start + _WRITE_CHUNK
+        rows = numpy.concatenate([
+            normals[start:stop], vertices[start:stop].reshape(-1, 9),
+        ], axis=1).tolist()
+        file.write(''.join([_FACET_TEMPLATE % tuple(row) for row in rows]))
+        if instrument is not None:
+            instrument.add_facets(len(rows))
+
+
+def write(solid, file, instrument=None):
+    facets = None
+    if solid._facets is not None:
+        facets = solid.facets
+    if instrument is not None:
+        file = instrument.wrap_file(file)
+        if facets is not None:
+            facets = instrument.count_facets(facets)
+
+    name = solid.name
+    if name is None:
+        name = "unnamed"
+
+    with stage(instrument, 'header'):
+        file.write("solid %s\n" % name)
+
+    with stage(instrument, 'encode'):
+        if facets is None:
+            # Array-backed solids are formatted in bulk, without creating
+            # facet objects.
+            normals, vertices = solid.to_arrays()[:2]
+            _write_arrays(normals, vertices, file, instrument)
+        else:
+            _write_facets(facets, file)
+        file.write("endsolid %s\n" % name)
+
+
+class AsciiStlWriter(object):
+    """
+    Incremental writer for STL files in the *ASCII* format.
+
+    The ``solid`` line is written on construction, facets are added with
+    :py:meth:`write_facets` and the ``endsolid`` line is written by
+    :py:meth:`close`. The writer is also a context manager that closes
+    itself on exit. If the block exits with an exception the ``endsolid``
+    line isn't written, so the output can't be mistaken for a whole file.
+
+    ``file`` must be a file-like object supporting a ``write`` method.
+    """
+
+    def __init__(self, file, name=None):
+        if name is None:
+            name = "unnamed"
+        self.file = file
+        self.name = name
+        self.facet_count = 0
+        self.closed = False
+        file.write("solid %s\n" % name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.closed = True
+
+    def write_facets(self, facets):
+        """
+        Add an iterable of :py:class:`stl.Facet` objects to the file.
+        """
+        if self.closed:
+            raise ValueError("Writer is already closed")
+        self.facet_count += _write_facets(facets, self.file)
+
+    def close(self):
+        """
+        Write the end of the solid. Calling this more than once has no
+        further effect.
+        """
+        if not self.closed:
+            self.closed = True
+            self.file.write("endsolid %s\n" % self.name)
+
+
+_SOLID_LINE = re.compile(br'^\s*solid\s+([A-Za-z_][A-Za-z0-9_]*)')
+_ENDSOLID_LINE = re.compile(br'^\s*endsolid\b')
+
+#: Suffix added to the path of an STL file to name its cached index.
+INDEX_SUFFIX = '.stlidx'
+
+
+def build_index(file):
+    """
+    Scan an ASCII STL file for its ``solid ... endsolid`` blocks without
+    parsing them, returning a list of ``(name, start, end)`` tuples giving
+    each solid's name and byte range.
+
+    ``file`` must be opened in binary mode and is scanned from the start.
+    Only ``solid`` and ``endsolid`` keywords at the start of a line are
+    recognized.
+    """
+    file.seek(0)
+    index = []
+    offset = 0
+    start = name = None
+    for line in file:
+        if start is None:
+            match = _SOLID_LINE.match(line)
+            if match:
+                start = offset
+                name = match.group(1).decode('utf-8', 'replace')
+        elif _ENDSOLID_LINE.match(line):
+            index.append((name, start, offset + len(line)))
+            start = name = None
+        offset += len(line)
+    if start is not None:
+        raise SyntaxError("Solid %r is missing its endsolid" % (name,))
+    return index
+
+
+def load_index(path, cache=True):
+    """
+    Return the index of the ASCII STL file at ``path``, as built by
+    :py:func:`build_index`.
+
+    If ``cache`` is set the index is kept in a file next to the STL file,
+    named with :py:data:`INDEX_SUFFIX`, and reused for as long as the STL
+    file's size and modification time are unchanged. Failing to write the
+    cache file is not an error.
+    """
+    stat = os.stat(path)
+    cache_path = path + INDEX_SUFFIX
+    if cache:
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if (cached['size'] == stat.st_size and
+                    cached['mtime'] == stat.st_mtime):
+                return [tuple(entry) for entry in cached['solids']]
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+
+    with open(path, 'rb') as f:
+        index = build_index(f)
+
+    if cache:
+        partial = '%s.%d.partial' % (cache_path, os.getpid())
+        try:
+            with open(partial, 'w') as f:
+                json.dump({
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'solids': index,
+                }, f)
+            os.rename(partial, cache_path)
+        except (IOError, OSError):
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+    return index
+
+
+def read_solid(file, name, index=None):
+    """
+    Parse just the solid called ``name`` from a binary-mode, seekable ASCII
+    STL file, returning a :py:class:`stl.Solid`.
+
+    ``index`` is the file's index as returned by :py:func:`build_index` or
+    :py:func:`load_index`; if it isn't given it is built first. Raises
+    :py:class:`KeyError` if there is no solid with the given name.
+    """
+    if index is None:
+        index = build_index(file)
+    for entry_name, start, end in index:
+        if entry_name == name:
+            break
+    else:
+        raise KeyError(name)
+    file.seek(start)
+    data = file.read(end - start).decode('utf-8', 'replace')
+    return parse(io.StringIO(data))
@@ -1,6 +1,50 @@
 
 import struct
+import sys
+import tempfile
 from stl.types import *
+from stl.instrumentation import stage
+
+
+#: Layout of a facet record: the normal, the three vertices and the
+#: attribute byte count.
+_RECORD = struct.Struct('<12fH')
+
+#: Size of a facet record without attribute bytes.
+RECORD_SIZE = _RECORD.size
+
+_record_dtype_cache = []
+
+
+def _record_dtype():
+    """
+    Return the NumPy equivalent of a facet record, for decoding many
+    records at once. NumPy is only imported the first time it's needed.
+    """
+    if not _record_dtype_cache:
+        import numpy
+        _record_dtype_cache.append(numpy.dtype([
+            ('normal', '<f4', (3,)),
+            ('vertices', '<f4', (3, 3)),
+            ('attributes', '<u2'),
+        ]))
+    return _record_dtype_cache[0]
+
+
+def __getattr__(name):
+    # ``RECORD_DTYPE`` is built on first access, so that importing this
+    # module doesn't import NumPy.
+    if name == 'RECORD_DTYPE':
+        return _record_dtype()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+if sys.version_info < (3, 7):
+    # Module ``__getattr__`` needs Python 3.7.
+    RECORD_DTYPE = _record_dtype()
+
+#: Size of the header, including the facet count.
+HEADER_SIZE = 84
 
 
 class Reader(object):
@@ -8,6 +52,9 @@ class Reader(object):
     def __init__(self, file):
         self.file = file
         self.offset = 0
+        #: Position in the file of the start of the STL data, which
+        #: offsets are relative to.
+        self.base = 0
 
     def read_bytes(self, byte_count):
         bytes = self.file.read(byte_count)
@@ -38,6 +85,21 @@ class Reader(object):
         z = self.read_float()
         return Vector3d(x, y, z)
 
+    def read_record(self):
+        """
+        Read a whole facet record, returning a tuple of its twelve floats
+        followed by its attribute byte count.
+        """
+        return _RECORD.unpack(self.read_bytes(_RECORD.size))
+
+    def seek(self, offset):
+        """
+        Move to ``offset`` bytes from the start of the STL data, which must
+        be in a seekable file.
+        """
+        self.file.seek(self.base + offset)
+        self.offset = offset
+
     def read_header(self):
         bytes = self.read_bytes(80)
         return struct.unpack('80s', bytes)[0].strip(b'\0').decode()
@@ -47,20 +109,111 @@ class FormatError(ValueError):
     pass
 
 
-def parse(file):
+def _build_facet(values, attr_bytes):
+    return Facet.from_vectors(
+        Vector3d(*values[0:3]),
+        (
+            Vector3d(*values[3:6]),
+            Vector3d(*values[6:9]),
+            Vector3d(*values[9:12]),
+        ),
+        attr_bytes,
+    )
+
+
+def parse(file, instrument=None, dtype=None):
+    build = _build_facet
+    if instrument is not None:
+        file = instrument.wrap_file(file)
+        build = instrument.timed('build', build, counts_facets=True)
+
     r = Reader(file)
 
-    name = r.read_header()[6:]
+    with stage(instrument, 'header'):
+        name = r.read_header()[6:]
+        num_facets = r.read_uint32()
+
+    if dtype is not None:
+        with stage(instrument, 'decode'):
+            return _parse_arrays(r, name, num_facets, dtype, instrument)
 
     ret = Solid(name=name)
 
-    num_facets = r.read_uint32()
+    with stage(instrument, 'decode'):
+        ret.facets.extend(_iter_facets(r, num_facets, build))
+
+    return ret
+
+
+# Number of facets decoded at a time when reading into arrays.
+_READ_CHUNK = 1 << 16
+
+
+def _iter_record_blocks(r, num_facets):
+    """
+    Yield arrays of consecutive records, each with the attribute bytes that
+    follow its last record, if any.
+    """
+    import numpy
+    size = RECORD_SIZE
+    pending = b''
+    remaining = num_facets
+    while remaining > 0:
+        count = min(remaining, _READ_CHUNK)
+        if len(pending) < count * size:
+            pending += r.read_bytes(count * size - len(pending))
+        records = numpy.frombuffer(pending, dtype=_record_dtype(), count=count)
+        extra = numpy.flatnonzero(records['attributes'])
+        if not len(extra):
+            pending = pending[count * size:]
+            data = b''
+        else:
+            # Records after ones with attribute bytes are misaligned within
+            # the block, so the block ends there, after the bytes.
+            count = int(extra[0]) + 1
+            skip = int(records['attributes'][count - 1])
+            records = records[:count]
+            pending = pending[count * size:]
+            if len(pending) < skip:
+                pending += r.read_bytes(skip - len(pending))
+            data = pending[:skip]
+            pending = pending[skip:]
+        remaining -= count
+        yield records, data
+
 
+def _parse_arrays(r, name, num_facets, dtype, instrument):
+    import numpy
+    # The blocks are collected rather than written into arrays allocated up
+    # front, so that a bogus facet count fails on the data, not in memory.
+    blocks = []
+    for records, data in _iter_record_blocks(r, num_facets):
+        blocks.append((
+            records['normal'].astype(dtype),
+            records['vertices'].astype(dtype),
+            records['attributes'].copy(),
+            numpy.frombuffer(data, dtype=numpy.uint8),
+        ))
+        if instrument is not None:
+            instrument.add_facets(len(records))
+    if not blocks:
+        blocks.append((
+            numpy.zeros((0, 3), dtype=dtype),
+            numpy.zeros((0, 3, 3), dtype=dtype),
+            numpy.zeros(0, dtype=numpy.uint16),
+            numpy.zeros(0, dtype=numpy.uint8),
+        ))
+    normals, vertices, attributes, data = [
+        numpy.concatenate(arrays) for arrays in zip(*blocks)
+    ]
+    return Solid.from_arrays(name, normals, vertices, attributes, data)
+
+
+def _iter_facets(r, num_facets, build):
     for i in range(num_facets):
-        normal = r.read_vector3d()
-        vertices = tuple(r.read_vector3d() for j in range(3))
+        values = r.read_record()
 
-        attr_byte_count = r.read_uint16()
+        attr_byte_count = values[12]
         if attr_byte_count > 0:
             # The attribute bytes are not standardized, but some software
             # encodes additional information here. We return the raw bytes
@@ -70,24 +223,571 @@ def parse(file):
         else:
             attr_bytes = None
 
-        ret.add_facet(
-            normal=normal,
-            vertices=vertices,
-            attributes=attr_bytes,
+        yield build(values, attr_bytes)
+
+
+class BinaryStlReader(object):
+    """
+    Reader for STL files in the *binary* format that produces facets one at
+    a time rather than building a whole :py:class:`stl.Solid`.
+
+    The header is read on construction, making :py:attr:`name` and
+    :py:attr:`facet_count` available. Iterating over the reader then yields
+    each :py:class:`stl.Facet` in turn. It can only be iterated once.
+
+    If the file is invalid in any way, raises :py:class:`FormatError`.
+    """
+
+    #: The name given to the solid by the header.
+    name = None
+
+    #: The number of facets the header declares.
+    facet_count = 0
+
+    def __init__(self, file):
+        self.reader = Reader(file)
+        self.name = self.reader.read_header()[6:]
+        self.facet_count = self.reader.read_uint32()
+
+    def __iter__(self):
+        return _iter_facets(self.reader, self.facet_count, _build_facet)
+
+
+def _read_header(r):
+    """
+    Read the header at the current position of a seekable file, which
+    becomes the base that later seeks are relative to, so that STL data
+    embedded in a larger file can be read too.
+    """
+    r.base = r.file.tell()
+    r.offset = 0
+    name = r.read_header()[6:]
+    return name, r.read_uint32()
+
+
+# Steps between records, in records, beyond which seeking to each record is
+# cheaper than reading the records in between.
+_SEEK_STEP = 64
+
+
+def _read_records(r, start, stop, step=1):
+    """
+    Read the records of every ``step``-th facet from ``start`` up to
+    ``stop``, assuming that every record is the standard 50 bytes.
+    """
+    import numpy
+    if step > _SEEK_STEP:
+        chunks = []
+        for index in range(start, stop, step):
+            r.seek(HEADER_SIZE + index * RECORD_SIZE)
+            chunks.append(r.read_bytes(RECORD_SIZE))
+        return numpy.frombuffer(b''.join(chunks), dtype=_record_dtype())
+    r.seek(HEADER_SIZE + start * RECORD_SIZE)
+    data = r.read_bytes((stop - start) * RECORD_SIZE)
+    return numpy.frombuffer(data, dtype=_record_dtype())[::step]
+
+
+def _records_solid(name, records):
+    """
+    Return a :py:class:`stl.Solid` backed by the data of ``records``.
+    """
+    return Solid.from_arrays(
+        name, records['normal'], records['vertices'],
+        records['attributes'],
+    )
+
+
+def read_range(file, start, stop):
+    """
+    Read just the facets from index ``start`` up to but not including
+    ``stop`` from a seekable *binary* STL file, returning a
+    :py:class:`stl.Solid`.
+
+    The indices are interpreted like those of a slice, so they may be
+    negative or beyond the number of facets. Only the records of the
+    requested facets are read, so the cost depends on the size of the range
+    and not of the file. This relies on all the records being the standard
+    50 bytes, which holds unless the file uses attribute bytes.
+
+    The STL data is read from the current position of the file, so it may
+    be embedded in a larger file, and the file is left at that position.
+
+    If the file is too short for the range, raises :py:class:`FormatError`.
+    """
+    r = Reader(file)
+    name, facet_count = _read_header(r)
+    try:
+        start, stop, step = slice(start, stop).indices(facet_count)
+        records = _read_records(r, start, max(start, stop))
+    finally:
+        r.seek(0)
+    return _records_solid(name, records)
+
+
+class LazySolid(object):
+    """
+    Read-only view of a :py:class:`stl.Solid` in a seekable *binary* STL
+    file, which reads facets from the file only when they are accessed.
+
+    The header is read on construction, making :py:attr:`name` and
+    :py:attr:`facet_count` available. :py:attr:`facets` can then be
+    indexed and sliced like a list, reading just the records needed, which
+    makes it suitable for sampling and paging through huge files::
+
+        solid = LazySolid(f)
+        page = solid.facets[1000:1100]
+
+    Iterating over the object or its facets reads the file in blocks of
+    ``block_size`` facets. Like :py:func:`read_range`, the STL data starts
+    at the position of the file on construction and all the records must
+    be the standard 50 bytes.
+    """
+
+    #: The name given to the solid by the header.
+    name = None
+
+    #: The number of facets the header declares.
+    facet_count = 0
+
+    def __init__(self, file, block_size=1 << 14):
+        self.reader = Reader(file)
+        self.name, self.facet_count = _read_header(self.reader)
+        self.block_size = block_size
+
+    @property
+    def facets(self):
+        """
+        A sequence of the :py:class:`stl.Facet` objects in the file,
+        supporting ``len``, indexing, slicing and iteration.
+        """
+        return _LazyFacets(self)
+
+    def read_range(self, start, stop):
+        """
+        Return a :py:class:`stl.Solid` holding the facets from ``start`` up
+        to but not including ``stop``, as :py:func:`read_range` does.
+        """
+        start, stop, step = slice(start, stop).indices(self.facet_count)
+        records = _read_records(self.reader, start, max(start, stop))
+        return _records_solid(self.name, records)
+
+    def __iter__(self):
+        for start in range(0, self.facet_count, self.block_size):
+            for facet in self.read_range(
+                    start, start + self.block_size).facets:
+                yield facet
+
+    def __repr__(self):
+        return '<stl.binary.LazySolid name=%r, facet_count=%r>' % (
+            self.name,
+            self.facet_count,
         )
 
-    return ret
 
+class _LazyFacets(object):
+
+    def __init__(self, solid):
+        self.solid = solid
+
+    def __len__(self):
+        return self.solid.facet_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.solid.facet_count)
+            indices = range(start, stop, step)
+            if not len(indices):
+                return []
+            # Only the selected records are read and decoded, in increasing
+            # order, then reversed for negative steps.
+            low = min(indices[0], indices[-1])
+            high = max(indices[0], indices[-1]) + 1
+            records = _read_records(self.solid.reader, low, high, abs(step))
+            if step < 0:
+                records = records[::-1]
+            return _records_solid(self.solid.name, records).facets
+        if index < 0:
+            index += self.solid.facet_count
+        if not 0 <= index < self.solid.facet_count:
+            raise IndexError("facet index out of range")
+        return self.solid.read_range(index, index + 1).facets[0]
+
+    def __iter__(self):
+        return iter(self.solid)
+
+
+def write(solid, file, instrument=None):
+    if instrument is not None:
+        file = instrument.wrap_file(file)
+
+    with stage(instrument, 'header'):
+        # Empty header
+        file.write(b'\0' * 80)
+
+        # Number of facets
+        file.write(struct.pack('<I', solid.facet_count))
+
+    with stage(instrument, 'encode'):
+        if solid._facets is None:
+            # Array-backed solids are encoded in bulk, without creating
+            # facet objects.
+            normals, vertices, attributes = solid.to_arrays()
+            for start in range(0, len(vertices), _WRITE_CHUNK):
+                stop = start + _WRITE_CHUNK
+                file.write(_records(
+                    normals[start:stop], vertices[start:stop],
+                ).tobytes())
+                if instrument is not None:
+                    instrument.add_facets(len(vertices[start:stop]))
+        else:
+            facets = solid.facets
+            if instrument is not None:
+                facets = instrument.count_facets(facets)
+            _write_facets(facets, file)
+
+
+# Number of facets encoded at a time when writing arrays.
+_WRITE_CHUNK = 1 << 16
+
+
+def _records(normals, vertices, attributes=None):
+    """
+    Return an array of binary records for the facets given as arrays.
+    """
+    import numpy
+    records = numpy.zeros(len(vertices), dtype=_record_dtype())
+    records['normal'] = normals
+    records['vertices'] = vertices
+    if attributes is not None:
+        records['attributes'] = attributes
+    return records
+
+
+def _pack_facet(facet, pack=_RECORD.pack):
+    normal = facet.normal
+    v0, v1, v2 = facet.vertices
+    return pack(
+        normal[0], normal[1], normal[2],
+        v0[0], v0[1], v0[2],
+        v1[0], v1[1], v1[2],
+        v2[0], v2[1], v2[2],
+        0,  # no attribute bytes
+    )
+
+
+def _write_facets(facets, file):
+    for facet in facets:
+        file.write(_pack_facet(facet))
+
+
+def _is_seekable(file):
+    try:
+        return file.seekable()
+    except AttributeError:
+        try:
+            file.tell()
+        except (AttributeError, IOError, OSError):
+            return False
+        return True
+
+
+class BinaryStlWriter(object):
+    """
+    Incremental writer for STL files in the *binary* format, for producers
+    that don't have the whole :py:class:`stl.Solid` up front.
+
+    Facets are added in batches with :py:meth:`write_facets` or
+    :py:meth:`write_arrays`, and the facet count in the header is filled in
+    by :py:meth:`close`. The writer is also a context manager that closes
+    itself on exit::
+
+        with BinaryStlWriter(f) as writer:
+            for batch in batches:
+                writer.write_facets(batch)
+
+    If the block exits with an exception the header isn't completed, so
+    the output can't be mistaken for a whole file: a seekable file is left
+    with a facet count of zero, and nothing is written to one that isn't.
+
+    ``file`` must be a file-like object supporting a ``write`` method. If
+    it is also seekable the records are written straight to it and the
+    header is patched on close; otherwise they are spooled to a temporary
+    file, kept in memory up to ``spool_size`` bytes, and copied to ``file``
+    on close. Writes are buffered up to ``buffer_size`` bytes, so memory
+    use doesn't grow with the size of the mesh.
+    """
+
+    def __init__(self, file, buffer_size=1 << 20, spool_size=1 << 24):
+        self.file = file
+        self.buffer_size = buffer_size
+        self.facet_count = 0
+        self.closed = False
+        self._pending = []
+        self._pending_size = 0
+        if _is_seekable(file):
+            self._start = file.tell()
+            file.write(b'\0' * HEADER_SIZE)
+            self._records = file
+        else:
+            self._start = None
+            self._records = tempfile.SpooledTemporaryFile(max_size=spool_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._abandon()
+
+    def write_facets(self, facets):
+        """
+        Add an iterable of :py:class:`stl.Facet` objects to the file.
+        """
+        self._check_open()
+        # The whole batch is packed before anything is added, so a facet
+        # that can't be packed leaves the file as it was.
+        records = [_pack_facet(facet) for facet in facets]
+        self._add_count(len(records))
+        self._append(b''.join(records))
+
+    def write_arrays(self, normals, vertices, attributes=None):
+        """
+        Add a batch of facets given as arrays: ``normals`` of shape
+        ``(n, 3)``, ``vertices`` of shape ``(n, 3, 3)`` and optionally
+        ``attributes``, the ``n`` attribute byte count values.
+        """
+        import numpy
+        self._check_open()
+        records = _records(normals, numpy.asarray(vertices), attributes)
+        self._add_count(len(records))
+        self._append(records.tobytes())
+
+    def close(self):
+        """
+        Flush any buffered records and complete the header. Calling this
+        more than once has no further effect.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._flush()
+        header = b'\0' * 80 + struct.pack('<I', self.facet_count)
+        if self._start is not None:
+            end = self.file.tell()
+            self.file.seek(self._start)
+            self.file.write(header)
+            self.file.seek(end)
+        else:
+            self.file.write(header)
+            self._records.seek(0)
+            while True:
+                data = self._records.read(self.buffer_size)
+                if not data:
+                    break
+                self.file.write(data)
+            self._records.close()
+
+    def _abandon(self):
+        """
+        Close the writer without completing the header.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._pending = []
+        if self._start is None:
+            self._records.close()
+
+    def _check_open(self):
+        if self.closed:
+            raise ValueError("Writer is already closed")
+
+    def _add_count(self, count):
+        if self.facet_count + count > 0xffffffff:
+            raise FormatError(
+                "Binary STL files can't hold more than %i facets" % (
+                    0xffffffff,
+                )
+            )
+        self.facet_count += count
+
+    def _append(self, data):
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= self.buffer_size:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._records.write(b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+
+class ValidationReport(object):
+    """
+    The result of :py:func:`validate`.
+
+    The problems found in the records are given as sorted NumPy arrays of
+    facet indices.
+    """
+
+    #: The name given in the header.
+    name = None
+
+    #: The number of facets the header declares.
+    declared_facets = 0
+
+    #: The number of bytes following the header.
+    record_bytes = 0
+
+    #: Indices of facets with a NaN or infinite normal or vertex coordinate.
+    non_finite = None
+
+    #: Indices of facets whose vertices span no area.
+    degenerate = None
+
+    #: Indices of facets whose non-zero normal disagrees with the normal
+    #: implied by the winding of their vertices.
+    normal_mismatch = None
+
+    #: Indices of facets with a non-zero attribute byte count.
+    nonzero_attributes = None
+
+    def __init__(self, name, declared_facets, record_bytes, non_finite,
+                 degenerate, normal_mismatch, nonzero_attributes):
+        self.name = name
+        self.declared_facets = declared_facets
+        self.record_bytes = record_bytes
+        self.non_finite = non_finite
+        self.degenerate = degenerate
+        self.normal_mismatch = normal_mismatch
+        self.nonzero_attributes = nonzero_attributes
+
+    @property
+    def size_ok(self):
+        """
+        Whether the size of the file matches the declared facet count.
+        """
+        expected = self.declared_facets * RECORD_SIZE
+        return self.record_bytes == expected
+
+    @property
+    def valid(self):
+        """
+        Whether no problems at all were found.
+        """
+        return self.size_ok and not (
+            len(self.non_finite) or
+            len(self.degenerate) or
+            len(self.normal_mismatch) or
+            len(self.nonzero_attributes)
+        )
+
+    def __repr__(self):
+        return (
+            '<stl.binary.ValidationReport declared_facets=%r, '
+            'record_bytes=%r, non_finite=%r, degenerate=%r, '
+            'normal_mismatch=%r, nonzero_attributes=%r>' % (
+                self.declared_facets,
+                self.record_bytes,
+                len(self.non_finite),
+                len(self.degenerate),
+                len(self.normal_mismatch),
+                len(self.nonzero_attributes),
+            )
+        )
+
+
+def _check_records(records):
+    """
+    Return boolean masks for the problems :py:func:`validate` looks for in
+    an array of records.
+    """
+    import numpy
+    normals = records['normal']
+    vertices = records['vertices']
+
+    finite = (
+        numpy.isfinite(normals).all(axis=1) &
+        numpy.isfinite(vertices.reshape(len(vertices), 9)).all(axis=1)
+    )
+    with numpy.errstate(invalid='ignore', over='ignore'):
+        # Differences of float32 values are only zero when the values are
+        # equal, so the edges can be taken before widening for the cross
+        # product.
+        e1 = (vertices[:, 1] - vertices[:, 0]).astype(numpy.float64)
+        e2 = (vertices[:, 2] - vertices[:, 0]).astype(numpy.float64)
+        cx = e1[:, 1] * e2[:, 2] - e1[:, 2] * e2[:, 1]
+        cy = e1[:, 2] * e2[:, 0] - e1[:, 0] * e2[:, 2]
+        cz = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+        degenerate = finite & (cx == 0) & (cy == 0) & (cz == 0)
+        dot = normals[:, 0] * cx + normals[:, 1] * cy + normals[:, 2] * cz
+        has_normal = (normals != 0).any(axis=1)
+        mismatch = finite & ~degenerate & has_normal & (dot <= 0)
+
+    return (
+        ~finite,
+        degenerate,
+        mismatch,
+        records['attributes'] != 0,
+    )
+
+
+def validate(file, chunk_facets=1 << 16):
+    """
+    Check a *binary* STL file for problems without building any
+    :py:class:`stl.Facet` objects, returning a :py:class:`ValidationReport`.
+
+    Takes a :py:class:`file`-like object (supporting a ``read`` method).
+    The records are read and checked ``chunk_facets`` at a time, so memory
+    use is bounded regardless of the size of the file. Raises
+    :py:class:`FormatError` if the file is too short to hold a header.
+
+    The checks assume every record is the standard 50 bytes, so once a
+    record with a non-zero attribute byte count is found the records after
+    it may be reported with spurious problems.
+    """
+    import numpy
+    r = Reader(file)
+    name = r.read_header()[6:]
+    declared_facets = r.read_uint32()
 
-def write(solid, file):
-    # Empty header
-    file.write(b'\0' * 80)
+    record_size = RECORD_SIZE
+    problems = ([], [], [], [])
+    record_bytes = 0
+    start = 0
+    leftover = b''
+    while True:
+        data = file.read(chunk_facets * record_size)
+        if not data:
+            break
+        record_bytes += len(data)
+        if leftover:
+            data = leftover + data
+        complete = len(data) // record_size
+        leftover = data[complete * record_size:]
+        count = min(complete, declared_facets - start)
+        if count <= 0:
+            continue
+        records = numpy.frombuffer(data, dtype=_record_dtype(), count=count)
+        for found, mask in zip(problems, _check_records(records)):
+            found.append(numpy.flatnonzero(mask) + start)
+        start += count
 
-    # Number of facets
-    file.write(struct.pack('<I', len(solid.facets)))
+    def indices(found):
+        if not found:
+            return numpy.zeros(0, dtype=numpy.intp)
+        return numpy.concatenate(found)
 
-    for facet in solid.facets:
-        file.write(struct.pack('<3f', *facet.normal))
-        for vertex in facet.vertices:
-            file.write(struct.pack('<3f', *vertex))
-        file.write(b'\0\0')  # no attribute bytes
+    return ValidationReport(
+        name=name,
+        declared_facets=declared_facets,
+        record_bytes=record_bytes,
+        non_finite=indices(problems[0]),
+        degenerate=indices(problems[1]),
+        normal_mismatch=indices(problems[2]),
+        nonzero_attributes=indices(problems[3]),
+    )
@@ -0,0 +1,350 @@
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy
+
+import stl.ascii
+import stl.binary
+from stl.types import Solid
+
+
+_ARRAY_NAMES = ('normals', 'vertices', 'attributes', 'attribute_data')
+
+_PARSERS = {
+    'ascii': (stl.ascii.parse, 'r'),
+    'binary': (stl.binary.parse, 'rb'),
+}
+
+# Types of the arrays parsed into for the disk cache, which hold the
+# coordinates of each format exactly.
+_DTYPES = {
+    'ascii': numpy.float64,
+    'binary': numpy.float32,
+}
+
+
+def _hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class DiskCache(object):
+    """
+    Persistent cache of parsed STL files, for workloads that read the same
+    files over and over.
+
+    Each parsed file is stored under ``directory`` as ``.npy`` arrays of its
+    normals, vertices and attributes, including any attribute bytes. An
+    entry is keyed by the file's
+    absolute path and format and is valid while the file's size and
+    modification time are unchanged; if those have changed but the content
+    hash still matches, the entry is refreshed rather than rebuilt.
+
+    Files are parsed into arrays, as with the ``dtype`` option of the
+    readers, in the precision the format stores. Cached solids are returned
+    memory-mapped via :py:meth:`stl.Solid.from_arrays`, so a hit doesn't
+    parse anything and gives the same geometry as a miss. When the cache
+    grows beyond ``max_bytes``, the least recently used entries are
+    removed.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def read_ascii_file(self, path):
+        """
+        Return the :py:class:`stl.Solid` from the *ASCII* STL file at
+        ``path``, parsing it only if it isn't already cached.
+        """
+        return self._read(path, 'ascii')
+
+    def read_binary_file(self, path):
+        """
+        Return the :py:class:`stl.Solid` from the *binary* STL file at
+        ``path``, parsing it only if it isn't already cached.
+        """
+        return self._read(path, 'binary')
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        for entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def _entry_path(self, path, format):
+        key = '%s\0%s' % (format, os.path.abspath(path))
+        return os.path.join(
+            self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest(),
+        )
+
+    def _entries(self):
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            if os.path.isfile(os.path.join(entry, 'meta.json')):
+                yield entry
+
+    def _read(self, path, format):
+        stat = os.stat(path)
+        entry = self._entry_path(path, format)
+        meta_path = os.path.join(entry, 'meta.json')
+
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (IOError, OSError, ValueError):
+            meta = None
+
+        content_hash = None
+        if meta is not None:
+            if (meta['size'] != stat.st_size or
+                    meta['mtime'] != stat.st_mtime):
+                content_hash = _hash_file(path)
+                if meta['hash'] == content_hash:
+                    meta['size'] = stat.st_size
+                    meta['mtime'] = stat.st_mtime
+                    try:
+                        self._write_meta(entry, meta)
+                    except (IOError, OSError):
+                        meta = None
+                else:
+                    meta = None
+            if meta is not None:
+                solid = self._load(entry, meta)
+                if solid is not None:
+                    return solid
+
+        if content_hash is None:
+            content_hash = _hash_file(path)
+        parse, mode = _PARSERS[format]
+        with open(path, mode) as f:
+            solid = parse(f, dtype=_DTYPES[format])
+        self._store(entry, solid, {
+            'name': solid.name,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'hash': content_hash,
+        })
+        return solid
+
+    def _load(self, entry, meta):
+        try:
+            arrays = [
+                numpy.load(os.path.join(entry, name + '.npy'), mmap_mode='r')
+                for name in _ARRAY_NAMES
+            ]
+        except (IOError, OSError, ValueError):
+            return None
+        # The modification time of the metadata records when the entry was
+        # last used, for eviction.
+        try:
+            os.utime(os.path.join(entry, 'meta.json'), None)
+        except OSError:
+            pass
+        return Solid.from_arrays(meta['name'], *arrays)
+
+    def _write_meta(self, entry, meta):
+        partial = os.path.join(entry, 'meta.json.%d' % os.getpid())
+        with open(partial, 'w') as f:
+            json.dump(meta, f)
+        os.rename(partial, os.path.join(entry, 'meta.json'))
+
+    def _store(self, entry, solid, meta):
+        arrays = solid.to_arrays() + (solid._attribute_data,)
+        if arrays[-1] is None:
+            arrays = arrays[:-1] + (numpy.zeros(0, dtype=numpy.uint8),)
+        partial = tempfile.mkdtemp(dir=self.directory, prefix='.partial-')
+        try:
+            for name, array in zip(_ARRAY_NAMES, arrays):
+                numpy.save(os.path.join(partial, name + '.npy'), array)
+            self._write_meta(partial, meta)
+            if os.path.isdir(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            os.rename(partial, entry)
+        except (IOError, OSError):
+            # Most likely another process stored the same entry first.
+            shutil.rmtree(partial, ignore_errors=True)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(entry, name))
+                    for name in os.listdir(entry)
+                )
+                used = os.path.getmtime(os.path.join(entry, 'meta.json'))
+            except OSError:
+                continue
+            entries.append((used, size, entry))
+            total += size
+        entries.sort()
+        for used, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def _vector_size(vector):
+    return sys.getsizeof(vector) + sum(sys.getsizeof(c) for c in vector)
+
+
+def _footprint(solid):
+    """
+    Estimate the number of bytes of memory held by ``solid``.
+
+    Array-backed solids are measured exactly. For solids made of
+    :py:class:`stl.Facet` objects the size of the first facet, its vectors
+    and their coordinates is taken as representative of all of them.
+    """
+    if solid._facets is None:
+        size = sum(array.nbytes for array in solid._arrays)
+        if solid._attribute_data is not None:
+            size += solid._attribute_data.nbytes
+        return size
+    facets = solid._facets
+    size = sys.getsizeof(facets)
+    if facets:
+        facet = facets[0]
+        per_facet = sys.getsizeof(facet) + sys.getsizeof(facet.vertices)
+        per_facet += sum(_vector_size(v) for v in facet.vertices)
+        if facet.normal is not None:
+            per_facet += _vector_size(facet.normal)
+        size += per_facet * len(facets)
+    return size
+
+
+class _Pending(object):
+    """
+    A load in progress, which other threads asking for the same entry wait
+    on instead of loading it again.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.solid = None
+        self.error = None
+
+
+class SolidCache(object):
+    """
+    Thread-safe in-memory cache of parsed STL files, for services that
+    read the same working set of files many times.
+
+    Up to ``max_bytes`` worth of solids are kept, as estimated from their
+    arrays or facet objects; beyond that the least recently used are
+    dropped. An entry is reused for as long as the file's size and
+    modification time are unchanged.
+
+    If several threads ask for the same file at once, only one of them
+    parses it and the others wait for its result. Solids returned by the
+    cache are shared between callers, so they shouldn't be modified.
+    """
+
+    def __init__(self, max_bytes=1 << 28):
+        self.max_bytes = max_bytes
+        #: The estimated number of bytes held by the cached solids.
+        self.size = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def read_ascii_file(self, path):
+        """
+        Return the :py:class:`stl.Solid` from the *ASCII* STL file at
+        ``path``, parsing it only if it isn't already cached.
+        """
+        return self._read(path, 'ascii')
+
+    def read_binary_file(self, path):
+        """
+        Return the :py:class:`stl.Solid` from the *binary* STL file at
+        ``path``, parsing it only if it isn't already cached.
+        """
+        return self._read(path, 'binary')
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _read(self, path, format):
+        stat = os.stat(path)
+        key = (format, os.path.abspath(path))
+        version = (stat.st_size, stat.st_mtime)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.pop(key)
+                    self._entries[key] = entry
+                    return entry[1]
+                self._remove(key)
+            pending = self._pending.get((key, version))
+            loading = pending is None
+            if loading:
+                pending = self._pending[(key, version)] = _Pending()
+
+        if not loading:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.solid
+
+        try:
+            parse, mode = _PARSERS[format]
+            with open(path, mode) as f:
+                pending.solid = parse(f)
+        except BaseException as e:
+            pending.error = e
+            raise
+        else:
+            self._add(key, version, pending.solid)
+        finally:
+            with self._lock:
+                del self._pending[(key, version)]
+            pending.done.set()
+        return pending.solid
+
+    def _add(self, key, version, solid):
+        size = _footprint(solid)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (version, solid, size)
+            self.size += size
+            # A solid bigger than the whole budget evicts everything,
+            # itself included.
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        version, solid, size = self._entries.pop(key)
+        self.size -= size
@@ -0,0 +1,234 @@
+
+import argparse
+import itertools
+import os
+import sys
+import threading
+import time
+
+from stl.ascii import AsciiStlReader, AsciiStlWriter
+from stl.binary import (
+    BinaryStlReader, BinaryStlWriter, HEADER_SIZE, RECORD_SIZE,
+)
+from stl.instrumentation import Instrumentation
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+_FORMATS = ('binary', 'ascii')
+
+# Marks the end of the batches passed between threads.
+_DONE = object()
+
+
+def _batches(facets, batch_size):
+    facets = iter(facets)
+    while True:
+        batch = list(itertools.islice(facets, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _threaded_batches(facets, batch_size, queue_size):
+    """
+    Yield the batches of ``facets`` as read by a separate thread, which
+    stays at most ``queue_size`` batches ahead.
+    """
+    batches = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(item):
+        # Give up if the consumer has gone away, rather than blocking on a
+        # full queue forever.
+        while not stopped.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for batch in _batches(facets, batch_size):
+                if not put(batch):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=produce, name='stl-convert-reader')
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _DONE:
+                return
+            if isinstance(batch, BaseException):
+                raise batch
+            yield batch
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def convert(src, dst, to='binary', threaded=False, batch_size=4096,
+            queue_size=8):
+    """
+    Convert an STL file to the format ``to`` (``'binary'`` or ``'ascii'``)
+    from the other format, without holding the whole mesh in memory.
+
+    ``src`` and ``dst`` are either paths or file-like objects. Files must be
+    opened in binary mode for the binary format and text mode for the ASCII
+    format. ``dst`` doesn't have to be seekable. When ``dst`` is a path the
+    output is written to a temporary file beside it, which only replaces
+    ``dst`` once the conversion succeeds, so a source that turns out to be
+    invalid part way through doesn't leave a truncated file behind.
+
+    Facets are passed from the reader to the writer ``batch_size`` at a
+    time. If ``threaded`` is set, reading happens on a separate thread
+    that stays at most ``queue_size`` batches ahead of the writer.
+
+    Returns a :py:class:`dict` describing the conversion: the number of
+    ``facets``, ``bytes_read``, ``bytes_written``, elapsed ``seconds`` and
+    ``facets_per_second``.
+    """
+    if to not in _FORMATS:
+        raise ValueError("to must be one of %r" % (_FORMATS,))
+    src_binary = to == 'ascii'
+
+    opened = []
+    partial = None
+    try:
+        if not hasattr(src, 'read'):
+            src = open(src, 'rb' if src_binary else 'r')
+            opened.append(src)
+        if not hasattr(dst, 'write'):
+            path = dst
+            partial = '%s.%d.partial' % (path, os.getpid())
+            dst = open(partial, 'w' if src_binary else 'wb')
+            opened.append(dst)
+        result = _convert(src, dst, src_binary, threaded, batch_size,
+                          queue_size)
+        for f in opened:
+            f.close()
+        if partial is not None:
+            os.rename(partial, path)
+            partial = None
+        return result
+    finally:
+        for f in opened:
+            f.close()
+        if partial is not None:
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+
+
+def _convert(src, dst, src_binary, threaded, batch_size, queue_size):
+    stats = Instrumentation()
+    src = stats.wrap_file(src)
+
+    started = time.time()
+    if src_binary:
+        reader = BinaryStlReader(src)
+        writer = AsciiStlWriter(
+            stats.wrap_file(dst), name=reader.name or None,
+        )
+    else:
+        reader = AsciiStlReader(src)
+        # The binary writer may write its header twice, so its output size
+        # is worked out from the facet count instead.
+        writer = BinaryStlWriter(dst)
+
+    if threaded:
+        batches = _threaded_batches(reader, batch_size, queue_size)
+    else:
+        batches = _batches(reader, batch_size)
+
+    with writer:
+        for batch in batches:
+            writer.write_facets(batch)
+    seconds = time.time() - started
+
+    if src_binary:
+        bytes_written = stats.bytes_written
+    else:
+        bytes_written = (
+            HEADER_SIZE + writer.facet_count * RECORD_SIZE
+        )
+
+    return {
+        'facets': writer.facet_count,
+        'bytes_read': stats.bytes_read,
+        'bytes_written': bytes_written,
+        'seconds': seconds,
+        'facets_per_second': writer.facet_count / seconds if seconds else None,
+    }
+
+
+def main(argv=None):
+    """
+    Entry point for the ``stl-convert`` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog='stl-convert',
+        description='Convert STL files between the binary and ASCII formats.',
+    )
+    parser.add_argument('src', help="input file, or - for stdin")
+    parser.add_argument('dst', help="output file, or - for stdout")
+    parser.add_argument(
+        '--to', choices=_FORMATS, default='binary',
+        help="format to convert to (default: %(default)s)",
+    )
+    parser.add_argument(
+        '--threaded', action='store_true',
+        help="read and write on separate threads",
+    )
+    parser.add_argument(
+        '--batch-size', type=int, default=4096,
+        help="facets per batch (default: %(default)s)",
+    )
+    parser.add_argument(
+        '--quiet', action='store_true',
+        help="don't report throughput on stderr",
+    )
+    args = parser.parse_args(argv)
+
+    src, dst = args.src, args.dst
+    if src == '-':
+        src = sys.stdin
+        if args.to == 'ascii':
+            src = getattr(src, 'buffer', src)
+    if dst == '-':
+        dst = sys.stdout
+        if args.to == 'binary':
+            dst = getattr(dst, 'buffer', dst)
+
+    result = convert(src, dst, to=args.to, threaded=args.threaded,
+                     batch_size=args.batch_size)
+    if dst is not args.dst:
+        dst.flush()
+
+    if not args.quiet:
+        sys.stderr.write(
+            "%d facets, %d bytes read, %d bytes written in %.3fs "
+            "(%.0f facets/s)\n" % (
+                result['facets'],
+                result['bytes_read'],
+                result['bytes_written'],
+                result['seconds'],
+                result['facets_per_second'] or 0,
+            )
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1409 @@
+
+import itertools
+
+import numpy
+
+
+# Vertex index pairs for the edges of a triangle.
+_EDGES = ((0, 1), (1, 2), (2, 0))
+
+# Number of triangle and plane intersections computed at a time when
+# slicing.
+_SLICE_BATCH = 1 << 18
+
+
+# Odd multipliers for hashing the bits of coordinates.
+_HASH_MULTIPLIERS = numpy.array([
+    0x9e3779b97f4a7c15, 0xc2b2ae3d27d4eb4f, 0x165667b19e3779f9,
+], dtype=numpy.uint64)
+
+
+def _row_changes(columns):
+    """
+    Return whether each row of the sorted ``columns`` differs from the one
+    before it.
+    """
+    changes = numpy.ones(len(columns[0]), dtype=bool)
+    changes[1:] = columns[0][1:] != columns[0][:-1]
+    for column in columns[1:]:
+        changes[1:] |= column[1:] != column[:-1]
+    return changes
+
+
+def _weld(points):
+    """
+    Return the distinct rows of ``points``, an ``(n, 3)`` array, and for
+    each row the index of its distinct row. Rows only match if their
+    coordinates are identical.
+    """
+    # Adding zero turns negative zeros into zeros.
+    points = numpy.ascontiguousarray(points, dtype=numpy.float64) + 0.0
+    bits = points.view(numpy.uint64)
+    # Sorting by a hash of the coordinates is much quicker than sorting by
+    # the coordinates themselves.
+    keys = numpy.zeros(len(points), dtype=numpy.uint64)
+    for k, multiplier in enumerate(_HASH_MULTIPLIERS):
+        keys ^= bits[:, k]
+        keys *= multiplier
+        keys ^= keys >> numpy.uint64(31)
+    order = numpy.argsort(keys)
+    sorted_keys = keys[order]
+    new_point = numpy.ones(len(points), dtype=bool)
+    new_point[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    inverse = numpy.empty(len(points), dtype=numpy.intp)
+    inverse[order] = numpy.cumsum(new_point) - 1
+    distinct = bits[order[new_point]]
+    if not numpy.array_equal(numpy.take(distinct, inverse, axis=0), bits):
+        # Different points with the same hash were taken as one.
+        columns = [bits[:, k] for k in range(3)]
+        order = numpy.lexsort(columns[::-1])
+        new_point = _row_changes([column[order] for column in columns])
+        inverse[order] = numpy.cumsum(new_point) - 1
+        distinct = bits[order[new_point]]
+    # Numbering the distinct points in order of their first appearance
+    # keeps indexed meshes close to the order of their triangles, which
+    # makes later gathers and scatters over them much more cache friendly.
+    firsts = numpy.minimum.reduceat(order, numpy.flatnonzero(new_point)) \
+        if len(order) else order
+    appearance = numpy.argsort(firsts)
+    rank = numpy.empty(len(appearance), dtype=numpy.intp)
+    rank[appearance] = numpy.arange(len(appearance))
+    return distinct[appearance].view(numpy.float64), rank[inverse]
+
+
+def _plane_segments(triangles, heights):
+    """
+    Intersect each triangle with the horizontal plane at the matching
+    height, all of which must cross it, and return the ``(start, end)``
+    points of the segments.
+
+    A vertex lying on a plane counts as above it, so that an edge in the
+    plane belongs to the triangle below it. Segments run anticlockwise
+    around the solid when viewed from above, according to the triangles'
+    winding.
+    """
+    above = triangles[:, :, 2] >= heights[:, None]
+    points = numpy.empty((len(triangles), 3, 3))
+    crossing = numpy.empty((len(triangles), 3), dtype=bool)
+    for edge, (i, j) in enumerate(_EDGES):
+        crossing[:, edge] = above[:, i] != above[:, j]
+        # Interpolate from the lower to the upper end of the edge, so that
+        # the triangles on either side of it get identical points.
+        swap = above[:, i][:, None]
+        low = numpy.where(swap, triangles[:, j], triangles[:, i])
+        high = numpy.where(swap, triangles[:, i], triangles[:, j])
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            t = (heights - low[:, 2]) / (high[:, 2] - low[:, 2])
+            points[:, edge] = numpy.where(
+                (t >= 1)[:, None], high, low + t[:, None] * (high - low),
+            )
+    points[:, :, 2] = heights[:, None]
+
+    # Each crossing triangle has exactly two crossing edges.
+    edges = numpy.argsort(~crossing, axis=1, kind='stable')[:, :2]
+    rows = numpy.arange(len(triangles))
+    start = points[rows, edges[:, 0]]
+    end = points[rows, edges[:, 1]]
+
+    normals = numpy.cross(
+        triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0],
+    )
+    direction = end - start
+    backwards = (
+        direction[:, 1] * normals[:, 0] - direction[:, 0] * normals[:, 1]
+    ) < 0
+    start[backwards], end[backwards] = end[backwards], start[backwards]
+    return start, end
+
+
+def _chain(start, end):
+    """
+    Join segments that share endpoints into polylines.
+    """
+    count = len(start)
+    points, ids = _weld(numpy.concatenate([start, end]))
+    start_ids = ids[:count]
+    end_ids = ids[count:]
+
+    by_start = numpy.full(len(points), -1, dtype=numpy.intp)
+    by_start[start_ids] = numpy.arange(count)
+    has_predecessor = numpy.zeros(len(points), dtype=bool)
+    has_predecessor[end_ids] = True
+
+    by_start = by_start.tolist()
+    end_ids = end_ids.tolist()
+    start_ids = start_ids.tolist()
+    used = [False] * count
+    # Open chains are followed from their beginnings first, so that they
+    # aren't picked up part way along.
+    first = [i for i in range(count)
+             if not has_predecessor[start_ids[i]]]
+    polylines = []
+    for segment in first + list(range(count)):
+        if used[segment]:
+            continue
+        chain = [start_ids[segment]]
+        while segment >= 0 and not used[segment]:
+            used[segment] = True
+            chain.append(end_ids[segment])
+            segment = by_start[end_ids[segment]]
+        polylines.append(points[chain])
+    return polylines
+
+
+def slice_triangles(triangles, heights):
+    """
+    Intersect ``triangles`` with horizontal planes at each of ``heights``.
+
+    Returns a list with an entry for each height, in the given order. Each
+    entry is a list of polylines, given as arrays of shape ``(k, 3)``. A
+    closed polyline ends with its first point.
+    """
+    triangles = numpy.asarray(triangles, dtype=numpy.float64)
+    heights = numpy.asarray(heights, dtype=numpy.float64).ravel()
+    order = numpy.argsort(heights, kind='stable')
+    sorted_heights = heights[order]
+    layer_count = len(heights)
+
+    # Each triangle crosses the planes with zmin < z <= zmax, which form a
+    # run of the sorted heights: first <= layer < last.
+    z = triangles[:, :, 2]
+    first = numpy.searchsorted(sorted_heights, z.min(axis=1), side='right')
+    last = numpy.searchsorted(sorted_heights, z.max(axis=1), side='right')
+
+    # Triangles sorted by their first layer, so that those that can cross
+    # a group of layers are found without scanning them all.
+    by_first = numpy.argsort(first, kind='stable')
+    sorted_first = first[by_first]
+
+    # The layers are handled in groups crossed by about _SLICE_BATCH
+    # triangles in total, to bound the memory used.
+    per_layer = numpy.cumsum(
+        numpy.bincount(first, minlength=layer_count + 1) -
+        numpy.bincount(last, minlength=layer_count + 1)
+    )[:layer_count]
+    groups = numpy.cumsum(per_layer) // _SLICE_BATCH
+    bounds = [0] + (numpy.flatnonzero(numpy.diff(groups)) + 1).tolist()
+    bounds.append(layer_count)
+
+    result = [[] for height in heights]
+    for group_start, group_stop in zip(bounds[:-1], bounds[1:]):
+        candidates = by_first[
+            :numpy.searchsorted(sorted_first, group_stop, side='left')
+        ]
+        facets = candidates[last[candidates] > group_start]
+        lo = numpy.maximum(first[facets], group_start)
+        counts = numpy.minimum(last[facets], group_stop) - lo
+        offsets = numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        layers = (
+            numpy.arange(offsets.size) - offsets + numpy.repeat(lo, counts)
+        )
+        facets = numpy.repeat(facets, counts)
+
+        by_layer = numpy.argsort(layers, kind='stable')
+        facets = facets[by_layer]
+        layers = layers[by_layer]
+        start, end = _plane_segments(
+            triangles[facets], sorted_heights[layers],
+        )
+
+        # Segments of a single point come from planes touching a vertex.
+        keep = numpy.any(start != end, axis=1)
+        start, end, layers = start[keep], end[keep], layers[keep]
+
+        splits = numpy.searchsorted(
+            layers, numpy.arange(group_start, group_stop + 1),
+        )
+        for layer in range(group_start, group_stop):
+            lo, hi = splits[layer - group_start:layer - group_start + 2]
+            if hi > lo:
+                result[order[layer]] = _chain(start[lo:hi], end[lo:hi])
+    return result
+
+
+def weld_triangles(triangles):
+    """
+    Return an indexed form of ``triangles``: an array of the distinct
+    vertices and an ``(n, 3)`` array of indices into it for each triangle.
+    """
+    triangles = numpy.asarray(triangles, dtype=numpy.float64)
+    points, ids = _weld(triangles.reshape(-1, 3))
+    return points, ids.reshape(-1, 3)
+
+
+# Indices of the ten distinct entries of a symmetric 4x4 quadric, in the
+# order a*a, a*b, a*c, a*d, b*b, b*c, b*d, c*c, c*d, d*d. Quadrics are
+# stored as arrays of shape (10, n), one row per entry.
+_QUADRIC_ROWS = (0, 0, 0, 0, 1, 1, 1, 2, 2, 3)
+_QUADRIC_COLUMNS = (0, 1, 2, 3, 1, 2, 3, 2, 3, 3)
+
+# Number of edges whose collapse costs are computed at a time.
+_COST_BATCH = 1 << 20
+
+# Number of rounds of picking edges to collapse in each decimation pass, or
+# more if none of the edges picked so far can be collapsed.
+_MATCHING_ROUNDS = 3
+
+
+def _face_quadrics(points, faces):
+    """
+    Return the quadric of the plane of each face, weighted by its area.
+    """
+    normals = _face_normals(points, faces)
+    doubled_area = numpy.sqrt(numpy.einsum('ij,ij->i', normals, normals))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        unit = normals / doubled_area[:, None]
+    unit[doubled_area == 0] = 0.0
+    plane = numpy.empty((4, len(faces)))
+    plane[:3] = unit.T
+    plane[3] = -numpy.einsum('ij,ij->i', unit, points[faces[:, 0]])
+    weight = doubled_area / 2
+    return numpy.stack([
+        plane[i] * plane[j] * weight
+        for i, j in zip(_QUADRIC_ROWS, _QUADRIC_COLUMNS)
+    ])
+
+
+def _vertex_quadrics(vertex_count, faces, face_quadrics):
+    """
+    Return the sum of the quadrics of the faces around each vertex.
+    """
+    corners = faces.ravel()
+    return numpy.stack([
+        numpy.bincount(
+            corners, weights=numpy.repeat(row, 3), minlength=vertex_count,
+        )
+        for row in face_quadrics
+    ])
+
+
+def _quadric_error(q, v):
+    x, y, z = v[:, 0], v[:, 1], v[:, 2]
+    return (
+        x * (q[0] * x + 2 * (q[1] * y + q[2] * z + q[3])) +
+        y * (q[4] * y + 2 * (q[5] * z + q[6])) +
+        z * (q[7] * z + 2 * q[8]) + q[9]
+    )
+
+
+def _collapse_targets(q, first, second):
+    """
+    Return the position minimizing the quadric ``q`` for collapsing each
+    edge from ``first`` to ``second``, and the error there.
+
+    The minimum is found by solving the quadric's linear system where it is
+    well conditioned and the solution is close to the edge. Elsewhere the
+    best of the ends and the midpoint of the edge is used.
+    """
+    a, b, c, d, e, f, g, h, i = q[:9]
+    # The inverse of [[a, b, c], [b, e, f], [c, f, h]] by cofactors.
+    c00 = e * h - f * f
+    c01 = c * f - b * h
+    c02 = b * f - c * e
+    c11 = a * h - c * c
+    c12 = b * c - a * f
+    c22 = a * e - b * b
+    det = a * c00 + b * c01 + c * c02
+    scale = numpy.maximum(numpy.abs(a) + numpy.abs(e) + numpy.abs(h), 1e-300)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        optimal = -numpy.stack([
+            c00 * d + c01 * g + c02 * i,
+            c01 * d + c11 * g + c12 * i,
+            c02 * d + c12 * g + c22 * i,
+        ], axis=1) / det[:, None]
+    # Nearly flat neighbourhoods give nearly singular systems, whose
+    # solutions can be far from the edge.
+    middle = (first + second) / 2
+    reach = numpy.einsum('ij,ij->i', second - first, second - first)
+    offset = optimal - middle
+    solvable = (
+        (numpy.abs(det) > 1e-6 * scale ** 3) &
+        (numpy.einsum('ij,ij->i', offset, offset) <= reach)
+    )
+    optimal[~solvable] = middle[~solvable]
+    errors = _quadric_error(q, optimal)
+
+    fallback = numpy.flatnonzero(~solvable)
+    if len(fallback):
+        q = q[:, fallback]
+        for candidate in (first[fallback], second[fallback]):
+            candidate_errors = _quadric_error(q, candidate)
+            better = candidate_errors < errors[fallback]
+            optimal[fallback[better]] = candidate[better]
+            errors[fallback[better]] = candidate_errors[better]
+    return optimal, errors
+
+
+def _unique_edges(faces, vertex_count):
+    """
+    Return the distinct edges of ``faces`` as ``(first, second)`` pairs
+    with ``first < second``, and how many faces each belongs to.
+    """
+    first = faces.ravel()
+    second = faces[:, [1, 2, 0]].ravel()
+    low = numpy.minimum(first, second).astype(numpy.int64)
+    high = numpy.maximum(first, second).astype(numpy.int64)
+    keys, counts = numpy.unique(low * vertex_count + high, return_counts=True)
+    return keys // vertex_count, keys % vertex_count, counts
+
+
+def _face_normals(points, faces):
+    a = points[faces[:, 0]]
+    return numpy.cross(points[faces[:, 1]] - a, points[faces[:, 2]] - a)
+
+
+def _neighbour_minimum(values, ring_first, ring_second):
+    """
+    Return the minimum of ``values`` over each vertex and its neighbours,
+    given the edges of the mesh as ``ring_first`` and ``ring_second``.
+    """
+    result = values.copy()
+    numpy.minimum.at(result, ring_first, values[ring_second])
+    numpy.minimum.at(result, ring_second, values[ring_first])
+    return result
+
+
+def _local_minima(first, second, rank, ring_first, ring_second,
+                  vertex_count):
+    """
+    Return which edges rank lower than every other edge with an end at or
+    next to either of their ends, given the edges of the whole mesh as
+    ``ring_first`` and ``ring_second``. No end of one of these edges is an
+    end or a neighbour of an end of another.
+    """
+    best = numpy.full(vertex_count, numpy.iinfo(rank.dtype).max,
+                      dtype=rank.dtype)
+    numpy.minimum.at(best, first, rank)
+    numpy.minimum.at(best, second, rank)
+    best = _neighbour_minimum(best, ring_first, ring_second)
+    return (best[first] == rank) & (best[second] == rank)
+
+
+class _Neighbourhoods(object):
+    """
+    The edges and faces of a mesh, for checking edge collapses.
+    """
+
+    def __init__(self, points, faces, first, second):
+        vertex_count = len(points)
+        self.points = points
+        self.faces = faces
+        self.first = first
+        self.second = second
+        self.keys = first * vertex_count + second
+        self.degree = (
+            numpy.bincount(first, minlength=vertex_count) +
+            numpy.bincount(second, minlength=vertex_count)
+        )
+
+    def manifold(self, first, second):
+        """
+        Return which of the interior edges ``first``, ``second`` can be
+        collapsed without making the mesh non-manifold. The edges must not
+        share ends.
+
+        An edge can be collapsed if its ends have no common neighbours
+        besides the opposite vertices of its two faces, and it isn't part
+        of a lone tetrahedron, which would collapse to two coincident faces.
+        """
+        vertex_count = len(self.points)
+        edge = numpy.full(vertex_count, -1, dtype=numpy.intp)
+        edge[first] = numpy.arange(len(first))
+        which = []
+        others = []
+        for ends, neighbours in ((self.first, self.second),
+                                 (self.second, self.first)):
+            found = numpy.flatnonzero(edge[ends] >= 0)
+            which.append(edge[ends[found]])
+            others.append(neighbours[found])
+        which = numpy.concatenate(which)
+        others = numpy.concatenate(others)
+        ends = second[which]
+        wanted = (
+            numpy.minimum(ends, others).astype(numpy.int64) * vertex_count +
+            numpy.maximum(ends, others)
+        )
+        found = numpy.searchsorted(self.keys, wanted)
+        found = self.keys[numpy.minimum(found, len(self.keys) - 1)] == wanted
+        common = numpy.bincount(which, weights=found, minlength=len(first))
+        tetrahedron = (self.degree[first] == 3) & (self.degree[second] == 3)
+        return (common == 2) & ~tetrahedron
+
+    def collapse(self, first, second, targets):
+        """
+        Work out the effect of collapsing each edge from ``first`` to
+        ``second``, moving ``first`` to ``targets``: returns the indices of
+        the faces around the edges, the edge each of them is around, those
+        faces afterwards, which of them survive and which of those turn
+        over.
+        """
+        vertex_count = len(self.points)
+        edge = numpy.full(vertex_count, -1, dtype=numpy.intp)
+        edge[first] = numpy.arange(len(first))
+        edge[second] = numpy.arange(len(first))
+        nearby = numpy.flatnonzero((edge[self.faces] >= 0).any(axis=1))
+        old_faces = self.faces[nearby]
+        corner_edges = edge[old_faces]
+        moved = corner_edges >= 0
+
+        new_faces = old_faces.copy()
+        new_faces[moved] = first[corner_edges[moved]]
+        corners = self.points[old_faces]
+        corners[moved] = targets[corner_edges[moved]]
+        alive = (
+            (new_faces[:, 0] != new_faces[:, 1]) &
+            (new_faces[:, 1] != new_faces[:, 2]) &
+            (new_faces[:, 2] != new_faces[:, 0])
+        )
+        old_normals = _face_normals(self.points, old_faces)
+        new_normals = numpy.cross(
+            corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0],
+        )
+        flipped = alive & (
+            numpy.einsum('ij,ij->i', old_normals, new_normals) <= 0
+        ) & numpy.any(old_normals != 0, axis=1)
+        return nearby, corner_edges.max(axis=1), new_faces, alive, flipped
+
+
+class _CollapseCosts(object):
+    """
+    The target positions and errors of collapsing the edges of a mesh, kept
+    between decimation passes so that only those of the edges around
+    collapsed ones are worked out again.
+    """
+
+    def __init__(self):
+        self.keys = numpy.zeros(0, dtype=numpy.int64)
+        self.targets = numpy.zeros((0, 3))
+        self.errors = numpy.zeros(0)
+        #: Whether each vertex has moved since the costs were worked out.
+        self.moved = None
+
+    def update(self, points, quadrics, first, second):
+        """
+        Return the targets and errors of collapsing each edge from
+        ``first`` to ``second``, which must be sorted.
+        """
+        keys = first.astype(numpy.int64) * len(points) + second
+        targets = numpy.empty((len(keys), 3))
+        errors = numpy.empty(len(keys))
+        if len(self.keys):
+            found = numpy.minimum(
+                numpy.searchsorted(self.keys, keys), len(self.keys) - 1,
+            )
+            known = self.keys[found] == keys
+            if self.moved is not None:
+                known &= ~(self.moved[first] | self.moved[second])
+            targets[known] = self.targets[found[known]]
+            errors[known] = self.errors[found[known]]
+            todo = numpy.flatnonzero(~known)
+        else:
+            todo = numpy.arange(len(keys))
+        for start in range(0, len(todo), _COST_BATCH):
+            part = todo[start:start + _COST_BATCH]
+            a, b = first[part], second[part]
+            targets[part], errors[part] = _collapse_targets(
+                quadrics[:, a] + quadrics[:, b], points[a], points[b],
+            )
+        self.keys, self.targets, self.errors = keys, targets, errors
+        self.moved = numpy.zeros(len(points), dtype=bool)
+        return targets, errors
+
+
+def _decimation_pass(points, faces, quadrics, costs, wanted):
+    """
+    Collapse up to ``wanted`` edges of the mesh at once, none of which are
+    within an edge of each other, in order of the quadric error of
+    collapsing them.
+
+    Returns the new faces and the number of edges collapsed, which is only
+    zero if no edge can be collapsed.
+    """
+    vertex_count = len(points)
+    all_first, all_second, counts = _unique_edges(faces, vertex_count)
+
+    # Vertices on the boundary of an open surface, or on edges shared by
+    # more than two faces, are left where they are.
+    locked = numpy.zeros(vertex_count, dtype=bool)
+    irregular = counts != 2
+    locked[all_first[irregular]] = True
+    locked[all_second[irregular]] = True
+    movable = ~(locked[all_first] | locked[all_second])
+    first, second = all_first[movable], all_second[movable]
+    if not len(first):
+        return faces, 0
+
+    targets, errors = costs.update(points, quadrics, first, second)
+    rank = numpy.empty(len(errors), dtype=numpy.intp)
+    rank[numpy.argsort(errors, kind='stable')] = numpy.arange(len(errors))
+
+    # Edges are picked in rounds, each taking the edges that rank lowest in
+    # their neighbourhoods, so that no two collapses touch the same faces or
+    # change each other's neighbourhoods. Each collapse can then be checked
+    # against the mesh as it is, and rejected ones don't hold up the rest.
+    mesh = _Neighbourhoods(points, faces, all_first, all_second)
+    blocked = numpy.zeros(vertex_count, dtype=bool)
+    chosen = []
+    changes = []
+    remaining = numpy.arange(len(first))
+    for round in itertools.count():
+        picked = remaining[_local_minima(
+            first[remaining], second[remaining], rank[remaining],
+            all_first, all_second, vertex_count,
+        )]
+        valid = mesh.manifold(first[picked], second[picked])
+        # Collapses that would turn faces over are rejected.
+        nearby, owners, new_faces, alive, flipped = mesh.collapse(
+            first[picked], second[picked], targets[picked],
+        )
+        valid[owners[flipped]] = False
+        accepted = picked[valid]
+        chosen.append(accepted)
+        changes.append((nearby, picked[owners], new_faces, alive))
+
+        used = numpy.zeros(vertex_count, dtype=bool)
+        used[first[accepted]] = True
+        used[second[accepted]] = True
+        blocked |= used
+        blocked[all_first[used[all_second]]] = True
+        blocked[all_second[used[all_first]]] = True
+        left = ~(blocked[first[remaining]] | blocked[second[remaining]])
+        left[numpy.searchsorted(remaining, picked[~valid])] = False
+        remaining = remaining[left]
+
+        count = sum(len(c) for c in chosen)
+        if count >= wanted or not len(remaining) or (
+                round + 1 >= _MATCHING_ROUNDS and count):
+            break
+    chosen = numpy.concatenate(chosen)
+    if not len(chosen):
+        return faces, 0
+    chosen = chosen[numpy.argsort(rank[chosen], kind='stable')][:wanted]
+    keep, gone = first[chosen], second[chosen]
+
+    # The collapses were worked out as they were picked.
+    applied = numpy.zeros(len(first), dtype=bool)
+    applied[chosen] = True
+    nearby, owners, new_faces, alive = [
+        numpy.concatenate(parts) for parts in zip(*changes)
+    ]
+    applied = applied[owners]
+    nearby, new_faces, alive = (
+        nearby[applied], new_faces[applied], alive[applied],
+    )
+
+    points[keep] = targets[chosen]
+    quadrics[:, keep] += quadrics[:, gone]
+    costs.moved[keep] = True
+    faces = faces.copy()
+    faces[nearby] = new_faces
+    dead = numpy.zeros(len(faces), dtype=bool)
+    dead[nearby[~alive]] = True
+    return faces[~dead], len(chosen)
+
+
+def decimate_triangles(triangles, target):
+    """
+    Reduce ``triangles`` to about ``target`` triangles by collapsing edges
+    in order of their quadric error, and return the new triangles.
+
+    The triangles are welded into an indexed mesh on exactly matching
+    vertices first. Edges are collapsed in passes, each collapsing many
+    edges at once whose ends aren't neighbours of each other. Collapses
+    that would join two sheets of the surface or turn faces over are
+    skipped, so closed manifold meshes stay closed and manifold, and
+    vertices on open boundaries or non-manifold edges are kept in place.
+    """
+    points, faces = weld_triangles(triangles)
+    faces = faces[
+        (faces[:, 0] != faces[:, 1]) &
+        (faces[:, 1] != faces[:, 2]) &
+        (faces[:, 2] != faces[:, 0])
+    ]
+    quadrics = _vertex_quadrics(
+        len(points), faces, _face_quadrics(points, faces),
+    )
+    costs = _CollapseCosts()
+    while len(faces) > target:
+        # Each collapse removes about two faces.
+        wanted = max(1, (len(faces) - target + 1) // 2)
+        faces, collapsed = _decimation_pass(
+            points, faces, quadrics, costs, wanted,
+        )
+        if not collapsed:
+            break
+    return points[faces]
+
+
+def _union_roots(count, first, second):
+    """
+    Return the root of each of ``count`` nodes after joining the pairs of
+    nodes ``first[k]`` and ``second[k]``, which is the smallest node in its
+    component.
+    """
+    parent = numpy.arange(count)
+    while len(first):
+        a = parent[first]
+        b = parent[second]
+        apart = a != b
+        if not numpy.any(apart):
+            break
+        first, second = first[apart], second[apart]
+        a, b = a[apart], b[apart]
+        # Each root is hooked under the smallest root it is joined to, and
+        # then every node is pointed straight at its root again.
+        numpy.minimum.at(parent, numpy.maximum(a, b), numpy.minimum(a, b))
+        while True:
+            grandparent = parent[parent]
+            if numpy.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def facet_components(points, facet_sizes):
+    """
+    Label the facets that are connected through shared vertices.
+
+    ``points`` holds the vertices of all the facets one after the other,
+    ``facet_sizes[k]`` of them for facet ``k``. Vertices are shared when
+    their coordinates are identical. Returns the component of each facet,
+    numbered from zero in the order of their first facets, and the number
+    of components.
+    """
+    facet_sizes = numpy.asarray(facet_sizes, dtype=numpy.intp)
+    if not len(facet_sizes):
+        return numpy.zeros(0, dtype=numpy.intp), 0
+    welded, ids = _weld(points)
+    starts = numpy.cumsum(facet_sizes) - facet_sizes
+    # Joining each vertex to its facet's first vertex joins the facet.
+    firsts = numpy.repeat(ids[starts], facet_sizes)
+    roots = _union_roots(len(welded), firsts, ids)[ids[starts]]
+    roots, first_facets, labels = numpy.unique(
+        roots, return_index=True, return_inverse=True,
+    )
+    # Renumber the components in the order they first appear.
+    rank = numpy.empty(len(roots), dtype=numpy.intp)
+    rank[numpy.argsort(first_facets)] = numpy.arange(len(roots))
+    return rank[labels.ravel()], len(roots)
+
+
+def _facet_edges(ids, facet_sizes):
+    """
+    Return the facet of each directed edge of the facets, whose vertex
+    ``ids`` are given one facet after another, and the edges' start and
+    end vertices.
+    """
+    starts = numpy.cumsum(facet_sizes) - facet_sizes
+    following = numpy.arange(1, len(ids) + 1)
+    following[starts + facet_sizes - 1] = starts
+    facets = numpy.repeat(numpy.arange(len(facet_sizes)), facet_sizes)
+    return facets, ids, ids[following]
+
+
+def _edge_neighbours(facets, start, end, vertex_count):
+    """
+    Return the pairs of facets that meet at edges shared by exactly two
+    facets, and for each pair whether the facets run along the edge in the
+    same direction, which means that their windings disagree.
+    """
+    low = numpy.minimum(start, end).astype(numpy.int64)
+    high = numpy.maximum(start, end).astype(numpy.int64)
+    keys = low * vertex_count + high
+    order = numpy.argsort(keys, kind='stable')
+    keys = keys[order]
+    group_starts = numpy.flatnonzero(
+        numpy.concatenate([[True], keys[1:] != keys[:-1]])
+    )
+    sizes = numpy.diff(numpy.append(group_starts, len(keys)))
+    pairs = group_starts[sizes == 2]
+    first, second = order[pairs], order[pairs + 1]
+    facet_a, facet_b = facets[first], facets[second]
+    distinct = facet_a != facet_b
+    return (
+        facet_a[distinct], facet_b[distinct],
+        (start[first] == start[second])[distinct],
+    )
+
+
+def _propagate_flips(facet_count, facet_a, facet_b, disagree, seeds):
+    """
+    Work out which facets to flip so that neighbouring facets agree with
+    each other, by a breadth-first traversal from the ``seeds``, one per
+    component, which keep their orientation.
+
+    Each step of the traversal handles a whole level of facets at once.
+    Where the facets can't all agree, as on a Moebius strip, the first
+    orientation reached wins.
+    """
+    nodes = numpy.concatenate([facet_a, facet_b])
+    order = numpy.argsort(nodes, kind='stable')
+    neighbours = numpy.concatenate([facet_b, facet_a])[order]
+    parities = numpy.concatenate([disagree, disagree])[order]
+    degrees = numpy.bincount(nodes, minlength=facet_count)
+    offsets = numpy.cumsum(degrees) - degrees
+
+    flip = numpy.zeros(facet_count, dtype=bool)
+    visited = numpy.zeros(facet_count, dtype=bool)
+    visited[seeds] = True
+    frontier = seeds
+    while len(frontier):
+        counts = degrees[frontier]
+        total = counts.sum()
+        if not total:
+            break
+        # Positions of the frontier's adjacency lists, concatenated.
+        positions = numpy.arange(total) + numpy.repeat(
+            offsets[frontier] - (numpy.cumsum(counts) - counts), counts,
+        )
+        sources = numpy.repeat(frontier, counts)
+        reached = neighbours[positions]
+        new = ~visited[reached]
+        reached = reached[new]
+        flips = flip[sources[new]] ^ parities[positions[new]]
+        frontier, first = numpy.unique(reached, return_index=True)
+        flip[frontier] = flips[first]
+        visited[frontier] = True
+    return flip
+
+
+def orient_facets(points, facet_sizes):
+    """
+    Work out which facets to reverse so that the facets wind consistently
+    and face outwards.
+
+    ``points`` holds the vertices of all the facets one after the other,
+    ``facet_sizes[k]`` of them for facet ``k``. Facets are neighbours where
+    they share an edge, by vertices with identical coordinates, that no
+    other facet shares. Within each connected set of neighbours the
+    orientation is propagated from its first facet, and then the whole set
+    is reversed if its signed volume is negative, or, for a flat surface,
+    if that reverses fewer facets.
+
+    Returns a boolean array which is true for the facets to reverse.
+    """
+    facet_sizes = numpy.asarray(facet_sizes, dtype=numpy.intp)
+    facet_count = len(facet_sizes)
+    if not facet_count:
+        return numpy.zeros(0, dtype=bool)
+    welded, ids = _weld(points)
+    facets, start, end = _facet_edges(ids, facet_sizes)
+    facet_a, facet_b, disagree = _edge_neighbours(
+        facets, start, end, len(welded),
+    )
+    roots = _union_roots(facet_count, facet_a, facet_b)
+    seeds = numpy.flatnonzero(roots == numpy.arange(facet_count))
+    flip = _propagate_flips(facet_count, facet_a, facet_b, disagree, seeds)
+
+    # Each edge contributes the signed volume of the tetrahedron between
+    # its facet's first vertex, the edge and the centre of the points.
+    welded = welded - welded.mean(axis=0)
+    anchors = numpy.repeat(
+        welded[ids[numpy.cumsum(facet_sizes) - facet_sizes]], facet_sizes,
+        axis=0,
+    )
+    contributions = numpy.einsum(
+        'ij,ij->i', anchors,
+        numpy.cross(welded[start] - anchors, welded[end] - anchors),
+    )
+    volumes = numpy.bincount(facets, weights=contributions,
+                             minlength=facet_count)
+    volumes[flip] = -volumes[flip]
+    shell_volumes = numpy.bincount(roots, weights=volumes,
+                                   minlength=facet_count)
+    magnitudes = numpy.bincount(roots, weights=numpy.abs(volumes),
+                                minlength=facet_count)
+    flipped = numpy.bincount(roots, weights=flip, minlength=facet_count)
+    sizes = numpy.bincount(roots, minlength=facet_count)
+    flat = numpy.abs(shell_volumes) <= 1e-9 * magnitudes
+    reverse = numpy.where(flat, 2 * flipped > sizes, shell_volumes < 0)
+    return flip ^ reverse[roots]
+
+
+# Maximum number of grid cells a facet's bounding box may cover before it
+# is compared against every other box instead.
+_MAX_BOX_CELLS = 64
+
+# Number of cell entries whose candidate pairs are generated at a time.
+_CELL_BATCH = 1 << 20
+
+
+def _box_pairs(low, high):
+    """
+    Return the pairs ``(i, j)``, with ``i < j``, of the axis-aligned boxes
+    given by their ``low`` and ``high`` corners that overlap.
+
+    The boxes are sorted into a uniform grid with cells about the size of
+    an average box. Within each cell they are swept in order of their low
+    ``x``, and only pairs that overlap along ``x`` are compared further. A
+    pair is only taken from the cell holding the low corner of the boxes'
+    overlap, so that each pair is found once. Boxes covering many cells
+    are compared against all the others directly.
+    """
+    count = len(low)
+    if count < 2:
+        return numpy.zeros((0, 2), dtype=numpy.intp)
+    origin = low.min(axis=0)
+    extent = float((high.max(axis=0) - origin).max())
+    size = max(float((high - low).max(axis=1).mean()), extent / (1 << 20),
+               1e-300)
+    cell_low = numpy.floor((low - origin) / size).astype(numpy.int64)
+    cell_high = numpy.floor((high - origin) / size).astype(numpy.int64)
+    spans = cell_high - cell_low + 1
+    cell_counts = spans.prod(axis=1)
+    large = cell_counts > _MAX_BOX_CELLS
+
+    # Each small box is entered into every cell it covers. The boxes are
+    # entered in order of their low x, which a stable sort by cell keeps.
+    small = numpy.flatnonzero(~large)
+    small = small[numpy.argsort(low[small, 0], kind='stable')]
+    counts = cell_counts[small]
+    boxes = numpy.repeat(small, counts)
+    local = numpy.arange(len(boxes)) - numpy.repeat(
+        numpy.cumsum(counts) - counts, counts,
+    )
+    box_spans = spans[boxes]
+    cells = cell_low[boxes] + numpy.stack([
+        local % box_spans[:, 0],
+        local // box_spans[:, 0] % box_spans[:, 1],
+        local // (box_spans[:, 0] * box_spans[:, 1]),
+    ], axis=1)
+    keys = (cells[:, 0] << 42) | (cells[:, 1] << 21) | cells[:, 2]
+    order = numpy.argsort(keys, kind='stable')
+    keys, boxes, cells = keys[order], boxes[order], cells[order]
+    # Copies of the boxes' data in the order of the entries, one axis at a
+    # time, so that pairs from the same cell read nearby memory.
+    entry_low = [low[boxes, k] for k in range(3)]
+    entry_high = [high[boxes, k] for k in range(3)]
+    entry_cell_low = [cell_low[boxes, k] for k in range(3)]
+    cells = [cells[:, k] for k in range(3)]
+
+    # Each entry's partners are the later entries in its cell that start
+    # before it ends along x. These are found with one search by ranking
+    # the entries on their cell's position plus their fraction of the
+    # width in x, allowing a little for rounding.
+    new_cell = numpy.ones(len(keys), dtype=bool)
+    new_cell[1:] = keys[1:] != keys[:-1]
+    cell_rank = numpy.cumsum(new_cell) - 1.0
+    width = float(high[:, 0].max() - origin[0]) or 1.0
+    positions = cell_rank + (entry_low[0] - origin[0]) / width * 0.5
+    limits = cell_rank + (entry_high[0] - origin[0]) / width * 0.5 + 1e-6
+    ends = numpy.minimum(
+        numpy.searchsorted(positions, limits, side='right'),
+        numpy.searchsorted(keys, keys, side='right'),
+    )
+
+    found = []
+    for start in range(0, len(keys), _CELL_BATCH):
+        stop = min(start + _CELL_BATCH, len(keys))
+        partners = ends[start:stop] - numpy.arange(start, stop) - 1
+        first = numpy.repeat(numpy.arange(start, stop), partners)
+        second = numpy.arange(len(first)) + numpy.repeat(
+            numpy.arange(start, stop) + 1 - (numpy.cumsum(partners) -
+                                             partners),
+            partners,
+        )
+        keep = numpy.ones(len(first), dtype=bool)
+        for k in range(3):
+            keep &= cells[k][first] == numpy.maximum(
+                entry_cell_low[k][first], entry_cell_low[k][second],
+            )
+            keep &= entry_low[k][first] <= entry_high[k][second]
+            keep &= entry_low[k][second] <= entry_high[k][first]
+        a, b = boxes[first[keep]], boxes[second[keep]]
+        found.append(numpy.stack([
+            numpy.minimum(a, b), numpy.maximum(a, b),
+        ], axis=1))
+
+    for i in numpy.flatnonzero(large).tolist():
+        others = numpy.flatnonzero(numpy.all(
+            (low[i] <= high) & (low <= high[i]), axis=1,
+        ))
+        others = others[(others != i) & ~(large[others] & (others < i))]
+        found.append(numpy.stack([
+            numpy.minimum(others, i), numpy.maximum(others, i),
+        ], axis=1))
+    return numpy.concatenate(found)
+
+
+def _orientation(a, b, c, d):
+    """
+    Return six times the signed volume of each tetrahedron ``abcd``.
+    """
+    return numpy.einsum('ij,ij->i', b - a, numpy.cross(c - a, d - a))
+
+
+def _segments_cross(p, q, a, b, c):
+    """
+    Return whether each segment ``pq`` meets the triangle ``abc``,
+    including touching it. Segments lying in the plane of their triangle
+    are not counted.
+    """
+    side_p = _orientation(a, b, c, p)
+    side_q = _orientation(a, b, c, q)
+    spans = (side_p * side_q <= 0) & ((side_p != 0) | (side_q != 0))
+    u = _orientation(p, q, a, b)
+    v = _orientation(p, q, b, c)
+    w = _orientation(p, q, c, a)
+    inside = ((u >= 0) & (v >= 0) & (w >= 0)) | \
+        ((u <= 0) & (v <= 0) & (w <= 0))
+    return spans & inside
+
+
+def _triangles_intersect(first, second, usable):
+    """
+    Return whether each pair of triangles intersect, testing the edges of
+    each against the other. ``usable`` holds, for the first and the second
+    triangles, a mask for each edge of which pairs to test it in.
+    """
+    hit = numpy.zeros(len(first), dtype=bool)
+    for edges, other, masks in ((first, second, usable[0]),
+                                (second, first, usable[1])):
+        for (i, j), mask in zip(_EDGES, masks):
+            test = numpy.flatnonzero(mask & ~hit)
+            if len(test):
+                hit[test] = _segments_cross(
+                    edges[test, i], edges[test, j],
+                    other[test, 0], other[test, 1], other[test, 2],
+                )
+    return hit
+
+
+# Number of candidate pairs of triangles tested at a time.
+_PAIR_BATCH = 1 << 18
+
+
+def intersecting_triangles(triangles):
+    """
+    Return the pairs ``(i, j)``, with ``i < j``, of ``triangles`` that
+    intersect each other, as an array of shape ``(k, 2)`` in order.
+
+    Candidate pairs are those whose bounding boxes overlap, which are then
+    tested exactly by intersecting the edges of each triangle with the
+    other. Triangles that share an edge, by vertices with identical
+    coordinates, are not reported, and those sharing a vertex are only
+    reported if they meet elsewhere as well. Overlaps between triangles in
+    the same plane are not detected.
+    """
+    triangles = numpy.asarray(triangles, dtype=numpy.float64)
+    pairs = _box_pairs(triangles.min(axis=1), triangles.max(axis=1))
+    ids = weld_triangles(triangles)[1]
+    normals = _face_normals(triangles.reshape(-1, 3),
+                            numpy.arange(3 * len(triangles)).reshape(-1, 3))
+    offsets = numpy.einsum('ij,ij->i', normals, triangles[:, 0])
+    found = []
+    for start in range(0, len(pairs), _PAIR_BATCH):
+        first, second = pairs[start:start + _PAIR_BATCH].T
+        first_ids, second_ids = ids[first], ids[second]
+        equal = [[first_ids[:, i] == second_ids[:, j] for j in range(3)]
+                 for i in range(3)]
+        # Whether each vertex of the first and second triangles is shared.
+        shared = (
+            [equal[i][0] | equal[i][1] | equal[i][2] for i in range(3)],
+            [equal[0][j] | equal[1][j] | equal[2][j] for j in range(3)],
+        )
+        candidate = (shared[0][0].astype(numpy.int8) + shared[0][1] +
+                     shared[0][2]) < 2
+        # Triangles whose other vertices all lie strictly on one side of
+        # the other's plane can't meet away from their shared vertex.
+        for this, other, this_shared in ((second, first, shared[1]),
+                                         (first, second, shared[0])):
+            normal, offset = normals[other], offsets[other]
+            above = numpy.ones(len(first), dtype=bool)
+            below = numpy.ones(len(first), dtype=bool)
+            for i in range(3):
+                distance = numpy.einsum(
+                    'ij,ij->i', triangles[this, i], normal,
+                ) - offset
+                above &= (distance > 0) | this_shared[i]
+                below &= (distance < 0) | this_shared[i]
+            candidate &= ~(above | below)
+        tested = numpy.flatnonzero(candidate)
+        first, second = first[tested], second[tested]
+        # Edges that end at a shared vertex always touch the other
+        # triangle there, so only the other edges are tested.
+        usable = [
+            [~(corners[i] | corners[(i + 1) % 3])[tested] for i in range(3)]
+            for corners in shared
+        ]
+        hit = _triangles_intersect(
+            triangles[first], triangles[second], usable,
+        )
+        found.append(numpy.stack([first[hit], second[hit]], axis=1))
+    if not found:
+        return numpy.zeros((0, 2), dtype=numpy.intp)
+    found = numpy.concatenate(found)
+    return found[numpy.lexsort((found[:, 1], found[:, 0]))]
+
+
+def sample_triangles(triangles, count, rng):
+    """
+    Pick ``count`` points uniformly at random on the surface made by
+    ``triangles``, using the :py:class:`numpy.random.Generator` ``rng``.
+
+    Returns the points, the unit normals of the triangles they lie on and
+    the indices of those triangles.
+    """
+    triangles = numpy.asarray(triangles, dtype=numpy.float64)
+    if count and not len(triangles):
+        raise ValueError("Can't sample points from an empty surface")
+    normals = numpy.cross(triangles[:, 1] - triangles[:, 0],
+                          triangles[:, 2] - triangles[:, 0])
+    areas = numpy.sqrt(numpy.einsum('ij,ij->i', normals, normals))
+    cumulative = numpy.cumsum(areas)
+    if count and not cumulative[-1] > 0:
+        raise ValueError("Can't sample points from a surface with no area")
+    targets = rng.random(count) * (cumulative[-1] if count else 0.0)
+    # Searching for the targets in order is much quicker, as successive
+    # searches visit the same parts of the cumulative areas.
+    order = numpy.argsort(targets)
+    indices = numpy.empty(count, dtype=numpy.intp)
+    indices[order] = numpy.searchsorted(cumulative, targets[order],
+                                        side='right')
+    # Rounding can take the search past the last triangle.
+    numpy.minimum(indices, len(triangles) - 1, out=indices)
+
+    # Taking the square root of one coordinate spreads the points evenly
+    # over each triangle rather than bunching them at its first vertex.
+    root = numpy.sqrt(rng.random(count))
+    along = rng.random(count)
+    chosen = triangles[indices]
+    points = chosen[:, 0].copy()
+    points += (chosen[:, 1] - points) * (root * (1 - along))[:, None]
+    points += (chosen[:, 2] - chosen[:, 0]) * (root * along)[:, None]
+    unit_normals = normals[indices] / areas[indices][:, None]
+    return points, unit_normals, indices
+
+
+# Largest number of grid cells, relative to the number of triangles, that
+# the triangles' bounding boxes may cover in total when finding the
+# closest triangles to points. Cells are made larger until they fit.
+_CELLS_PER_TRIANGLE = 8
+
+
+def _ranges(counts):
+    """
+    Return, for ranges of the given lengths laid end to end, the index of
+    the range each position falls in and the position within that range.
+    """
+    which = numpy.repeat(numpy.arange(len(counts)), counts)
+    local = numpy.arange(len(which)) - numpy.repeat(
+        numpy.cumsum(counts) - counts, counts,
+    )
+    return which, local
+
+
+def _cell_keys(cells):
+    return (cells[..., 0] << 42) | (cells[..., 1] << 21) | cells[..., 2]
+
+
+def _box_cells(low, high):
+    """
+    Return the index of each box and the cells it covers, given the
+    ranges of cells ``low`` to ``high`` inclusive covered by each box.
+    """
+    spans = high - low + 1
+    which, local = _ranges(spans[:, 0] * spans[:, 1] * spans[:, 2])
+    spans = spans[which]
+    return which, low[which] + numpy.stack([
+        local % spans[:, 0],
+        local // spans[:, 0] % spans[:, 1],
+        local // (spans[:, 0] * spans[:, 1]),
+    ], axis=1)
+
+
+def _corner_bounds(triangles):
+    """
+    Return the low and high corners of the bounding box of each triangle.
+    """
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    return (numpy.minimum(numpy.minimum(a, b), c),
+            numpy.maximum(numpy.maximum(a, b), c))
+
+
+class _TriangleGrid(object):
+    """
+    The triangles entered into a uniform grid of cells, each triangle in
+    every cell its bounding box covers, for finding the triangles closest
+    to points.
+    """
+
+    def __init__(self, triangles):
+        low, high = _corner_bounds(triangles)
+        self.origin = low.min(axis=0)
+        extent = float((high.max(axis=0) - self.origin).max())
+        sides = high - low
+        size = max(float(numpy.maximum(numpy.maximum(sides[:, 0],
+                                                     sides[:, 1]),
+                                       sides[:, 2]).mean()),
+                   extent / (1 << 20), 1e-300)
+        while True:
+            cell_low = self.cells(low, size)
+            cell_high = self.cells(high, size)
+            spans = cell_high - cell_low + 1
+            total = int((spans[:, 0] * spans[:, 1] * spans[:, 2]).sum())
+            if total <= _CELLS_PER_TRIANGLE * len(triangles) + (1 << 20):
+                break
+            size *= 2
+        self.size = size
+        self.top = self.cells(high.max(axis=0), size)
+        which, cells = _box_cells(cell_low, cell_high)
+        keys = _cell_keys(cells)
+        order = numpy.argsort(keys, kind='stable')
+        keys, self.entries = keys[order], which[order]
+        new = numpy.ones(len(keys), dtype=bool)
+        new[1:] = keys[1:] != keys[:-1]
+        starts = numpy.flatnonzero(new)
+        self.keys = keys[starts]
+        self.occupied = cells[order[starts]]
+        self.starts = starts
+        self.stops = numpy.append(starts[1:], len(keys))
+        self.low = list(low.T.copy())
+        self.high = list(high.T.copy())
+
+        # The triangles' data, one coordinate at a time, for working out
+        # distances to them: the corners, then for each edge its vector,
+        # the inverse of its squared length, the normal to it in the
+        # triangle's plane facing into the triangle and the position of
+        # the edge along that normal, then the triangle's unit normal.
+        a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+        normals = numpy.cross(b - a, c - a)
+        squares = numpy.einsum('ij,ij->i', normals, normals)
+        self.flat = squares == 0
+        data = [a, b, c]
+        for start, end in ((a, b), (b, c), (c, a)):
+            edge = end - start
+            length = numpy.einsum('ij,ij->i', edge, edge)
+            inward = numpy.cross(normals, edge)
+            data += [edge, (1 / numpy.where(length > 0, length, 1))[:, None],
+                     inward, numpy.einsum('ij,ij->i', inward, start)[:, None]]
+        data.append(normals / numpy.sqrt(
+            numpy.where(squares > 0, squares, 1),
+        )[:, None])
+        self.data = [column for block in data for column in block.T.copy()]
+
+    def cells(self, points, size=None):
+        return numpy.floor(
+            (points - self.origin) / (size or self.size)
+        ).astype(numpy.int64)
+
+    def lookup(self, cells):
+        """
+        Return the range of entries for each cell, which is empty for cells
+        holding no triangles.
+        """
+        keys = _cell_keys(cells)
+        found = numpy.searchsorted(self.keys, keys)
+        found = numpy.minimum(found, len(self.keys) - 1)
+        hit = self.keys[found] == keys
+        hit &= numpy.all((cells >= 0) & (cells <= self.top), axis=-1)
+        return (numpy.where(hit, self.starts[found], 0),
+                numpy.where(hit, self.stops[found], 0))
+
+    def update(self, best, nearest, points, point_ids, entry_ids):
+        """
+        Update the squared distances ``best`` and triangles ``nearest``
+        found so far for the points with the triangles of the entries. The
+        entries of each point must be together.
+        """
+        if not len(point_ids):
+            return
+        first, last = int(entry_ids.min()), int(entry_ids.max()) + 1
+        if last - first <= len(entry_ids):
+            # The triangles of nearby entries are gathered once, so that
+            # the pairs read their data from a small block of memory.
+            triangles = self.entries[first:last]
+            local = entry_ids - first
+        else:
+            triangles = self.entries[entry_ids]
+            local = numpy.arange(len(entry_ids))
+        points = points[point_ids]
+
+        # The distance to each triangle's bounding box is a lower bound on
+        # the distance to the triangle. The triangle with the closest box
+        # is measured first, and then only those whose boxes are closer
+        # than it, which are usually few.
+        bounds = 0
+        for k in range(3):
+            gap = numpy.maximum(self.low[k][triangles][local] - points[:, k],
+                                points[:, k] - self.high[k][triangles][local])
+            numpy.maximum(gap, 0, out=gap)
+            gap *= gap
+            bounds = bounds + gap
+        starts, sizes = _groups(point_ids)
+        closest = _first_lowest(bounds, starts, sizes)
+        self._record(best, nearest, point_ids[closest],
+                     triangles[local[closest]], points[closest])
+        near = bounds < numpy.repeat(best[point_ids[starts]], sizes)
+        near[closest] = False
+        near = numpy.flatnonzero(near)
+        if len(near):
+            self._record(best, nearest, point_ids[near],
+                         triangles[local[near]], points[near])
+
+    def _record(self, best, nearest, point_ids, which, points):
+        """
+        Measure the distance between each point and triangle, keeping the
+        closest for each point if it is closer than found so far.
+        """
+        squares = _squared_distances(
+            points, [column[which] for column in self.data], self.flat[which],
+        )
+        starts, sizes = _groups(point_ids)
+        lowest = numpy.minimum.reduceat(squares, starts)
+        first = _first_lowest(squares, starts, sizes)
+        ids = point_ids[starts]
+        better = lowest < best[ids]
+        best[ids[better]] = lowest[better]
+        nearest[ids[better]] = which[first[better]]
+
+
+def _groups(ids):
+    """
+    Return the start and size of each run of equal values in ``ids``.
+    """
+    new = numpy.ones(len(ids), dtype=bool)
+    new[1:] = ids[1:] != ids[:-1]
+    starts = numpy.flatnonzero(new)
+    return starts, numpy.diff(numpy.append(starts, len(ids)))
+
+
+def _first_lowest(values, starts, sizes):
+    """
+    Return the position of the first lowest value in each group.
+    """
+    lowest = numpy.minimum.reduceat(values, starts)
+    position = numpy.where(values == numpy.repeat(lowest, sizes),
+                           numpy.arange(len(values)), len(values))
+    return numpy.minimum.reduceat(position, starts)
+
+
+def _squared_distances(points, columns, flat):
+    """
+    Return the squared distance between each point and triangle, given
+    the triangles' data as laid out by :py:class:`_TriangleGrid`.
+    """
+    p = [points[:, k] for k in range(3)]
+    corners = [columns[0:3], columns[3:6], columns[6:9]]
+    inside = ~flat
+    outside = None
+    for i, corner in enumerate(corners):
+        base = 9 + 8 * i
+        edge, inverse = columns[base:base + 3], columns[base + 3]
+        inward, offset = columns[base + 4:base + 7], columns[base + 7]
+        inside &= (p[0] * inward[0] + p[1] * inward[1] +
+                   p[2] * inward[2]) >= offset
+        # The closest point on the edge to the point.
+        w = [p[k] - corner[k] for k in range(3)]
+        t = (w[0] * edge[0] + w[1] * edge[1] + w[2] * edge[2]) * inverse
+        numpy.clip(t, 0, 1, out=t)
+        square = 0
+        for k in range(3):
+            w[k] -= t * edge[k]
+            w[k] *= w[k]
+            square = square + w[k]
+        outside = square if outside is None else numpy.minimum(
+            outside, square, out=outside,
+        )
+    normal = columns[33:36]
+    across = ((p[0] - corners[0][0]) * normal[0] +
+              (p[1] - corners[0][1]) * normal[1] +
+              (p[2] - corners[0][2]) * normal[2])
+    across *= across
+    return numpy.where(inside, across, outside)
+
+
+def _search_entries(grid, best, nearest, points, ids, starts, stops):
+    """
+    Compare each point of ``ids`` with the triangles of its range of
+    entries, a batch at a time.
+    """
+    counts = stops - starts
+    ends = numpy.cumsum(counts)
+    begin = 0
+    while begin < len(ids):
+        end = max(int(numpy.searchsorted(
+            ends, ends[begin] - counts[begin] + _PAIR_BATCH, side='right',
+        )), begin + 1)
+        which, local = _ranges(counts[begin:end])
+        grid.update(best, nearest, points, ids[begin:end][which],
+                    starts[begin:end][which] + local)
+        begin = end
+
+
+def closest_triangles(points, triangles):
+    """
+    Return the distance from each of ``points`` to the closest of
+    ``triangles``, and the index of that triangle.
+
+    The triangles are entered into a uniform grid of cells. Each point is
+    first compared with the triangles in its own cell, or if that is
+    empty with one triangle from the smallest block of cells around it
+    that holds any, which limits how far away the closest triangle can be.
+    Then it is compared with the triangles of every other cell within that
+    distance.
+    """
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+    triangles = numpy.asarray(triangles, dtype=numpy.float64)
+    if not len(triangles):
+        raise ValueError("Can't find distances to an empty surface")
+    best = numpy.full(len(points), numpy.inf)
+    nearest = numpy.zeros(len(points), dtype=numpy.intp)
+    grid = _TriangleGrid(triangles)
+
+    # Points are searched in order of their cells, so that nearby points
+    # read the same triangles' data while it is in the cache.
+    own = grid.cells(points)
+    order = numpy.argsort(_cell_keys(own), kind='stable')
+    points, own = points[order], own[order]
+    starts, stops = grid.lookup(own)
+    ids = numpy.arange(len(points))
+    _search_entries(grid, best, nearest, points, ids, starts, stops)
+
+    # Points in empty cells are compared with a triangle from the cell
+    # they fall in at ever coarser levels of the grid.
+    pending = numpy.flatnonzero(starts == stops)
+    cells = numpy.clip(own[pending], 0, grid.top)
+    level = 0
+    while len(pending):
+        level += 1
+        coarse = _cell_keys(grid.occupied >> level)
+        ranked = numpy.argsort(coarse, kind='stable')
+        coarse = coarse[ranked]
+        keys = _cell_keys(cells >> level)
+        found = numpy.minimum(numpy.searchsorted(coarse, keys),
+                              len(coarse) - 1)
+        hit = coarse[found] == keys
+        first = grid.starts[ranked[found[hit]]]
+        _search_entries(grid, best, nearest, points, pending[hit], first,
+                        first + 1)
+        pending, cells = pending[~hit], cells[~hit]
+
+    # Any closer triangle must be in a cell within the distance found.
+    reach = numpy.sqrt(best)[:, None]
+    low = numpy.maximum(grid.cells(points - reach), 0)
+    high = numpy.minimum(grid.cells(points + reach), grid.top)
+    high = numpy.maximum(high, low - 1)
+    spans = high - low + 1
+    spans = spans[:, 0] * spans[:, 1] * spans[:, 2]
+    ends = numpy.cumsum(spans)
+    begin = 0
+    while begin < len(points):
+        end = max(int(numpy.searchsorted(
+            ends, ends[begin] - spans[begin] + _CELL_BATCH, side='right',
+        )), begin + 1)
+        which, cells = _box_cells(low[begin:end], high[begin:end])
+        which += begin
+        # The points' own cells have been searched already.
+        again = numpy.any(cells != own[which], axis=1)
+        which, cells = which[again], cells[again]
+        starts, stops = grid.lookup(cells)
+        full = starts < stops
+        _search_entries(grid, best, nearest, points, which[full],
+                        starts[full], stops[full])
+        begin = end
+    distances = numpy.empty(len(points))
+    distances[order] = numpy.sqrt(best)
+    closest = numpy.empty(len(points), dtype=numpy.intp)
+    closest[order] = nearest
+    return distances, closest
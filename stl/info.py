@@ -0,0 +1,165 @@
+
+import os
+import re
+import struct
+
+from stl.binary import FormatError, HEADER_SIZE, RECORD_SIZE, _record_dtype
+
+
+_VERTEX = re.compile(br'vertex\s+(\S+)\s+(\S+)\s+(\S+)')
+_SOLID_NAME = re.compile(br'\s*solid\s+([A-Za-z_][A-Za-z0-9_]*)')
+
+# Size of the blocks files are read in.
+_CHUNK_SIZE = 1 << 22
+
+
+class StlInfo(object):
+    """
+    Summary of an STL file, as returned by :py:func:`stl.read_info`.
+    """
+
+    #: The name of the (first) solid.
+    name = None
+
+    #: ``'binary'`` or ``'ascii'``.
+    format = None
+
+    #: The number of facets. For binary files this is the count given in
+    #: the header; for ASCII files the ``endfacet`` keywords are counted.
+    facet_count = 0
+
+    #: The ``(minimum, maximum)`` corners of the bounding box of the
+    #: vertices, as ``(x, y, z)`` tuples, if requested and the file has
+    #: any facets; otherwise ``None``.
+    bounds = None
+
+    def __init__(self, name, format, facet_count, bounds=None):
+        self.name = name
+        self.format = format
+        self.facet_count = facet_count
+        self.bounds = bounds
+
+    def __repr__(self):
+        return '<stl.info.StlInfo name=%r, format=%r, facet_count=%r, ' \
+            'bounds=%r>' % (
+                self.name, self.format, self.facet_count, self.bounds,
+            )
+
+
+class _Bounds(object):
+    """
+    Accumulates the bounding box of blocks of points.
+    """
+
+    def __init__(self):
+        self.low = None
+        self.high = None
+
+    def add(self, points):
+        import numpy
+        if not len(points):
+            return
+        low = numpy.fmin.reduce(points, axis=0)
+        high = numpy.fmax.reduce(points, axis=0)
+        if self.low is not None:
+            low = numpy.fmin(low, self.low)
+            high = numpy.fmax(high, self.high)
+        self.low, self.high = low, high
+
+    def result(self):
+        if self.low is None:
+            return None
+        return tuple(self.low.tolist()), tuple(self.high.tolist())
+
+
+def _is_binary(f, size):
+    header = f.read(HEADER_SIZE)
+    f.seek(0)
+    if len(header) == HEADER_SIZE:
+        count = struct.unpack('<I', header[80:])[0]
+        if size == HEADER_SIZE + count * RECORD_SIZE:
+            return True
+    # Binary headers may start with "solid" too, so this is only trusted
+    # if the size doesn't match the binary format.
+    return not header.lstrip().startswith(b'solid')
+
+
+def _binary_info(f, bbox):
+    header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise FormatError("Unexpected end of file at offset %i" % (
+            len(header),
+        ))
+    name = header[:80].strip(b'\0').decode()[6:]
+    facet_count = struct.unpack('<I', header[80:])[0]
+    bounds = None
+    if bbox:
+        import numpy
+        bounds = _Bounds()
+        record_size = RECORD_SIZE
+        remaining = facet_count
+        while remaining > 0:
+            data = f.read(
+                min(remaining, _CHUNK_SIZE // record_size) * record_size
+            )
+            count = len(data) // record_size
+            if not count:
+                break
+            records = numpy.frombuffer(
+                data, dtype=_record_dtype(), count=count,
+            )
+            bounds.add(records['vertices'].reshape(-1, 3))
+            remaining -= count
+        bounds = bounds.result()
+    return StlInfo(name, 'binary', facet_count, bounds)
+
+
+def _ascii_info(f, bbox):
+    name = None
+    facet_count = 0
+    bounds = None
+    if bbox:
+        import numpy
+        bounds = _Bounds()
+    leftover = b''
+    while True:
+        data = f.read(_CHUNK_SIZE)
+        # Only whole lines are examined, so that keywords and numbers
+        # aren't split between blocks.
+        if data:
+            data = leftover + data
+            end = data.rfind(b'\n') + 1
+            data, leftover = data[:end], data[end:]
+        else:
+            data, leftover = leftover, b''
+        if name is None:
+            match = _SOLID_NAME.match(data)
+            if match:
+                name = match.group(1).decode('utf-8', 'replace')
+        facet_count += data.count(b'endfacet')
+        if bbox:
+            coordinates = _VERTEX.findall(data)
+            if coordinates:
+                bounds.add(numpy.array(coordinates).astype(numpy.float64))
+        if not data and not leftover:
+            break
+    return StlInfo(name, 'ascii', facet_count,
+                   bounds.result() if bbox else None)
+
+
+def read_info(path, bbox=False):
+    """
+    Return a :py:class:`StlInfo` summarizing the STL file at ``path``,
+    without parsing its facets.
+
+    The format is recognized from the file's size and first bytes. For
+    binary files only the header is read, unless ``bbox`` is set, in which
+    case the vertices are read in blocks to find their bounding box. ASCII
+    files are scanned in blocks for the ``endfacet`` keywords and, if
+    ``bbox`` is set, the vertex coordinates.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if _is_binary(f, size):
+            return _binary_info(f, bbox)
+        return _ascii_info(f, bbox)
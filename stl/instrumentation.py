@@ -0,0 +1,197 @@
+
+import time
+
+try:
+    _clock = time.perf_counter
+except AttributeError:
+    _clock = time.time
+
+
+class Instrumentation(object):
+    """
+    Opt-in collector of timing and volume statistics for the readers and
+    writers.
+
+    Pass an instance as the ``instrument`` argument of any of the
+    ``stl.read_*`` functions or the :py:class:`stl.Solid` ``write_*``
+    methods. The readers and writers only do any extra work when given an
+    instance, so leaving it out costs nothing.
+
+    The instance can also be used as a context manager, in which case the
+    wall time of the whole block is recorded as the ``total`` stage::
+
+        with stl.Instrumentation() as stats:
+            solid = stl.read_binary_file(f, instrument=stats)
+        print(stats.report())
+
+    If ``on_progress`` is given it is called with this object after every
+    ``progress_interval`` facets, which is useful for long files.
+    """
+
+    #: :py:class:`dict` mapping stage names to seconds spent in them.
+    #: Readers report ``header``, ``read`` (file I/O), ``decode``
+    #: (tokenizing and number conversion) and ``build`` (facet
+    #: construction). Writers report ``header``, ``encode`` and ``write``
+    #: (file I/O).
+    stages = None
+
+    #: Number of bytes read from and written to instrumented files.
+    bytes_read = 0
+    bytes_written = 0
+
+    #: Number of facets read or written.
+    facets = 0
+
+    def __init__(self, on_progress=None, progress_interval=100000):
+        self.stages = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.facets = 0
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self._started = None
+
+    def __enter__(self):
+        self._started = _clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.add_time('total', _clock() - self._started)
+        self._started = None
+
+    def add_time(self, stage, seconds):
+        """
+        Add ``seconds`` to the time recorded for ``stage``.
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def stage(self, name):
+        """
+        Return a context manager recording the time spent in its block as
+        stage ``name``, excluding any time the block records against other
+        stages.
+        """
+        return _Stage(self, name)
+
+    def timed(self, stage, function, counts_facets=False):
+        """
+        Wrap ``function`` so that the time spent in it is recorded as
+        ``stage``. If ``counts_facets`` is set, each call also counts as
+        one facet for :py:attr:`facets` and progress reporting.
+        """
+        def wrapper(*args):
+            start = _clock()
+            result = function(*args)
+            self.add_time(stage, _clock() - start)
+            if counts_facets:
+                self._count_facet()
+            return result
+        return wrapper
+
+    def count_facets(self, facets):
+        """
+        Yield each item of ``facets``, counting it as one facet for
+        :py:attr:`facets` and progress reporting.
+        """
+        for facet in facets:
+            yield facet
+            self._count_facet()
+
+    def add_facets(self, count):
+        """
+        Count ``count`` more facets for :py:attr:`facets` and progress
+        reporting, for code that handles facets in bulk.
+        """
+        before = self.facets
+        self.facets += count
+        if (self.on_progress is not None and
+                self.facets // self.progress_interval >
+                before // self.progress_interval):
+            self.on_progress(self)
+
+    def wrap_file(self, file):
+        """
+        Return a proxy for ``file`` that records the bytes passing through
+        it and the time spent in its ``read`` and ``write`` methods.
+        """
+        return _InstrumentedFile(self, file)
+
+    def report(self):
+        """
+        Return the collected statistics as a :py:class:`dict`.
+        """
+        return {
+            'stages': dict(self.stages),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'facets': self.facets,
+        }
+
+    def _count_facet(self):
+        self.facets += 1
+        if (self.on_progress is not None and
+                self.facets % self.progress_interval == 0):
+            self.on_progress(self)
+
+
+def stage(instrument, name):
+    """
+    Return ``instrument.stage(name)``, or a context manager that does
+    nothing if ``instrument`` is ``None``.
+    """
+    if instrument is None:
+        return _NULL_STAGE
+    return instrument.stage(name)
+
+
+class _NullStage(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage(object):
+
+    def __init__(self, instrument, name):
+        self.instrument = instrument
+        self.name = name
+
+    def __enter__(self):
+        self.other_time = sum(self.instrument.stages.values())
+        self.started = _clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = _clock() - self.started
+        other_time = sum(self.instrument.stages.values()) - self.other_time
+        self.instrument.add_time(self.name, elapsed - other_time)
+
+
+class _InstrumentedFile(object):
+
+    def __init__(self, instrument, file):
+        self.instrument = instrument
+        self.file = file
+
+    def read(self, *args):
+        start = _clock()
+        data = self.file.read(*args)
+        self.instrument.add_time('read', _clock() - start)
+        self.instrument.bytes_read += len(data)
+        return data
+
+    def write(self, data):
+        start = _clock()
+        result = self.file.write(data)
+        self.instrument.add_time('write', _clock() - start)
+        self.instrument.bytes_written += len(data)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
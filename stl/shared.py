@@ -0,0 +1,177 @@
+
+import struct
+import weakref
+
+import numpy
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+# Magic, float size in bytes, facet count and name length (or NO_NAME).
+_HEADER = struct.Struct('<4sBxxxQI')
+_MAGIC = b'STLm'
+_NO_NAME = 0xffffffff
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _layout(name_length, count, itemsize):
+    """
+    Return the offsets of the normals, vertices and attributes within a
+    segment, and its total size.
+    """
+    normals = _align(_HEADER.size + name_length)
+    vertices = _align(normals + count * 3 * itemsize)
+    attributes = _align(vertices + count * 9 * itemsize)
+    return normals, vertices, attributes, attributes + count * 2
+
+
+def _require_shared_memory():
+    if shared_memory is None:
+        raise NotImplementedError(
+            "Shared memory requires multiprocessing.shared_memory "
+            "(Python 3.8 or later)"
+        )
+
+
+if shared_memory is not None:
+    class _AttachedMemory(shared_memory.SharedMemory):
+        """
+        A segment attached to by a process that doesn't own it.
+        """
+
+        def __del__(self):
+            # Arrays that outlive their solid keep the mapping alive; it is
+            # released along with the last of them.
+            try:
+                self.close()
+            except BufferError:
+                pass
+
+
+def _attach(name):
+    try:
+        return _AttachedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching always registers the segment with
+        # the resource tracker. Worker processes share their parent's
+        # tracker, for which this is harmless.
+        return _AttachedMemory(name=name)
+
+
+def _release(memory):
+    memory.close()
+    try:
+        memory.unlink()
+    except OSError:
+        pass
+
+
+class SharedSolid(object):
+    """
+    A copy of a solid's geometry in a shared memory segment, as returned by
+    :py:meth:`stl.Solid.to_shared_memory`.
+
+    Other processes attach to the segment by :py:attr:`name` with
+    :py:meth:`stl.Solid.from_shared_memory`. The segment belongs to this
+    object: it is removed when :py:meth:`close` is called, when the object
+    is used as a context manager and its block exits, or at the latest
+    when the object is garbage collected or the interpreter exits.
+    """
+
+    #: The name by which other processes attach to the segment.
+    name = None
+
+    #: The number of facets in the shared solid.
+    facet_count = 0
+
+    def __init__(self, solid):
+        _require_shared_memory()
+        normals, vertices, attributes = solid.to_arrays()
+        dtype = numpy.result_type(normals.dtype, vertices.dtype)
+        if dtype not in (numpy.float32, numpy.float64):
+            dtype = numpy.dtype(numpy.float64)
+        name = b'' if solid.name is None else solid.name.encode('utf-8')
+        count = len(vertices)
+        offsets = _layout(len(name), count, dtype.itemsize)
+
+        memory = shared_memory.SharedMemory(create=True, size=offsets[3])
+        self._finalizer = weakref.finalize(self, _release, memory)
+        buf = memory.buf
+        _HEADER.pack_into(
+            buf, 0, _MAGIC, dtype.itemsize, count,
+            _NO_NAME if solid.name is None else len(name),
+        )
+        buf[_HEADER.size:_HEADER.size + len(name)] = name
+        for offset, array, array_dtype in zip(
+                offsets, (normals, vertices, attributes),
+                (dtype, dtype, numpy.uint16)):
+            target = numpy.frombuffer(
+                buf, dtype=array_dtype, count=array.size, offset=offset,
+            )
+            target[:] = numpy.ravel(array)
+            # Views of the buffer would stop the segment being closed.
+            del target
+        del buf
+
+        self.name = memory.name
+        self.facet_count = count
+
+    def close(self):
+        """
+        Remove the segment. Solids already attached to it in other
+        processes remain usable until they are discarded.
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach(name, cls):
+    """
+    Return an instance of ``cls`` (:py:class:`stl.Solid` or a subclass)
+    backed by read-only views of the shared memory segment ``name``.
+    """
+    _require_shared_memory()
+    memory = _attach(name)
+    buf = memory.buf
+    magic, itemsize, count, name_length = _HEADER.unpack_from(buf, 0)
+    if magic != _MAGIC:
+        del buf
+        memory.close()
+        raise ValueError("%r is not a shared solid" % name)
+    if name_length == _NO_NAME:
+        solid_name = None
+        name_length = 0
+    else:
+        solid_name = bytes(
+            buf[_HEADER.size:_HEADER.size + name_length]
+        ).decode('utf-8')
+
+    dtype = numpy.float32 if itemsize == 4 else numpy.float64
+    offsets = _layout(name_length, count, itemsize)
+    arrays = []
+    for offset, shape, array_dtype in zip(
+            offsets, ((count, 3), (count, 3, 3), (count,)),
+            (dtype, dtype, numpy.uint16)):
+        array = numpy.frombuffer(
+            buf, dtype=array_dtype, count=int(numpy.prod(shape)),
+            offset=offset,
+        ).reshape(shape)
+        array.flags.writeable = False
+        arrays.append(array)
+    del buf
+
+    solid = cls.from_arrays(solid_name, *arrays)
+    # Keep the segment attached for as long as the solid exists.
+    solid._shared_memory = memory
+    return solid
@@ -0,0 +1,168 @@
+
+import json
+import os
+
+import numpy
+
+from stl.types import Solid
+
+
+#: Name of the index written by :py:func:`write_tiles`.
+INDEX_NAME = 'index.json'
+
+#: Name of the container holding all the tiles when they are packed.
+CONTAINER_NAME = 'tiles.pack'
+
+
+def _octree_cells(centroids, low, size, max_facets, max_depth):
+    """
+    Assign each centroid to an octree cell, splitting cells that hold more
+    than ``max_facets`` until ``max_depth`` is reached.
+
+    Returns the depth of each facet's cell and its integer coordinates at
+    that depth.
+    """
+    scale = 1 << max_depth
+    coords = numpy.floor((centroids - low) / size * scale).astype(numpy.int64)
+    numpy.clip(coords, 0, scale - 1, out=coords)
+
+    depths = numpy.full(len(centroids), max_depth, dtype=numpy.int64)
+    cells = coords.copy()
+    pending = numpy.arange(len(centroids))
+    for depth in range(max_depth):
+        cell = coords[pending] >> (max_depth - depth)
+        keys = (cell[:, 0] << 42) | (cell[:, 1] << 21) | cell[:, 2]
+        unique, inverse, counts = numpy.unique(
+            keys, return_inverse=True, return_counts=True,
+        )
+        small = counts[inverse.ravel()] <= max_facets
+        done = pending[small]
+        depths[done] = depth
+        cells[done] = cell[small]
+        pending = pending[~small]
+        if not len(pending):
+            break
+    return depths, cells
+
+
+def _level_tiles(vertices, low, size, max_facets, max_depth):
+    """
+    Yield ``(depth, cell, indices)`` for each tile of the facets.
+    """
+    if not len(vertices):
+        return
+    depths, cells = _octree_cells(
+        vertices.mean(axis=1), low, size, max_facets, max_depth,
+    )
+    keys = numpy.column_stack([depths, cells])
+    order = numpy.lexsort(keys.T[::-1])
+    keys = keys[order]
+    starts = numpy.flatnonzero(numpy.concatenate([
+        [True], numpy.any(keys[1:] != keys[:-1], axis=1),
+    ]))
+    stops = numpy.append(starts[1:], len(order))
+    for start, stop in zip(starts, stops):
+        depth, x, y, z = keys[start].tolist()
+        yield depth, (x, y, z), order[start:stop]
+
+
+def write_tiles(solid, directory, max_facets=1 << 16, max_depth=8,
+                levels=(1.0,), packed=False):
+    """
+    Split ``solid`` into spatial tiles for progressive loading, and write
+    them to ``directory`` as binary STL files along with an index.
+
+    The facets are divided among the cells of an octree over the solid's
+    bounding cube by their centroids, splitting cells with more than
+    ``max_facets`` facets until ``max_depth`` (at most 21) is reached. Any
+    polygons are split into triangles first.
+
+    ``levels`` gives the levels of detail to write, as decreasing ratios
+    of the solid's number of facets. Each level below ``1.0`` is made by
+    decimating the one before it with :py:meth:`stl.Solid.decimate`, and
+    is tiled on the same octree, so that coarse tiles line up with fine
+    ones.
+
+    Each tile is written as its own file, unless ``packed`` is set, in
+    which case they are all written one after the other to a single
+    container file. Each tile is a complete binary STL file either way.
+
+    The index is written as JSON, and also returned. It gives the solid's
+    ``name`` and ``bounds``, and for each level its ``ratio``, number of
+    ``facets`` and list of ``tiles``. Each tile has its octree ``depth``
+    and ``cell``, the ``bounds`` of its facets, its number of ``facets``
+    and either the ``file`` holding it or, when packed, its ``offset`` and
+    ``length`` within the ``container``.
+    """
+    if not 0 <= max_depth <= 21:
+        raise ValueError("max_depth must be between 0 and 21")
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    normals, vertices, attributes = solid._triangle_arrays()
+    if len(vertices):
+        points = vertices.reshape(-1, 3)
+        low = points.min(axis=0)
+        high = points.max(axis=0)
+        size = max(float((high - low).max()), 1e-12)
+        bounds = [low.tolist(), high.tolist()]
+    else:
+        low, size, bounds = numpy.zeros(3), 1.0, None
+
+    index = {
+        'name': solid.name,
+        'bounds': bounds,
+        'levels': [],
+    }
+    container = None
+    if packed:
+        index['container'] = CONTAINER_NAME
+        container = open(os.path.join(directory, CONTAINER_NAME), 'wb')
+
+    try:
+        current = Solid.from_arrays(solid.name, normals, vertices)
+        for level, ratio in enumerate(levels):
+            if ratio < 1.0:
+                current.decimate(
+                    target_facets=int(round(len(vertices) * ratio)),
+                )
+            level_normals, level_vertices = current.to_arrays()[:2]
+            tiles = []
+            for depth, cell, indices in _level_tiles(
+                    level_vertices, low, size, max_facets, max_depth):
+                tile = Solid.from_arrays(
+                    solid.name, level_normals[indices],
+                    level_vertices[indices],
+                )
+                tile_points = level_vertices[indices].reshape(-1, 3)
+                entry = {
+                    'depth': depth,
+                    'cell': list(cell),
+                    'bounds': [tile_points.min(axis=0).tolist(),
+                               tile_points.max(axis=0).tolist()],
+                    'facets': len(indices),
+                }
+                if container is not None:
+                    entry['offset'] = container.tell()
+                    tile.write_binary(container)
+                    entry['length'] = container.tell() - entry['offset']
+                else:
+                    entry['file'] = 'tile-%d-%d-%d-%d-%d.stl' % (
+                        (level, depth) + cell
+                    )
+                    with open(os.path.join(directory, entry['file']),
+                              'wb') as f:
+                        tile.write_binary(f)
+                tiles.append(entry)
+            index['levels'].append({
+                'ratio': ratio,
+                'facets': len(level_vertices),
+                'tiles': tiles,
+            })
+    finally:
+        if container is not None:
+            container.close()
+
+    with open(os.path.join(directory, INDEX_NAME), 'w') as f:
+        json.dump(index, f, indent=1)
+    return index
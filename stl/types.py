@@ -1,9 +1,6 @@
 import itertools
 import math
 import functools
-import numpy
-import sys
-import copy
 
 class Solid(object):
     """
@@ -13,13 +10,142 @@ class Solid(object):
     #: The name given to the object by the STL file header.
     name = None
 
-    #: :py:class:`list` of :py:class:`stl.Facet` objects representing the
-    #: facets (triangles) that make up the exterior surface of this object.
-    facets = []
-
     def __init__(self, name=None, facets=None):
         self.name = name
-        self.facets = facets if facets is not None else []
+        self._facets = facets if facets is not None else []
+        self._arrays = None
+        self._attribute_data = None
+
+    @classmethod
+    def from_arrays(cls, name, normals, vertices, attributes=None,
+                    attribute_data=None):
+        """
+        Construct a solid backed by arrays rather than by
+        :py:class:`stl.Facet` objects: ``normals`` of shape ``(n, 3)``,
+        ``vertices`` of shape ``(n, 3, 3)`` and optionally ``attributes``,
+        the ``n`` attribute byte count values from a binary file.
+        ``attribute_data`` may hold the attribute bytes themselves, as a
+        ``uint8`` array of those of each facet in turn.
+
+        The arrays are used as given, without copying, so they can be
+        memory-mapped or shared. Facet objects are only created if and when
+        :py:attr:`facets` is accessed.
+        """
+        import numpy
+        vertices = numpy.asanyarray(vertices)
+        if attributes is None:
+            attributes = numpy.zeros(len(vertices), dtype=numpy.uint16)
+        solid = cls(name=name)
+        solid._facets = None
+        solid._arrays = (numpy.asanyarray(normals), vertices,
+                         numpy.asanyarray(attributes))
+        if attribute_data is not None:
+            solid._attribute_data = numpy.asanyarray(attribute_data)
+        return solid
+
+    @property
+    def facets(self):
+        """
+        :py:class:`list` of :py:class:`stl.Facet` objects representing the
+        facets (triangles) that make up the exterior surface of this object.
+
+        For a solid created by :py:meth:`from_arrays` the list is built on
+        first access, after which the arrays are dropped so that changes to
+        the list are not lost.
+        """
+        if self._facets is None:
+            normals, vertices, attributes = self._arrays
+            self._facets = [
+                Facet.from_vectors(
+                    Vector3d(*normal),
+                    (Vector3d(*v0), Vector3d(*v1), Vector3d(*v2)),
+                )
+                for normal, (v0, v1, v2) in zip(normals.tolist(),
+                                                vertices.tolist())
+            ]
+            if self._attribute_data is not None:
+                indices, data = _attribute_bytes(
+                    attributes, self._attribute_data,
+                )
+                for i, value in zip(indices, data):
+                    self._facets[i].attributes = value
+            self._arrays = None
+            self._attribute_data = None
+        return self._facets
+
+    @facets.setter
+    def facets(self, facets):
+        self._facets = facets
+        self._arrays = None
+        self._attribute_data = None
+
+    @property
+    def facet_count(self):
+        """
+        The number of facets in the object, without building any
+        :py:class:`stl.Facet` objects.
+        """
+        if self._facets is None:
+            return len(self._arrays[1])
+        return len(self._facets)
+
+    def to_arrays(self):
+        """
+        Return the geometry as a tuple of arrays ``(normals, vertices,
+        attributes)``, as accepted by :py:meth:`from_arrays`.
+
+        For a solid created from arrays these are the original arrays. For
+        one made of facets they are built from the facets, which must all
+        be triangles; missing normals become zero vectors and, as when
+        writing a binary file, attribute bytes are not carried over.
+        """
+        import numpy
+        if self._facets is None:
+            return self._arrays
+        facets = self._facets
+        for facet in facets:
+            if len(facet.vertices) != 3:
+                raise ValueError(
+                    "Only triangular facets can be converted to arrays"
+                )
+        # Flattening the coordinates into numpy.fromiter is much faster than
+        # numpy.array on nested sequences.
+        chain = itertools.chain.from_iterable
+        normals = numpy.fromiter(
+            chain(facet.normal or (0.0, 0.0, 0.0) for facet in facets),
+            dtype=numpy.float64, count=3 * len(facets),
+        ).reshape(len(facets), 3)
+        vertices = numpy.fromiter(
+            chain(chain(facet.vertices for facet in facets)),
+            dtype=numpy.float64, count=9 * len(facets),
+        ).reshape(len(facets), 3, 3)
+        attributes = numpy.zeros(len(facets), dtype=numpy.uint16)
+        return normals, vertices, attributes
+
+    def to_shared_memory(self):
+        """
+        Copy the geometry into a new shared memory segment, so that other
+        processes can use it without it being pickled or copied again.
+
+        Returns a :py:class:`stl.shared.SharedSolid` whose ``name`` is
+        passed to :py:meth:`from_shared_memory` in the other processes. The
+        segment is removed when that object is closed or discarded, so it
+        must be kept for as long as the segment is needed.
+
+        Requires Python 3.8 or later.
+        """
+        from stl.shared import SharedSolid
+        return SharedSolid(self)
+
+    @classmethod
+    def from_shared_memory(cls, name):
+        """
+        Attach to a shared memory segment created by
+        :py:meth:`to_shared_memory`, probably in another process, and
+        return a solid backed by read-only views of its arrays.
+        """
+        from stl.shared import attach
+        return attach(name, cls)
 
     def add_facet(self, *args, **kwargs):
         """
@@ -35,25 +161,396 @@ class Solid(object):
         """
         return sum([facet.area for facet in self.facets])
 
-    def write_binary(self, file):
+    def transform(self, matrix):
+        """
+        Apply an affine transformation to the object in place.
+
+        ``matrix`` is a 4x4 matrix in homogeneous coordinates that is
+        applied to column vectors, so a translation goes in its last
+        column. Normals are transformed by the inverse transpose and
+        re-normalized. Missing normals, which are zero vectors in arrays,
+        are calculated from the transformed vertices, as are all normals
+        if the matrix is singular, such as a projection. If the
+        transformation is a reflection the order of each facet's vertices
+        is reversed, so that it still agrees with the normal.
+
+        The vertices are transformed with a single matrix multiplication
+        and the object becomes backed by the resulting arrays, without
+        creating :py:class:`stl.Facet` objects. Attribute bytes are not
+        carried over, just as when writing a binary file.
+        """
+        import numpy
+        matrix = numpy.asarray(matrix, dtype=numpy.float64)
+        if matrix.shape != (4, 4):
+            raise ValueError("matrix must be 4x4, not %r" % (matrix.shape,))
+        linear = matrix[:3, :3]
+        offset = matrix[:3, 3]
+        try:
+            normal_matrix = numpy.linalg.inv(linear).T
+        except numpy.linalg.LinAlgError:
+            normal_matrix = None
+        reflects = numpy.linalg.det(linear) < 0
+
+        try:
+            normals, vertices, attributes = self.to_arrays()
+        except ValueError:
+            # Polygons can't be represented as arrays; transform them one
+            # at a time.
+            for facet in self.facets:
+                points = numpy.dot(facet.vertices, linear.T) + offset
+                if reflects:
+                    points = points[::-1]
+                facet.vertices = tuple(
+                    Vector3d(*point) for point in points.tolist()
+                )
+                if facet.normal is None or normal_matrix is None:
+                    facet.recalculate_normal()
+                else:
+                    facet.normal = Vector3d(*_unit_rows(
+                        numpy.dot([facet.normal], normal_matrix.T)
+                    )[0].tolist())
+            return
+
+        dtype = _float_dtype(vertices.dtype)
+        vertices = numpy.dot(vertices, linear.T) + offset
+        if reflects:
+            vertices = vertices[:, ::-1]
+        if normal_matrix is None:
+            normals = numpy.zeros((len(vertices), 3))
+        else:
+            normals = _unit_rows(numpy.dot(normals, normal_matrix.T))
+        missing = ~normals.any(axis=1)
+        if missing.any():
+            corners = vertices[missing]
+            normals[missing] = _unit_rows(numpy.cross(
+                corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0],
+            ))
+        self._facets = None
+        self._arrays = (
+            normals.astype(dtype, copy=False),
+            vertices.astype(dtype, copy=False),
+            numpy.zeros(len(vertices), dtype=numpy.uint16),
+        )
+        self._attribute_data = None
+
+    def translate(self, offset):
+        """
+        Move the object in place by ``offset``, an ``(x, y, z)`` vector.
+        """
+        import numpy
+        matrix = numpy.identity(4)
+        matrix[:3, 3] = offset
+        self.transform(matrix)
+
+    def scale(self, factor):
+        """
+        Scale the object in place about the origin by ``factor``, either a
+        single number or an ``(x, y, z)`` vector of per-axis factors.
+        """
+        import numpy
+        matrix = numpy.identity(4)
+        matrix[:3, :3] *= numpy.asarray(factor, dtype=numpy.float64)
+        self.transform(matrix)
+
+    def slice(self, z_values):
+        """
+        Intersect the object with horizontal planes at each of the heights
+        in ``z_values``, for example to preview the layers of a print.
+
+        Returns a list with an entry for each height, in the given order.
+        Each entry is a list of the contours at that height, as arrays of
+        ``(x, y, z)`` points of shape ``(k, 3)``. A closed contour ends with
+        its first point. Contours run anticlockwise around the material
+        when viewed from above, if the facets are wound consistently.
+
+        All the planes are handled in one pass over the facets, so slicing
+        at many heights costs little more than slicing at one.
+        """
+        from stl.geometry import slice_triangles
+        return slice_triangles(self._triangle_arrays()[1], z_values)
+
+    def decimate(self, target_facets=None, ratio=None):
+        """
+        Simplify the object in place to about ``target_facets`` facets, or
+        to the given ``ratio`` of its current number of facets, for example
+        to reduce dense scans.
+
+        Edges are collapsed in order of increasing quadric error, so flat
+        and gently curved areas are simplified first and sharp features
+        are kept. Closed surfaces stay closed, with the same topology.
+        Vertices on open boundaries are kept in place, so open surfaces may
+        not reach the target. Facets are matched up by their
+        exact vertex coordinates, and any polygons are split into triangles
+        first.
+
+        The object becomes backed by arrays, with normals recalculated from
+        the new facets. Returns the number of facets removed.
+        """
+        import numpy
+        if (target_facets is None) == (ratio is None):
+            raise ValueError("Exactly one of target_facets and ratio "
+                             "must be given")
+        from stl.geometry import decimate_triangles
+        count = self.facet_count
+        if ratio is not None:
+            target_facets = int(round(count * ratio))
+        triangles = self._triangle_arrays()[1]
+        dtype = _float_dtype(triangles.dtype)
+        triangles = decimate_triangles(triangles, target_facets)
+        normals = _unit_rows(numpy.cross(
+            triangles[:, 1] - triangles[:, 0],
+            triangles[:, 2] - triangles[:, 0],
+        ))
+        self._facets = None
+        self._arrays = (
+            normals.astype(dtype, copy=False),
+            triangles.astype(dtype, copy=False),
+            numpy.zeros(len(triangles), dtype=numpy.uint16),
+        )
+        self._attribute_data = None
+        return count - len(triangles)
+
+    def split_components(self, return_indices=False):
+        """
+        Split the object into its connected components, for example the
+        separate parts on a build plate.
+
+        Facets belong to the same component if they are joined through
+        vertices with identical coordinates. Returns a new solid for each
+        component, with the same name as this one, ordered by their first
+        facets. A solid made of arrays gives solids backed by arrays.
+
+        If ``return_indices`` is true, returns an array of the indices of
+        the facets in each component instead.
+        """
+        import numpy
+        from stl.geometry import facet_components
+        if self._facets is None:
+            normals, vertices, attributes = self._arrays
+            labels, count = facet_components(
+                vertices.reshape(-1, 3), numpy.full(len(vertices), 3),
+            )
+        else:
+            facets = self._facets
+            labels, count = facet_components(
+                numpy.array([
+                    vertex for facet in facets for vertex in facet.vertices
+                ], dtype=numpy.float64).reshape(-1, 3),
+                [len(facet.vertices) for facet in facets],
+            )
+        if not count:
+            return []
+        order = numpy.argsort(labels, kind='stable')
+        indices = numpy.split(
+            order, numpy.searchsorted(labels[order], numpy.arange(1, count)),
+        )
+        if return_indices:
+            return indices
+        if self._facets is None:
+            return [
+                Solid.from_arrays(
+                    self.name, normals[group], vertices[group],
+                    attributes[group],
+                    _attribute_subset(attributes, self._attribute_data, group),
+                )
+                for group in indices
+            ]
+        return [
+            Solid(self.name, [self._facets[i] for i in group.tolist()])
+            for group in indices
+        ]
+
+    def orient_consistently(self):
+        """
+        Reverse facets in place so that they all wind the same way around
+        each shell of the object, facing outwards, as
+        :py:meth:`stl.Facet.join` and the right-hand rule for normals
+        assume.
+
+        Facets are neighbours where exactly two of them share an edge, by
+        vertices with identical coordinates. Within each connected set of
+        neighbours the orientation of its first facet is spread to the
+        rest, and then the whole set is reversed if it encloses a negative
+        volume. The normals of reversed facets are reversed too.
+
+        Returns the number of facets reversed.
+        """
+        import numpy
+        from stl.geometry import orient_facets
+        if self._facets is None:
+            normals, vertices, attributes = self._arrays
+            flip = orient_facets(
+                vertices.reshape(-1, 3), numpy.full(len(vertices), 3),
+            )
+            if flip.any():
+                # The arrays are copied, as they may be read-only or shared.
+                vertices = vertices.copy()
+                vertices[flip] = vertices[flip][:, ::-1]
+                normals = normals.copy()
+                normals[flip] = -normals[flip]
+                self._arrays = (normals, vertices, attributes)
+            return int(flip.sum())
+
+        facets = self._facets
+        flip = orient_facets(
+            numpy.array([
+                vertex for facet in facets for vertex in facet.vertices
+            ], dtype=numpy.float64).reshape(-1, 3),
+            [len(facet.vertices) for facet in facets],
+        )
+        indices = numpy.flatnonzero(flip).tolist()
+        for i in indices:
+            facet = facets[i]
+            facet.vertices = facet.vertices[::-1]
+            if facet.normal is not None:
+                facet.normal = Vector3d(*[-c for c in facet.normal])
+        return len(indices)
+
+    def find_self_intersections(self):
+        """
+        Find the pairs of facets that intersect each other, which make the
+        object unprintable.
+
+        Returns an array of shape ``(k, 2)`` holding the indices ``(i,
+        j)``, with ``i < j``, of each intersecting pair, in order.
+
+        Only facets whose bounding boxes overlap are tested, found by
+        sorting the boxes into a grid, so the cost grows about linearly
+        with the number of facets for typical meshes. Facets sharing an
+        edge are not reported, nor are those sharing a vertex that don't
+        meet anywhere else. Overlaps between facets lying in the same plane
+        are not detected.
+        """
+        import numpy
+        from stl.geometry import intersecting_triangles
+        triangles, owners = self._owned_triangles()
+        pairs = intersecting_triangles(triangles)
+        if owners is None:
+            return pairs
+        # Map the pairs of triangles back to the polygons they came from.
+        pairs = owners[pairs]
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        pairs.sort(axis=1)
+        return numpy.unique(pairs, axis=0)
+
+    def sample_points(self, count, seed=None, return_normals=False,
+                      return_indices=False):
+        """
+        Pick ``count`` points at random on the surface of the object, for
+        example for inspection or machine learning.
+
+        Every part of the surface is equally likely to be picked, so
+        facets receive points in proportion to their areas. The facets are
+        chosen by a binary search of their cumulative areas, and the
+        points within them from uniform barycentric coordinates, all in
+        bulk. ``seed`` is passed to :py:func:`numpy.random.default_rng`,
+        so the same seed always gives the same points.
+
+        Returns an array of the points, of shape ``(count, 3)``. If
+        ``return_normals`` is true, an array of the unit normal of the
+        facet under each point, according to its winding, is returned as
+        well, and if ``return_indices`` is true an array of the facet
+        index of each point, in a tuple in that order.
+        """
+        import numpy
+        from stl.geometry import sample_triangles
+        triangles, owners = self._owned_triangles()
+        points, normals, indices = sample_triangles(
+            triangles, count, numpy.random.default_rng(seed),
+        )
+        points = points.astype(_float_dtype(triangles.dtype), copy=False)
+        if not (return_normals or return_indices):
+            return points
+        result = [points]
+        if return_normals:
+            result.append(normals.astype(points.dtype, copy=False))
+        if return_indices:
+            result.append(indices if owners is None else owners[indices])
+        return tuple(result)
+
+    def voxelize(self, pitch, sparse=False):
+        """
+        Convert the object into cubes of side ``pitch``, returning a
+        :py:class:`stl.voxels.VoxelGrid`.
+
+        The grid starts at the lowest corner of the object's bounding box.
+        A voxel is filled if the surface passes through it or if its
+        centre is inside the object. The inside is found by casting a ray
+        along the z axis through the centre of each column of voxels and
+        filling between each pair of facets it crosses, so the object
+        should be closed; columns whose rays escape through a hole are left
+        with only the voxels on the surface.
+
+        The filled voxels are always kept as runs along the z axis, which
+        take memory in proportion to the surface rather than the volume. A
+        dense boolean array of the whole grid is built as well unless
+        ``sparse`` is set.
+        """
+        from stl.voxels import voxelize_triangles
+        return voxelize_triangles(self._owned_triangles()[0], pitch, sparse)
+
+    def _owned_triangles(self):
+        """
+        Return the geometry as an array of triangles of shape ``(n, 3,
+        3)``, together with an array of the facet each came from if any
+        polygons had to be split, or ``None`` if each triangle is the facet
+        of the same index.
+        """
+        import numpy
+        try:
+            return self.to_arrays()[1], None
+        except ValueError:
+            pass
+        triangles = []
+        owners = []
+        for i, facet in enumerate(self.facets):
+            for triangle in facet.split_to_triangles():
+                triangles.append(triangle.vertices)
+                owners.append(i)
+        return (
+            numpy.array(triangles, dtype=numpy.float64).reshape(-1, 3, 3),
+            numpy.array(owners, dtype=numpy.intp),
+        )
+
+    def _triangle_arrays(self):
+        """
+        Return the geometry as arrays like :py:meth:`to_arrays`, splitting
+        any polygons into triangles.
+        """
+        try:
+            return self.to_arrays()
+        except ValueError:
+            return Solid(facets=[
+                triangle
+                for facet in self.facets
+                for triangle in facet.split_to_triangles()
+            ]).to_arrays()
+
+    def write_binary(self, file, instrument=None):
         """
         Write this object to a file in STL *binary* format.
 
         ``file`` must be a file-like object (supporting a ``write`` method),
         to which the data will be written.
+
+        If ``instrument`` is an :py:class:`stl.Instrumentation` then timing
+        and volume statistics for the write are recorded in it.
         """
         from stl.binary import write
-        write(self, file)
+        write(self, file, instrument=instrument)
 
-    def write_ascii(self, file):
+    def write_ascii(self, file, instrument=None):
         """
         Write this object to a file in STL *ascii* format.
 
         ``file`` must be a file-like object (supporting a ``write`` method),
         to which the data will be written.
+
+        If ``instrument`` is an :py:class:`stl.Instrumentation` then timing
+        and volume statistics for the write are recorded in it.
         """
         from stl.ascii import write
-        write(self, file)
+        write(self, file, instrument=instrument)
 
     def sort_facets(self):
         """
@@ -119,38 +616,142 @@ class Solid(object):
             yield f
 
 
+def merge(solids, name=None):
+    """
+    Combine the facets of several :py:class:`stl.Solid` objects into a new
+    solid called ``name``.
+
+    The geometry is concatenated as arrays, so the result is backed by
+    arrays rather than :py:class:`stl.Facet` objects. The facets must all
+    be triangles.
+    """
+    import numpy
+    arrays = [solid.to_arrays() for solid in solids]
+    if not arrays:
+        return Solid(name=name)
+    dtype = numpy.result_type(*[
+        _float_dtype(vertices.dtype) for normals, vertices, attrs in arrays
+    ])
+    # Attribute bytes are only kept if every solid with any has them.
+    data = []
+    for solid, (normals, vertices, attrs) in zip(solids, arrays):
+        if solid._facets is None and solid._attribute_data is not None:
+            data.append(solid._attribute_data)
+        elif attrs.any():
+            data = None
+            break
+    return Solid.from_arrays(
+        name,
+        numpy.concatenate([a[0] for a in arrays]).astype(dtype, copy=False),
+        numpy.concatenate([a[1] for a in arrays]).astype(dtype, copy=False),
+        numpy.concatenate([a[2] for a in arrays]),
+        numpy.concatenate(data) if data else None,
+    )
+
+
+def _attribute_bytes(attributes, data):
+    """
+    Return the indices of the facets with attribute bytes, given their
+    counts ``attributes`` and the bytes of all of them as ``data``, and a
+    list of the bytes of each of those facets.
+    """
+    import numpy
+    ends = numpy.cumsum(attributes, dtype=numpy.int64)
+    indices = numpy.flatnonzero(attributes)
+    return indices.tolist(), [
+        data[ends[i] - attributes[i]:ends[i]].tobytes() for i in indices
+    ]
+
+
+def _attribute_subset(attributes, data, indices):
+    """
+    Return the attribute bytes of the facets at ``indices``, given the
+    counts ``attributes`` and bytes ``data`` of all of them, or None if
+    ``data`` is.
+    """
+    import numpy
+    if data is None:
+        return None
+    ends = numpy.cumsum(attributes, dtype=numpy.int64)
+    indices = indices[attributes[indices] != 0]
+    return numpy.concatenate([numpy.zeros(0, dtype=numpy.uint8)] + [
+        data[ends[i] - attributes[i]:ends[i]] for i in indices
+    ])
+
+
+def _float_dtype(dtype):
+    import numpy
+    if dtype.kind == 'f':
+        return dtype
+    return numpy.dtype(numpy.float64)
+
+
+def _unit_rows(vectors):
+    """
+    Scale each row of ``vectors`` to unit length, leaving zero rows alone.
+    """
+    import numpy
+    lengths = numpy.sqrt(numpy.einsum('ij,ij->i', vectors, vectors))
+    lengths[lengths == 0] = 1.0
+    return vectors / lengths[:, None]
+
+
 @functools.total_ordering
 class Facet(object):
     """
     A facet (triangle) from a :py:class:`stl.Solid`.
     """
 
-    #: Raw binary attribute bytes. According to the STL spec these are unused
-    #: and thus this should always be empty, but some modeling software
-    #: encodes non-standard data in here which callers may wish to access.
-    #:
-    #: At present these attribute bytes are populated only when reading binary
-    #: STL files (since ASCII STL files have no place for this data) *and*
-    #: they are ignored when *writing* a binary STL file, so round-tripping
-    #: a file through this library will lose the non-standard attribute data.
-    attributes = None
-
-    #: The 'normal' vector of the facet, as a :py:class:`stl.Vector3d`.
-    normal = None
-
-    #: 3-element sequence of :py:class:`stl.Vector3d` representing the
-    #: facet's three vertices, in order.
-    vertices = None
+    __slots__ = {
+        'attributes': (
+            "Raw binary attribute bytes. According to the STL spec these are "
+            "unused and thus this should always be empty, but some modeling "
+            "software encodes non-standard data in here which callers may "
+            "wish to access.\n\n"
+            "At present these attribute bytes are populated only when reading "
+            "binary STL files (since ASCII STL files have no place for this "
+            "data) *and* they are ignored when *writing* a binary STL file, "
+            "so round-tripping a file through this library will lose the "
+            "non-standard attribute data."
+        ),
+        'normal': (
+            "The 'normal' vector of the facet, as a :py:class:`stl.Vector3d`."
+        ),
+        'vertices': (
+            ":py:class:`tuple` of :py:class:`stl.Vector3d` representing the "
+            "facet's three vertices, in order."
+        ),
+    }
 
     def __init__(self, normal, vertices, attributes=None):
-        self.vertices = list(
-            Vector3d(*x) for x in vertices
+        self.vertices = tuple(
+            x if type(x) is Vector3d else Vector3d(*x) for x in vertices
         )
+        self.attributes = attributes
         if normal:
-            self.normal = Vector3d(*normal)
+            self.normal = (
+                normal if type(normal) is Vector3d else Vector3d(*normal)
+            )
         else:
             self.recalculate_normal()
 
+    @classmethod
+    def from_vectors(cls, normal, vertices, attributes=None):
+        """
+        Construct a facet from values that are already in their final form,
+        skipping the conversions done by the normal constructor.
+
+        ``normal`` must be a :py:class:`stl.Vector3d` (or ``None``) and
+        ``vertices`` a :py:class:`tuple` of :py:class:`stl.Vector3d`. This
+        is intended for readers and other code that builds many facets in
+        bulk.
+        """
+        facet = object.__new__(cls)
+        facet.normal = normal
+        facet.vertices = vertices
+        facet.attributes = attributes
+        return facet
+
     def __eq__(self, other):
         if type(other) is Facet:
             return (
@@ -238,7 +839,7 @@ class Facet(object):
         reindexed_enumerated = [((p[1]-index_of_min) % len(self.vertices),
                                  p[0])
                                 for p in swap_enumerated]
-        self.vertices = [p[1] for p in sorted(reindexed_enumerated)]
+        self.vertices = tuple(p[1] for p in sorted(reindexed_enumerated))
 
     @staticmethod
     def _calc_normal(v0, v1, v2):
@@ -247,6 +848,7 @@ class Facet(object):
         right-hand rule.  Returns None if colinear inputs.
 
         """
+        import numpy
         vertices = [numpy.array(x) for x in [v0,v1,v2]]
         normal = numpy.cross(vertices[1]-vertices[0], vertices[2]-vertices[1])
         length = numpy.linalg.norm(normal)
@@ -258,6 +860,109 @@ class Facet(object):
     def recalculate_normal(self):
         self.normal = Facet._calc_normal(*self.vertices[0:3])
 
+    def _projected_vertices(self):
+        """
+        Project the vertices onto the coordinate plane most nearly parallel
+        to the facet, returning a list of 2D points.
+
+        The projection is chosen so that the vertices wind counter-clockwise
+        in 2D when they wind according to the right-hand rule around the
+        facet's (Newell) normal.
+        """
+        nx = ny = nz = 0.0
+        count = len(self.vertices)
+        for i in range(count):
+            p = self.vertices[i]
+            q = self.vertices[(i + 1) % count]
+            nx += (p[1] - q[1]) * (p[2] + q[2])
+            ny += (p[2] - q[2]) * (p[0] + q[0])
+            nz += (p[0] - q[0]) * (p[1] + q[1])
+        if abs(nx) >= abs(ny) and abs(nx) >= abs(nz):
+            u, v, flip = 1, 2, nx < 0
+        elif abs(ny) >= abs(nz):
+            u, v, flip = 2, 0, ny < 0
+        else:
+            u, v, flip = 0, 1, nz < 0
+        if flip:
+            u, v = v, u
+        return [(p[u], p[v]) for p in self.vertices]
+
+    def triangle_indices(self):
+        """
+        Triangulate the facet by ear clipping, returning a list of
+        ``(i, j, k)`` index triples into :py:attr:`vertices`.
+
+        Each triple keeps the winding of the original polygon, so every
+        triangle has the same normal as the facet, and the triangles
+        together cover the facet exactly. There are always
+        ``len(vertices) - 2`` triangles.
+
+        The polygon is projected to 2D once and only the reflex vertices are
+        tested when looking for ears, so the cost is O(n * r) for ``n``
+        vertices of which ``r`` are reflex.
+        """
+        count = len(self.vertices)
+        if count < 3:
+            return []
+        if count == 3:
+            return [(0, 1, 2)]
+
+        points = self._projected_vertices()
+
+        def cross(a, b, c):
+            (ax, ay), (bx, by), (cx, cy) = points[a], points[b], points[c]
+            return (bx - ax) * (cy - by) - (by - ay) * (cx - bx)
+
+        prev = [(i - 1) % count for i in range(count)]
+        nxt = [(i + 1) % count for i in range(count)]
+        reflex = set(i for i in range(count)
+                     if cross(prev[i], i, nxt[i]) < 0)
+
+        def is_ear(b):
+            a, c = prev[b], nxt[b]
+            if cross(a, b, c) <= 0:
+                return False
+            corners = (points[a], points[b], points[c])
+            for r in reflex:
+                if points[r] in corners:
+                    # Repeated vertices, as left behind by join, don't
+                    # block an ear.
+                    continue
+                if (cross(a, b, r) >= 0 and cross(b, c, r) >= 0 and
+                        cross(c, a, r) >= 0):
+                    return False
+            return True
+
+        triangles = []
+        remaining = count
+        b = nxt[0]
+        misses = 0
+        while remaining > 3:
+            if not is_ear(b):
+                b = nxt[b]
+                misses += 1
+                if misses < remaining:
+                    continue
+                # No proper ear exists, which only happens for degenerate
+                # or self-intersecting input. Clip the first vertex that
+                # isn't reflex so that we still terminate.
+                while b in reflex and misses < 2 * remaining:
+                    b = nxt[b]
+                    misses += 1
+            a, c = prev[b], nxt[b]
+            triangles.append((a, b, c))
+            nxt[a], prev[c] = c, a
+            reflex.discard(b)
+            remaining -= 1
+            for x in (a, c):
+                if x in reflex and cross(prev[x], x, nxt[x]) >= 0:
+                    reflex.discard(x)
+            b = nxt[a]
+            misses = 0
+
+        triangles.append(tuple(sorted((prev[b], b, nxt[b]))))
+        return triangles
+
     def split_to_triangles(self):
         """
         Return triangular facets.
@@ -265,43 +970,13 @@ class Facet(object):
         If the shape has just 3 vertices, return a list of just the
         original facet.  Otherwise, return a list of triangular
         facets.  The number of returned facets is the number of
-        vertices minus 2.  Make sure each new facet has the same
-        normal as the original facet, in case of concave shapes.
-        """
-        new_facets = []
-        v = [Vector3d(*(c for c in v)) for v in self.vertices]
-        #sys.stderr.write('facet: ' + str(v) + '\n')
-        while len(v) > 3:
-            for a in range(len(v)):
-                b = (a + 1) % len(v)
-                c = (b + 1) % len(v)
-                # We can make a facet if none of the other points are inside.
-                #sys.stderr.write("%d" % len(v))
-                #sys.stderr.write("%s\n" % v)
-                #sys.stderr.write("%s\n" % str(self.normal))
-                for x in range(len(v)):
-                    if v[x] == v[a] or v[x] == v[b] or v[x] == v[c]:
-                        continue # Don't examine the current points.
-                    #sys.stderr.write("%d,%d,%d,%d\n" % (x,a,b,c))
-                    if Facet._calc_normal(v[a],v[b],v[c]) != self.normal:
-                        #sys.stderr.write("n1 %s, n2 %s\n" % (str(self.normal),
-                        #                 str(Facet._calc_normal(v[a],v[b],v[c]))))
-                        #sys.stderr.write("Can't use upsidedown triangle.\n")
-                        break
-                    all_normals = [
-                        Facet._calc_normal(v[x],v[a],v[b]),
-                        Facet._calc_normal(v[x],v[b],v[c]),
-                        Facet._calc_normal(v[x],v[c],v[a])]
-                    if all((x==self.normal or x is None) for x in all_normals):
-                        #sys.stderr.write("Can't use concave triangle\n")
-                        break # This point is inside, we can't use it.
-                else:
-                    # We didn't find an inside point, this triangle is valid.
-                    new_facets.append(Facet(self.normal, [v[a], v[b], v[c]]))
-                    v.pop(b)
-                    break
-        new_facets.append(Facet(self.normal, v))
-        return new_facets
+        vertices minus 2.  Each new facet has the same normal and
+        winding as the original facet, even for concave shapes.
+        """
+        if len(self.vertices) <= 3:
+            return [Facet(self.normal, self.vertices)]
+        return [Facet(self.normal, [self.vertices[i] for i in triangle])
+                for triangle in self.triangle_indices()]
 
     def remove_1d_vertex(self):
         """
@@ -317,10 +992,10 @@ class Facet(object):
             j = (i + 1) % len(self.vertices)
             k = (i + 2) % len(self.vertices)
             if self.vertices[i] == self.vertices[k]:
-                # Remove the bigger first so that the indices don't move.
                 result = self.vertices[j]
-                self.vertices.pop(max(j,k))
-                self.vertices.pop(min(j,k))
+                self.vertices = tuple(
+                    v for n, v in enumerate(self.vertices) if n not in (j, k)
+                )
                 return result
         return None
 
@@ -335,7 +1010,7 @@ class Facet(object):
             if not Facet._calc_normal(*(self.vertices[x] for x in [i,j,k])):
                 # Remove the middle vertex.
                 result = self.vertices[j]
-                self.vertices.pop(j)
+                self.vertices = self.vertices[:j] + self.vertices[j + 1:]
                 return result
         return None
 
@@ -385,12 +1060,11 @@ class Vector3d(tuple):
     three-element tuple in (``x``, ``y``, ``z``) order.
     """
 
+    __slots__ = ()
+
     def __new__(cls, x, y, z):
         return tuple.__new__(cls, (x, y, z))
 
-    def __init__(self, x, y, z):
-        pass
-
     @property
     def x(self):
         """
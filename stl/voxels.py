@@ -0,0 +1,326 @@
+
+import numpy
+
+from stl.types import _unit_rows
+
+
+# Number of samples or candidate columns examined at a time when
+# voxelizing.
+_VOXEL_BATCH = 1 << 20
+
+# Distance, in voxels, that the surface is moved backwards when finding
+# the voxels it passes through.
+_BOUNDARY_NUDGE = 1e-6
+
+
+class VoxelGrid(object):
+    """
+    The voxels inside a surface, as returned by
+    :py:meth:`stl.Solid.voxelize`.
+
+    Voxel ``(i, j, k)`` is the cube of side :py:attr:`pitch` whose lowest
+    corner is at ``origin + pitch * (i, j, k)``.
+    """
+
+    #: The lowest corner of the grid, as an array of ``(x, y, z)``.
+    origin = None
+
+    #: The side of each voxel.
+    pitch = None
+
+    #: The number of voxels along each axis, as an ``(x, y, z)`` tuple.
+    shape = None
+
+    #: The filled voxels as an array of runs along the z axis, of shape
+    #: ``(k, 4)``. Each row ``(i, j, start, stop)`` says that voxels
+    #: ``(i, j, start)`` up to, but not including, ``(i, j, stop)`` are
+    #: filled. The runs are sorted and never touch each other.
+    runs = None
+
+    #: A boolean array of :py:attr:`shape` that is true for the filled
+    #: voxels, or ``None`` if the grid was built with ``sparse`` set.
+    occupancy = None
+
+    def __init__(self, origin, pitch, shape, runs, occupancy=None):
+        self.origin = origin
+        self.pitch = pitch
+        self.shape = shape
+        self.runs = runs
+        self.occupancy = occupancy
+
+    @property
+    def count(self):
+        """
+        The number of filled voxels.
+        """
+        return int((self.runs[:, 3] - self.runs[:, 2]).sum())
+
+    @property
+    def volume(self):
+        """
+        The volume of the filled voxels.
+        """
+        return self.count * self.pitch ** 3
+
+    def to_dense(self):
+        """
+        Return a boolean array of :py:attr:`shape` that is true for the
+        filled voxels.
+        """
+        if self.occupancy is not None:
+            return self.occupancy
+        nx, ny, nz = self.shape
+        # Mark where each run starts and stops in the flattened grid, and
+        # count how many runs have started but not stopped at each voxel.
+        marks = numpy.zeros(nx * ny * nz + 1, dtype=numpy.int8)
+        offsets = (self.runs[:, 0] * ny + self.runs[:, 1]) * nz
+        marks[offsets + self.runs[:, 2]] += 1
+        marks[offsets + self.runs[:, 3]] -= 1
+        filled = numpy.cumsum(marks[:-1], dtype=numpy.int8)
+        return filled.astype(bool).reshape(self.shape)
+
+    def __repr__(self):
+        return '<stl.voxels.VoxelGrid shape=%r, pitch=%r, count=%r>' % (
+            self.shape, self.pitch, self.count,
+        )
+
+
+def _merge_runs(columns, starts, stops):
+    """
+    Combine overlapping and touching runs of voxels in the same columns,
+    returning the merged ``(columns, starts, stops)`` in order.
+    """
+    order = numpy.lexsort((starts, columns))
+    columns, starts, stops = columns[order], starts[order], stops[order]
+    if not len(columns):
+        return columns, starts, stops
+    # Within each column, a run begins a new group unless it starts at or
+    # before the furthest stop of the runs sorted before it. Offsetting
+    # the stops by column keeps the running maximum within each column.
+    span = int(stops.max()) + 1
+    reach = numpy.maximum.accumulate(columns * span + stops)
+    new = numpy.ones(len(columns), dtype=bool)
+    new[1:] = ((columns[1:] != columns[:-1]) |
+               (columns[1:] * span + starts[1:] > reach[:-1]))
+    first = numpy.flatnonzero(new)
+    return (columns[first], starts[first],
+            numpy.maximum.reduceat(stops, first))
+
+
+def _surface_voxels(triangles, shape):
+    """
+    Return the flattened indices of the voxels the triangles, given in
+    units of voxels from the grid's origin, pass through.
+
+    Each triangle is sampled on a lattice spaced at most half a voxel
+    apart. Triangles, or their edges, lying on the boundary between voxels
+    only mark the voxels behind them.
+    """
+    edges = triangles[:, [1, 2, 0]] - triangles
+    normals = numpy.cross(edges[:, 0], -edges[:, 2])
+    inwards = (triangles.mean(axis=1)[:, None] - triangles).reshape(-1, 3)
+    triangles = (triangles +
+                 _BOUNDARY_NUDGE * _unit_rows(inwards).reshape(-1, 3, 3) -
+                 _BOUNDARY_NUDGE * _unit_rows(normals)[:, None])
+    longest = numpy.sqrt(numpy.einsum('ijk,ijk->ij', edges, edges).max(
+        axis=1,
+    ))
+    divisions = numpy.maximum(numpy.ceil(longest * 2), 1).astype(numpy.intp)
+    found = []
+    # Triangles needing the same number of divisions share a lattice.
+    for n in numpy.flatnonzero(numpy.bincount(divisions)).tolist():
+        group = triangles[divisions == n]
+        # Every pair of steps (r, c - r) along the two edges with c <= n.
+        r, c = numpy.triu_indices(n + 1)
+        u, v = r / float(n), (c - r) / float(n)
+        lattice_step = min(len(u), _VOXEL_BATCH)
+        for lattice_start in range(0, len(u), lattice_step):
+            lu = u[lattice_start:lattice_start + lattice_step]
+            lv = v[lattice_start:lattice_start + lattice_step]
+            step = max(_VOXEL_BATCH // len(lu), 1)
+            for start in range(0, len(group), step):
+                part = group[start:start + step]
+                keys = 0
+                for axis, size in enumerate(shape):
+                    a = part[:, 0, axis, None]
+                    cells = numpy.floor(a + (part[:, 1, axis, None] - a) * lu +
+                                        (part[:, 2, axis, None] - a) * lv)
+                    numpy.clip(cells, 0, size - 1, out=cells)
+                    keys = keys * size + cells
+                # Most samples of a triangle share voxels with its other
+                # samples, so those are dropped before the slower global
+                # sort.
+                keys = numpy.sort(keys.astype(numpy.int64), axis=1)
+                repeated = numpy.zeros(keys.shape, dtype=bool)
+                repeated[:, 1:] = keys[:, 1:] == keys[:, :-1]
+                found.append(keys[~repeated])
+    if not found:
+        return numpy.zeros(0, dtype=numpy.int64)
+    found = numpy.concatenate(found)
+    found.sort()
+    return found[numpy.append(True, found[1:] != found[:-1])]
+
+
+def _edges_for_rays(triangles, sign):
+    """
+    Return the lower end ``(x, y)``, the offset ``(dx, dy)`` to the upper
+    end and a factor of 1 or -1 for each edge of the triangles seen from
+    above, along with whether points on the edge count as inside.
+
+    Taking the factor times the area of the triangle made by the lower
+    end, the upper end and a point gives twice the signed area of the
+    triangle made by the point and the edge in the triangle's
+    anticlockwise order. The area is always worked out from the lower end,
+    so that the two triangles sharing an edge get exactly opposite values.
+    """
+    edges = []
+    for first, second in ((1, 2), (2, 0), (0, 1)):
+        p, q = triangles[:, first, :2], triangles[:, second, :2]
+        flip = (q[:, 0] < p[:, 0]) | ((q[:, 0] == p[:, 0]) &
+                                      (q[:, 1] < p[:, 1]))
+        low = numpy.where(flip[:, None], q, p)
+        offset = numpy.where(flip[:, None], p, q) - low
+        factor = numpy.where(flip, -sign, sign)
+        # The edge in anticlockwise order runs from low to high when the
+        # factor is positive, and only points on edges running down, or
+        # to the right along the x axis, are inside.
+        dx, dy = offset[:, 0] * factor, offset[:, 1] * factor
+        on_edge = (dy < 0) | ((dy == 0) & (dx > 0))
+        edges.append((low[:, 0], low[:, 1], offset[:, 0], offset[:, 1],
+                      factor, on_edge))
+    return edges
+
+
+def _column_crossings(triangles, shape):
+    """
+    Find where rays along the z axis through the centre of each column of
+    voxels cross the triangles, given in units of voxels from the grid's
+    origin.
+
+    Returns the flattened ``i * ny + j`` index of the column and the
+    height of each crossing, in voxels. A ray through an edge or vertex crosses
+    exactly one of the triangles meeting there, as in the usual top-left
+    rule for rasterizing triangles.
+    """
+    nx, ny, nz = shape
+    # Put the centres of the columns at whole numbers.
+    triangles = triangles - [0.5, 0.5, 0]
+    x, y = triangles[:, :, 0], triangles[:, :, 1]
+    double_area = ((x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) -
+                   (y[:, 1] - y[:, 0]) * (x[:, 2] - x[:, 0]))
+
+    # The range of columns whose centres lie in each triangle's box.
+    low_i = numpy.ceil(numpy.minimum(numpy.minimum(x[:, 0], x[:, 1]),
+                                     x[:, 2]))
+    low_j = numpy.ceil(numpy.minimum(numpy.minimum(y[:, 0], y[:, 1]),
+                                     y[:, 2]))
+    high_i = numpy.floor(numpy.maximum(numpy.maximum(x[:, 0], x[:, 1]),
+                                       x[:, 2]))
+    high_j = numpy.floor(numpy.maximum(numpy.maximum(y[:, 0], y[:, 1]),
+                                       y[:, 2]))
+    low_i = numpy.maximum(low_i, 0).astype(numpy.int64)
+    low_j = numpy.maximum(low_j, 0).astype(numpy.int64)
+    width_i = numpy.maximum(numpy.minimum(high_i, nx - 1) - low_i + 1, 0)
+    width_j = numpy.maximum(numpy.minimum(high_j, ny - 1) - low_j + 1, 0)
+    counts = (width_i * width_j).astype(numpy.int64)
+    # Triangles seen edge on are never crossed.
+    counts[double_area == 0] = 0
+    keep = numpy.flatnonzero(counts)
+    triangles, double_area = triangles[keep], double_area[keep]
+    low_i, low_j = low_i[keep], low_j[keep]
+    width_j, counts = width_j[keep].astype(numpy.int64), counts[keep]
+
+    sign = numpy.sign(double_area)
+    edges = _edges_for_rays(triangles, sign)
+    scale = 1 / numpy.abs(double_area)
+    heights = [triangles[:, k, 2] * scale for k in range(3)]
+    ends = numpy.cumsum(counts)
+
+    found_columns = []
+    found_heights = []
+    start = 0
+    while start < len(triangles):
+        # Take triangles until they cover a batch of candidate columns.
+        stop = max(int(numpy.searchsorted(
+            ends, ends[start] - counts[start] + _VOXEL_BATCH, side='right',
+        )), start + 1)
+        batch_counts = counts[start:stop]
+        which = numpy.repeat(numpy.arange(start, stop), batch_counts)
+        offset = numpy.arange(len(which)) - numpy.repeat(
+            numpy.cumsum(batch_counts) - batch_counts, batch_counts,
+        )
+        i = low_i[which] + offset // width_j[which]
+        j = low_j[which] + offset % width_j[which]
+
+        inside = numpy.ones(len(which), dtype=bool)
+        z = 0
+        for (lx, ly, dx, dy, factor, on_edge), h in zip(edges, heights):
+            area = (dx[which] * (j - ly[which]) -
+                    dy[which] * (i - lx[which])) * factor[which]
+            inside &= (area > 0) | ((area == 0) & on_edge[which])
+            # The area opposite each vertex weighs its height.
+            z = z + area * h[which]
+        found_columns.append((i * ny + j)[inside])
+        found_heights.append(z[inside])
+        start = stop
+    if not found_columns:
+        return numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0)
+    return numpy.concatenate(found_columns), numpy.concatenate(found_heights)
+
+
+def voxelize_triangles(triangles, pitch, sparse=False):
+    """
+    Return a :py:class:`VoxelGrid` of the voxels of side ``pitch`` that
+    the closed surface made by ``triangles`` passes through or encloses.
+    """
+    triangles = numpy.asarray(triangles, dtype=numpy.float64)
+    if not pitch > 0:
+        raise ValueError("The pitch must be positive, not %r" % (pitch,))
+    if not len(triangles):
+        runs = numpy.zeros((0, 4), dtype=numpy.int64)
+        return VoxelGrid(numpy.zeros(3), pitch, (0, 0, 0), runs,
+                         None if sparse else numpy.zeros((0, 0, 0), bool))
+    points = triangles.reshape(-1, 3)
+    origin = points.min(axis=0)
+    extent = points.max(axis=0) - origin
+    shape = tuple(numpy.maximum(numpy.ceil(extent / pitch), 1).astype(
+        numpy.int64,
+    ).tolist())
+    nz = shape[2]
+    # Work in units of voxels from the origin.
+    cells = (triangles - origin) / pitch
+
+    # Fill the voxels whose centres lie between each pair of crossings of
+    # the ray through their column. Columns crossed an odd number of
+    # times, by rays escaping through holes, are left empty.
+    columns, heights = _column_crossings(cells, shape)
+    order = numpy.lexsort((heights, columns))
+    columns, heights = columns[order], heights[order]
+    changes = numpy.flatnonzero(numpy.diff(columns)) + 1
+    group_starts = numpy.concatenate([[0], changes]).astype(numpy.intp)
+    group_sizes = numpy.diff(numpy.append(group_starts, len(columns)))
+    rank = numpy.arange(len(columns)) - numpy.repeat(group_starts,
+                                                     group_sizes)
+    even = numpy.repeat(group_sizes % 2 == 0, group_sizes)
+    entering = numpy.flatnonzero(even & (rank % 2 == 0))
+    inner_columns = columns[entering]
+    inner_starts = numpy.ceil(heights[entering] - 0.5).astype(numpy.int64)
+    inner_stops = numpy.floor(
+        heights[entering + 1] - 0.5,
+    ).astype(numpy.int64) + 1
+    inner_starts = numpy.maximum(inner_starts, 0)
+    inner_stops = numpy.minimum(inner_stops, nz)
+    filled = inner_starts < inner_stops
+
+    surface = _surface_voxels(cells, shape)
+    columns, starts, stops = _merge_runs(
+        numpy.concatenate([inner_columns[filled], surface // nz]),
+        numpy.concatenate([inner_starts[filled], surface % nz]),
+        numpy.concatenate([inner_stops[filled], surface % nz + 1]),
+    )
+    runs = numpy.stack([columns // shape[1], columns % shape[1],
+                        starts, stops], axis=1)
+    grid = VoxelGrid(origin, pitch, shape, runs)
+    if not sparse:
+        grid.occupancy = grid.to_dense()
+    return grid
@@ -0,0 +1,69 @@
+
+from stl.types import *
+
+
+def unit_cube(x=0):
+    """
+    Return the triangles of a unit cube at ``(x, 0, 0)``, wound outwards,
+    with the first two on the bottom.
+    """
+    corners = [(x + i, j, k)
+               for i in (0, 1) for j in (0, 1) for k in (0, 1)]
+    faces = [
+        (0, 2, 6, 4), (1, 5, 7, 3), (0, 4, 5, 1),
+        (2, 3, 7, 6), (0, 1, 3, 2), (4, 6, 7, 5),
+    ]
+    return [
+        Facet(None, [corners[i] for i in triangle])
+        for a, b, c, d in faces
+        for triangle in ((a, b, c), (a, c, d))
+    ]
+
+
+def icosphere(levels, bump=0.0):
+    """
+    Return the triangles of a closed sphere made by splitting each face of
+    an icosahedron into four ``levels`` times, wound outwards, with the
+    radius of the vertices varying by up to twice ``bump`` from 1.
+    """
+    t = (1 + 5 ** 0.5) / 2
+    points = [
+        (-1, t, 0), (1, t, 0), (-1, -t, 0), (1, -t, 0),
+        (0, -1, t), (0, 1, t), (0, -1, -t), (0, 1, -t),
+        (t, 0, -1), (t, 0, 1), (-t, 0, -1), (-t, 0, 1),
+    ]
+    faces = [
+        (0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+        (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+        (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+        (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1),
+    ]
+
+    def unit(point):
+        length = sum(value * value for value in point) ** 0.5
+        return tuple(value / length for value in point)
+
+    points = [unit(point) for point in points]
+    for level in range(levels):
+        middles = {}
+
+        def middle(a, b):
+            key = min(a, b), max(a, b)
+            if key not in middles:
+                middles[key] = len(points)
+                points.append(unit([
+                    p + q for p, q in zip(points[a], points[b])
+                ]))
+            return middles[key]
+
+        split = []
+        for a, b, c in faces:
+            ab, bc, ca = middle(a, b), middle(b, c), middle(c, a)
+            split += [(a, ab, ca), (b, bc, ab), (c, ca, bc), (ab, bc, ca)]
+        faces = split
+
+    points = [
+        tuple(value * (1 + bump * (k * 7 % 5 - 2)) for value in point)
+        for k, point in enumerate(points)
+    ]
+    return [Facet(None, [points[i] for i in face]) for face in faces]
@@ -1,11 +1,16 @@
 
+import os
+import shutil
+import tempfile
 import unittest
+import numpy
 from stl.ascii import *
 from sys import version_info
 if version_info.major < 3:
     from StringIO import StringIO
+    BytesIO = StringIO
 else:
-    from io import StringIO
+    from io import BytesIO, StringIO
 
 
 class TestScanner(unittest.TestCase):
@@ -162,6 +167,32 @@ class TestParser(unittest.TestCase):
             ),
         )
 
+    def test_dtype(self):
+        text = (
+            "solid Baz\n"
+            "  facet normal 0 0 1\n"
+            "    outer loop\n"
+            "      vertex 0.1 0 0\n"
+            "      vertex 1 0 0\n"
+            "      vertex 0 1 0\n"
+            "    endloop\n"
+            "  endfacet\n"
+            "endsolid Baz\n"
+        )
+        for dtype in (numpy.float32, numpy.float64):
+            solid = parse(StringIO(text), dtype=dtype)
+            self.assertEqual(solid.name, 'Baz')
+            normals, vertices, attributes = solid.to_arrays()
+            self.assertEqual(normals.dtype, dtype)
+            self.assertEqual(vertices.dtype, dtype)
+            self.assertEqual(normals.tolist(), [[0, 0, 1]])
+            self.assertEqual(vertices[0, 0, 0], dtype(0.1))
+        self.assertEqual(parse(StringIO(text), dtype=numpy.float64),
+                         self._parse_str(text))
+        empty = parse(StringIO("solid Baz\nendsolid Baz\n"),
+                      dtype=numpy.float32)
+        self.assertEqual(empty.to_arrays()[1].shape, (0, 3, 3))
+
 
 class TestWriter(unittest.TestCase):
 
@@ -220,3 +251,125 @@ class TestWriter(unittest.TestCase):
             '  endfacet\n'
             'endsolid withfacets\n'
         )
+
+    def test_incremental(self):
+        facet = Facet((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)])
+        f = StringIO('')
+        with AsciiStlWriter(f, name='parts') as writer:
+            writer.write_facets(iter([facet]))
+            writer.write_facets(facet for _ in range(2))
+        self.assertEqual(writer.facet_count, 3)
+        self.assertEqual(parse(StringIO(f.getvalue())).facets, [facet] * 3)
+
+        def failing():
+            yield facet
+            raise RuntimeError()
+
+        f = StringIO('')
+        with self.assertRaises(RuntimeError):
+            with AsciiStlWriter(f, name='parts') as writer:
+                writer.write_facets(failing())
+        self.assertTrue(writer.closed)
+        self.assertEqual(f.getvalue().count('endfacet'), 1)
+        self.assertNotIn('endsolid', f.getvalue())
+        with self.assertRaises(ValueError):
+            writer.write_facets([facet])
+
+    def test_from_arrays(self):
+        solid = Solid(
+            name='arrays',
+            facets=[
+                Facet(
+                    normal=(1.1, 2.1, 3.1),
+                    vertices=[
+                        (4.1, 5.1, 6.1),
+                        (7.1, 8.1, 9.1),
+                        (10.1, 11.1, 12.1),
+                    ],
+                ),
+            ],
+        )
+        f = StringIO('')
+        solid.write_ascii(f)
+        normals, vertices, attributes = solid.to_arrays()
+        self.assertResultEqual(
+            Solid.from_arrays('arrays', normals, vertices),
+            f.getvalue(),
+        )
+
+
+MULTI_SOLID = (
+    "solid first\n"
+    "  facet normal 0 0 1\n"
+    "    outer loop\n"
+    "      vertex 0 0 0\n"
+    "      vertex 1 0 0\n"
+    "      vertex 0 1 0\n"
+    "    endloop\n"
+    "  endfacet\n"
+    "endsolid first\n"
+    "solid second\n"
+    "endsolid second\n"
+    "solid third\n"
+    "  facet normal 0 0 -1\n"
+    "    outer loop\n"
+    "      vertex 0 0 0\n"
+    "      vertex 0 1 0\n"
+    "      vertex 1 0 0\n"
+    "    endloop\n"
+    "  endfacet\n"
+    "endsolid third\n"
+)
+
+
+class TestMultiSolid(unittest.TestCase):
+
+    def test_parse_all(self):
+        solids = parse_all(StringIO(MULTI_SOLID))
+        self.assertEqual([s.name for s in solids],
+                         ['first', 'second', 'third'])
+        self.assertEqual([len(s.facets) for s in solids], [1, 0, 1])
+        self.assertEqual(parse_all(StringIO("solid a\nendsolid a\n")),
+                         [Solid(name='a')])
+
+        with self.assertRaises(SyntaxError):
+            parse_all(StringIO(MULTI_SOLID + "solid"))
+
+    def test_index(self):
+        data = MULTI_SOLID.encode()
+        index = build_index(BytesIO(data))
+        self.assertEqual([entry[0] for entry in index],
+                         ['first', 'second', 'third'])
+        for name, start, end in index:
+            block = data[start:end].decode()
+            self.assertTrue(block.startswith('solid %s\n' % name))
+            self.assertTrue(block.endswith('endsolid %s\n' % name))
+
+        with self.assertRaises(SyntaxError):
+            build_index(BytesIO(b'solid unfinished\n'))
+
+    def test_read_solid(self):
+        f = BytesIO(MULTI_SOLID.encode())
+        third = read_solid(f, 'third')
+        self.assertEqual(third, parse_all(StringIO(MULTI_SOLID))[2])
+        self.assertEqual(read_solid(f, 'second', index=build_index(f)),
+                         Solid(name='second'))
+        with self.assertRaises(KeyError):
+            read_solid(f, 'fourth')
+
+    def test_load_index(self):
+        workdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(workdir, 'assembly.stl')
+            with open(path, 'w') as f:
+                f.write(MULTI_SOLID)
+            index = load_index(path)
+            self.assertTrue(os.path.exists(path + INDEX_SUFFIX))
+            self.assertEqual(load_index(path), index)
+
+            # A stale cache is rebuilt rather than trusted.
+            with open(path, 'a') as f:
+                f.write("solid fourth\nendsolid fourth\n")
+            self.assertEqual(len(load_index(path)), 4)
+        finally:
+            shutil.rmtree(workdir)
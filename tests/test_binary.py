@@ -1,5 +1,7 @@
 
+import struct
 import unittest
+import numpy
 from stl.binary import *
 from stl import convert_to_stream
 
@@ -11,8 +13,8 @@ T_HDR = b'\x73\x6f\x6c\x69\x64\x20\x54\x65\x73\x74\x66\x69\x6c\x65' \
 
 class TestParser(unittest.TestCase):
 
-    def _parse_str(self, string):
-        return parse(convert_to_stream(string))
+    def _parse_str(self, string, dtype=None):
+        return parse(convert_to_stream(string), dtype=dtype)
 
     def test_empty(self):
         with self.assertRaises(FormatError):
@@ -98,6 +100,37 @@ class TestParser(unittest.TestCase):
                 ],
             ),
         )
+        self.assertEqual(solid.facets[0].attributes, b'\x00\x00\x80\x7f')
+        self.assertIsNone(solid.facets[1].attributes)
+
+    def test_dtype(self):
+        data = (
+            T_HDR + b'\x03\x00\x00\x00' +
+            _record((0, 0, 1), [(0.1, 0, 0), (1, 0, 0), (0, 1, 0)]) +
+            _record((0, 0, 2), [(0, 0, 0), (2, 0, 0), (0, 2, 0)], 3) +
+            b'abc' +
+            _record((0, 0, 3), [(0, 0, 0), (3, 0, 0), (0, 3, 0)])
+        )
+        for dtype in (numpy.float32, numpy.float64):
+            solid = self._parse_str(data, dtype=dtype)
+            self.assertEqual(solid.name, 'Testfile')
+            normals, vertices, attributes = solid.to_arrays()
+            self.assertEqual(normals.dtype, dtype)
+            self.assertEqual(vertices.dtype, dtype)
+            self.assertEqual(normals[:, 2].tolist(), [1, 2, 3])
+            self.assertEqual(attributes.tolist(), [0, 3, 0])
+            self.assertEqual(vertices[0, 0, 0], numpy.float32(0.1))
+            merged = merge([solid, solid])
+            self.assertEqual(
+                [facet.attributes for facet in merged.facets],
+                [None, b'abc', None] * 2,
+            )
+            self.assertEqual(
+                [facet.attributes for facet in solid.facets],
+                [None, b'abc', None],
+            )
+        with self.assertRaises(FormatError):
+            self._parse_str(data[:-1], dtype=numpy.float32)
 
 
 class TestWriter(unittest.TestCase):
@@ -173,3 +206,288 @@ class TestWriter(unittest.TestCase):
             b'\x00\x00\x80\x3f'  # vertex z = 1.0
             b'\x00\x00'          # no attribute bytes
         )
+
+    def test_from_arrays(self):
+        solid = Solid(
+            name=None,
+            facets=[
+                Facet(
+                    normal=Vector3d(1.0, 2.0, 3.0),
+                    vertices=(
+                        Vector3d(4.0, 5.0, 6.0),
+                        Vector3d(7.0, 8.0, 9.0),
+                        Vector3d(10.0, 11.0, 12.0),
+                    ),
+                ),
+            ],
+        )
+        f = convert_to_stream('')
+        solid.write_binary(f)
+        normals, vertices, attributes = solid.to_arrays()
+        self.assertResultEqual(
+            Solid.from_arrays(None, normals, vertices, attributes + 2),
+            f.getvalue(),
+        )
+
+
+def _record(normal, vertices, attr_byte_count=0):
+    return struct.pack(
+        '<12fH',
+        *(list(normal) + [c for v in vertices for c in v] +
+          [attr_byte_count])
+    )
+
+
+class TestValidate(unittest.TestCase):
+
+    def _validate(self, data, **kwargs):
+        return validate(convert_to_stream(data), **kwargs)
+
+    def test_valid(self):
+        report = self._validate(
+            T_HDR + b'\x02\x00\x00\x00' +
+            _record((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)]) +
+            _record((0, 0, 0), [(0, 0, 0), (0, 1, 0), (1, 0, 0)])
+        )
+        self.assertTrue(report.valid)
+        self.assertTrue(report.size_ok)
+        self.assertEqual(report.name, 'Testfile')
+        self.assertEqual(report.declared_facets, 2)
+
+    def test_problems(self):
+        nan = float('nan')
+        inf = float('inf')
+        data = (
+            T_HDR + b'\x05\x00\x00\x00' +
+            _record((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)]) +
+            _record((0, 0, 1), [(nan, 0, 0), (1, 0, 0), (0, 1, 0)]) +
+            _record((0, 0, 1), [(0, 0, 0), (1, 0, 0), (2, 0, 0)]) +
+            _record((0, 0, 1), [(0, 0, 0), (0, 1, 0), (1, 0, 0)]) +
+            _record((inf, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)], 2)
+        )
+        for chunk_facets in (1, 2, 100):
+            report = self._validate(data, chunk_facets=chunk_facets)
+            self.assertFalse(report.valid)
+            self.assertTrue(report.size_ok)
+            self.assertEqual(list(report.non_finite), [1, 4])
+            self.assertEqual(list(report.degenerate), [2])
+            self.assertEqual(list(report.normal_mismatch), [3])
+            self.assertEqual(list(report.nonzero_attributes), [4])
+
+    def test_size_mismatch(self):
+        report = self._validate(
+            T_HDR + b'\x02\x00\x00\x00' +
+            _record((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)])
+        )
+        self.assertFalse(report.size_ok)
+        self.assertFalse(report.valid)
+        self.assertEqual(report.record_bytes, 50)
+
+        report = self._validate(
+            T_HDR + b'\x00\x00\x00\x00' +
+            _record((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)])
+        )
+        self.assertFalse(report.size_ok)
+        self.assertEqual(len(report.non_finite), 0)
+
+    def test_short_header(self):
+        with self.assertRaises(FormatError):
+            self._validate(T_HDR)
+
+
+def _range_data(count):
+    return T_HDR + struct.pack('<I', count) + b''.join(
+        _record((0, 0, 1), [(i, 0, 0), (i, 1, 0), (i, 0, 1)])
+        for i in range(count)
+    )
+
+
+class TestReadRange(unittest.TestCase):
+
+    def _xs(self, facets):
+        return [facet.vertices[0].x for facet in facets]
+
+    def test_read_range(self):
+        f = convert_to_stream(_range_data(10))
+        solid = read_range(f, 3, 6)
+        self.assertEqual(solid.name, 'Testfile')
+        self.assertEqual(self._xs(solid.facets), [3, 4, 5])
+        self.assertEqual(self._xs(read_range(f, -2, None).facets), [8, 9])
+        self.assertEqual(self._xs(read_range(f, 8, 100).facets), [8, 9])
+        self.assertEqual(read_range(f, 6, 3).facet_count, 0)
+
+    def test_truncated(self):
+        f = convert_to_stream(_range_data(10)[:-60])
+        self.assertEqual(read_range(f, 0, 8).facet_count, 8)
+        with self.assertRaises(FormatError):
+            read_range(f, 8, 10)
+
+    def test_lazy_solid(self):
+        solid = LazySolid(convert_to_stream(_range_data(10)), block_size=3)
+        self.assertEqual(solid.name, 'Testfile')
+        self.assertEqual(solid.facet_count, 10)
+        facets = solid.facets
+        self.assertEqual(len(facets), 10)
+        self.assertEqual(facets[4].vertices[0].x, 4)
+        self.assertEqual(facets[-1].vertices[0].x, 9)
+        with self.assertRaises(IndexError):
+            facets[10]
+        self.assertEqual(self._xs(facets[2:5]), [2, 3, 4])
+        self.assertEqual(self._xs(facets[1:8:3]), [1, 4, 7])
+        self.assertEqual(self._xs(facets[7:2:-2]), [7, 5, 3])
+        self.assertEqual(self._xs(facets[::-4]), [9, 5, 1])
+        self.assertEqual(self._xs(solid), list(range(10)))
+        self.assertEqual(facets[4], read_range(
+            convert_to_stream(_range_data(10)), 4, 5,
+        ).facets[0])
+
+    def test_lazy_solid_step(self):
+        f = _CountingFile(_range_data(1000))
+        facets = LazySolid(f).facets
+        f.read_bytes = 0
+        self.assertEqual(self._xs(facets[5::200]), [5, 205, 405, 605, 805])
+        self.assertEqual(f.read_bytes, 5 * 50)
+        f.read_bytes = 0
+        self.assertEqual(self._xs(facets[-1::-250]), [999, 749, 499, 249])
+        self.assertEqual(f.read_bytes, 4 * 50)
+        self.assertEqual(self._xs(facets[990::3]), [990, 993, 996, 999])
+        self.assertEqual(self._xs(facets[9:0:-4]), [9, 5, 1])
+
+    def test_embedded(self):
+        data = b'prefix' + _range_data(10) + b'suffix'
+        f = convert_to_stream(data)
+        f.seek(6)
+        solid = read_range(f, 3, 6)
+        self.assertEqual(solid.name, 'Testfile')
+        self.assertEqual(self._xs(solid.facets), [3, 4, 5])
+        self.assertEqual(f.tell(), 6)
+        self.assertEqual(self._xs(read_range(f, -2, None).facets), [8, 9])
+
+        f.seek(6)
+        solid = LazySolid(f)
+        self.assertEqual(solid.facet_count, 10)
+        self.assertEqual(self._xs(solid.facets[::3]), [0, 3, 6, 9])
+        self.assertEqual(self._xs(solid), list(range(10)))
+
+
+class _CountingFile(object):
+    """
+    Seekable file over ``data`` that counts the bytes read from it.
+    """
+
+    def __init__(self, data):
+        self.file = convert_to_stream(data)
+        self.read_bytes = 0
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.read_bytes += len(data)
+        return data
+
+    def seek(self, offset):
+        return self.file.seek(offset)
+
+    def tell(self):
+        return self.file.tell()
+
+
+class _WriteOnly(object):
+
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+
+class TestBinaryStlWriter(unittest.TestCase):
+
+    def _facets(self, count):
+        return [
+            Facet(
+                normal=Vector3d(0.0, 0.0, 1.0),
+                vertices=(
+                    Vector3d(float(i), 0.0, 0.0),
+                    Vector3d(i + 1.0, 0.0, 0.0),
+                    Vector3d(float(i), 1.0, 0.0),
+                ),
+            )
+            for i in range(count)
+        ]
+
+    def _expected(self, facets):
+        f = convert_to_stream('')
+        Solid(facets=facets).write_binary(f)
+        return f.getvalue()
+
+    def test_seekable(self):
+        facets = self._facets(7)
+        f = convert_to_stream('')
+        with BinaryStlWriter(f, buffer_size=100) as writer:
+            writer.write_facets(facets[:3])
+            writer.write_facets(iter(facets[3:]))
+        self.assertEqual(writer.facet_count, 7)
+        self.assertEqual(f.getvalue(), self._expected(facets))
+
+    def test_not_seekable(self):
+        facets = self._facets(5)
+        f = _WriteOnly()
+        with BinaryStlWriter(f, buffer_size=100, spool_size=120) as writer:
+            writer.write_facets(facets)
+            # Nothing can be written until the count is known.
+            self.assertEqual(f.data, b'')
+        self.assertEqual(f.data, self._expected(facets))
+
+    def test_arrays(self):
+        facets = self._facets(4)
+        f = convert_to_stream('')
+        with BinaryStlWriter(f) as writer:
+            writer.write_facets(facets[:1])
+            writer.write_arrays(
+                [facet.normal for facet in facets[1:]],
+                [facet.vertices for facet in facets[1:]],
+            )
+        self.assertEqual(f.getvalue(), self._expected(facets))
+        self.assertEqual(parse(convert_to_stream(f.getvalue())).facets,
+                         facets)
+
+    def test_bad_batch(self):
+        # A batch with a facet that can't be written adds nothing.
+        facets = self._facets(3)
+        quad = Facet(None, [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)])
+        f = convert_to_stream('')
+        writer = BinaryStlWriter(f, buffer_size=50)
+        writer.write_facets(facets[:1])
+        with self.assertRaises(ValueError):
+            writer.write_facets(facets[1:] + [quad])
+        self.assertEqual(writer.facet_count, 1)
+        writer.close()
+        self.assertEqual(f.getvalue(), self._expected(facets[:1]))
+
+    def test_exception(self):
+        # The header isn't completed, so the partial output doesn't pass
+        # for a whole file.
+        facets = self._facets(5)
+        f = convert_to_stream('')
+        with self.assertRaises(RuntimeError):
+            with BinaryStlWriter(f, buffer_size=100) as writer:
+                writer.write_facets(facets)
+                raise RuntimeError()
+        self.assertTrue(writer.closed)
+        self.assertEqual(f.getvalue()[:HEADER_SIZE], b'\0' * HEADER_SIZE)
+        self.assertFalse(validate(convert_to_stream(f.getvalue())).size_ok)
+
+        f = _WriteOnly()
+        with self.assertRaises(RuntimeError):
+            with BinaryStlWriter(f, buffer_size=100) as writer:
+                writer.write_facets(facets)
+                raise RuntimeError()
+        self.assertTrue(writer.closed)
+        self.assertEqual(f.data, b'')
+
+    def test_closed(self):
+        writer = BinaryStlWriter(convert_to_stream(''))
+        writer.close()
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.write_facets(self._facets(1))
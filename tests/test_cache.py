@@ -0,0 +1,234 @@
+
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import unittest
+import numpy
+import stl.cache
+from stl.cache import *
+from stl.types import *
+
+
+SOLID = Solid(
+    name='cached',
+    facets=[
+        Facet(
+            normal=(0.0, 0.0, 1.0),
+            vertices=[(float(i), 0.0, 0.0), (i + 1.0, 0.0, 0.0),
+                      (float(i), 1.0, 0.0)],
+        )
+        for i in range(4)
+    ],
+)
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.workdir, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def _write(self, name, solid, format='binary'):
+        path = os.path.join(self.workdir, name)
+        if format == 'binary':
+            with open(path, 'wb') as f:
+                solid.write_binary(f)
+        else:
+            with open(path, 'w') as f:
+                solid.write_ascii(f)
+        return path
+
+    def test_hit(self):
+        cache = DiskCache(self.cache_dir)
+        path = self._write('part.stl', SOLID, 'ascii')
+
+        first = cache.read_ascii_file(path)
+        self.assertEqual(first, SOLID)
+
+        second = cache.read_ascii_file(path)
+        normals, vertices, attributes = second.to_arrays()
+        self.assertTrue(isinstance(vertices, numpy.memmap))
+        self.assertEqual(second.facet_count, 4)
+        self.assertEqual(second, SOLID)
+
+    def test_invalidation(self):
+        cache = DiskCache(self.cache_dir)
+        path = self._write('part.stl', SOLID)
+        cache.read_binary_file(path)
+
+        # Same content with a new modification time is still a hit.
+        later = time.time() + 10
+        os.utime(path, (later, later))
+        hit = cache.read_binary_file(path)
+        self.assertTrue(isinstance(hit.to_arrays()[1], numpy.memmap))
+
+        changed = Solid(name='', facets=SOLID.facets[:2])
+        self._write('part.stl', changed)
+        self.assertEqual(cache.read_binary_file(path).facets,
+                         changed.facets)
+
+    def test_attributes(self):
+        # A file with attribute bytes and a missing normal.
+        path = os.path.join(self.workdir, 'part.stl')
+        records = [
+            ((0.0, 0.0, 0.0), b'ab'),
+            ((0.0, 0.0, 1.0), b''),
+            ((0.0, 0.0, 1.0), b'cde'),
+        ]
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 80 + struct.pack('<I', len(records)))
+            for normal, data in records:
+                f.write(struct.pack(
+                    '<12fH', *(normal + (0.1, 0, 0, 1, 0, 0, 0, 1, 0) +
+                               (len(data),))
+                ) + data)
+
+        cache = DiskCache(self.cache_dir)
+        miss = cache.read_binary_file(path)
+        hit = cache.read_binary_file(path)
+        self.assertTrue(isinstance(hit.to_arrays()[1], numpy.memmap))
+        for a, b in zip(miss.to_arrays(), hit.to_arrays()):
+            self.assertEqual(a.dtype, b.dtype)
+            self.assertEqual(a.tolist(), b.tolist())
+        self.assertEqual(hit.to_arrays()[2].tolist(), [2, 0, 3])
+        self.assertEqual(hit.to_arrays()[1][0, 0, 0], numpy.float32(0.1))
+        self.assertEqual(miss, hit)
+        self.assertEqual(hit.facets[0].normal, (0, 0, 0))
+        self.assertEqual([facet.attributes for facet in hit.facets],
+                         [b'ab', None, b'cde'])
+        self.assertEqual([facet.attributes for facet in miss.facets],
+                         [b'ab', None, b'cde'])
+
+    def test_refresh_failure(self):
+        cache = DiskCache(self.cache_dir)
+        path = self._write('part.stl', SOLID)
+        cache.read_binary_file(path)
+
+        # If the entry can't be refreshed, for example because the cache
+        # is read-only, the file is parsed instead.
+        def fail(entry, meta):
+            raise OSError("read-only")
+
+        cache._write_meta = fail
+        later = time.time() + 10
+        os.utime(path, (later, later))
+        solid = cache.read_binary_file(path)
+        self.assertFalse(isinstance(solid.to_arrays()[1], numpy.memmap))
+        self.assertEqual(solid.facets, SOLID.facets)
+
+    def test_eviction(self):
+        path_a = self._write('a.stl', SOLID)
+        path_b = self._write('b.stl', SOLID)
+        cache = DiskCache(self.cache_dir)
+        cache.read_binary_file(path_a)
+        entry_size = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, dirs, names in os.walk(self.cache_dir)
+            for name in names
+        )
+
+        # Room for one entry, allowing for metadata of a different length.
+        cache.max_bytes = entry_size + 64
+        past = time.time() - 100
+        for entry in cache._entries():
+            os.utime(os.path.join(entry, 'meta.json'), (past, past))
+        cache.read_binary_file(path_b)
+        self.assertEqual(len(list(cache._entries())), 1)
+        hit = cache.read_binary_file(path_b)
+        self.assertTrue(isinstance(hit.to_arrays()[1], numpy.memmap))
+
+        cache.clear()
+        self.assertEqual(list(cache._entries()), [])
+
+
+class TestSolidCache(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir)
+
+    def _write(self, name, solid):
+        path = os.path.join(self.workdir, name)
+        with open(path, 'wb') as f:
+            solid.write_binary(f)
+        return path
+
+    def test_hit(self):
+        cache = SolidCache()
+        path = self._write('part.stl', SOLID)
+        first = cache.read_binary_file(path)
+        self.assertEqual(first, Solid(name='', facets=SOLID.facets))
+        self.assertTrue(cache.read_binary_file(path) is first)
+        self.assertEqual(len(cache), 1)
+        self.assertTrue(cache.size > 0)
+
+        later = time.time() + 10
+        os.utime(path, (later, later))
+        self.assertFalse(cache.read_binary_file(path) is first)
+        self.assertEqual(len(cache), 1)
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def test_eviction(self):
+        path_a = self._write('a.stl', SOLID)
+        path_b = self._write('b.stl', SOLID)
+        cache = SolidCache()
+        a = cache.read_binary_file(path_a)
+        cache.max_bytes = cache.size
+        b = cache.read_binary_file(path_b)
+        self.assertEqual(len(cache), 1)
+        self.assertTrue(cache.read_binary_file(path_b) is b)
+        self.assertFalse(cache.read_binary_file(path_a) is a)
+
+        cache.max_bytes = 1
+        cache.read_binary_file(path_b)
+        self.assertEqual(len(cache), 0)
+
+    def test_single_flight(self):
+        path = self._write('part.stl', SOLID)
+        parse, mode = stl.cache._PARSERS['binary']
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_parse(f):
+            calls.append(f)
+            started.set()
+            release.wait()
+            return parse(f)
+
+        stl.cache._PARSERS['binary'] = (slow_parse, mode)
+        try:
+            cache = SolidCache()
+            results = []
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(
+                        cache.read_binary_file(path)
+                    ),
+                )
+                for i in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            started.wait()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            stl.cache._PARSERS['binary'] = (parse, mode)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 4)
+        for solid in results:
+            self.assertTrue(solid is results[0])
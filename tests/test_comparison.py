@@ -0,0 +1,48 @@
+
+import unittest
+import numpy
+import stl
+from stl.types import *
+from shapes import unit_cube
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_compare(self):
+        cube = Solid("cube", unit_cube())
+        same = stl.compare(cube, cube, samples=1000, seed=1)
+        self.assertTrue(same.max_deviation < 1e-12)
+
+        # A square above the bottom of the cube and a triangle nearer it.
+        plates = Solid("plates", [
+            Facet(None, [(0.25, 0.25, 0.25), (0.75, 0.25, 0.25),
+                         (0.75, 0.75, 0.25), (0.25, 0.75, 0.25)]),
+            Facet(None, [(0.3, 0.3, 0.1), (0.6, 0.3, 0.1),
+                         (0.3, 0.6, 0.1)]),
+        ])
+        result = stl.compare(plates, cube, samples=2000, seed=1)
+        self.assertEqual(result.points.shape, (2000, 3))
+        self.assertEqual(set(result.facets.tolist()), set([0, 1]))
+        expected = numpy.where(result.facets == 0, 0.25, 0.1)
+        self.assertTrue(numpy.allclose(result.deviations, expected))
+        self.assertAlmostEqual(result.max_deviation, 0.25)
+        self.assertAlmostEqual(result.mean_deviation, expected.mean())
+        self.assertAlmostEqual(result.rms_deviation,
+                               numpy.sqrt((expected ** 2).mean()))
+        self.assertTrue(numpy.allclose(result.facet_max_deviation,
+                                       [0.25, 0.1]))
+        self.assertTrue(numpy.allclose(result.facet_mean_deviation,
+                                       [0.25, 0.1]))
+        self.assertEqual(
+            set(result.closest_facets[result.facets == 1].tolist()),
+            set([0, 1]),
+        )
+
+        # Facets without samples have no deviation.
+        result = stl.compare(cube, plates, samples=1, seed=1)
+        self.assertEqual(numpy.isnan(result.facet_max_deviation).sum(), 11)
+
+        with self.assertRaises(ValueError):
+            stl.compare(cube, cube, samples=0)
+        with self.assertRaises(ValueError):
+            stl.compare(cube, Solid())
@@ -0,0 +1,105 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+from stl import convert, read_ascii_file, read_binary_file
+from stl.conversion import main
+from stl.types import *
+from sys import version_info
+if version_info.major < 3:
+    from StringIO import StringIO
+    BytesIO = StringIO
+else:
+    from io import BytesIO, StringIO
+
+
+SOLID = Solid(
+    name='converted',
+    facets=[
+        Facet(
+            normal=(0.0, 0.0, 1.0),
+            vertices=[(float(i), 0.0, 0.0), (i + 1.0, 0.0, 0.0),
+                      (float(i), 1.0, 0.0)],
+        )
+        for i in range(10)
+    ],
+)
+
+
+class TestConvert(unittest.TestCase):
+
+    def _ascii(self):
+        f = StringIO()
+        SOLID.write_ascii(f)
+        return f.getvalue()
+
+    def _binary(self):
+        f = BytesIO()
+        SOLID.write_binary(f)
+        return f.getvalue()
+
+    def test_to_binary(self):
+        for threaded in (False, True):
+            dst = BytesIO()
+            result = convert(StringIO(self._ascii()), dst, to='binary',
+                             threaded=threaded, batch_size=3)
+            self.assertEqual(dst.getvalue(), self._binary())
+            self.assertEqual(result['facets'], 10)
+            self.assertEqual(result['bytes_read'], len(self._ascii()))
+            self.assertEqual(result['bytes_written'], len(self._binary()))
+
+    def test_to_ascii(self):
+        for threaded in (False, True):
+            dst = StringIO()
+            result = convert(BytesIO(self._binary()), dst, to='ascii',
+                             threaded=threaded, batch_size=3)
+            solid = read_ascii_file(StringIO(dst.getvalue()))
+            self.assertEqual(solid.facets, SOLID.facets)
+            self.assertEqual(solid.name, 'unnamed')
+            self.assertEqual(result['facets'], 10)
+            self.assertEqual(result['bytes_written'], len(dst.getvalue()))
+
+    def test_errors_propagate(self):
+        truncated = self._ascii()[:-30]
+        for threaded in (False, True):
+            with self.assertRaises(ValueError):
+                convert(StringIO(truncated), BytesIO(), to='binary',
+                        threaded=threaded)
+        with self.assertRaises(ValueError):
+            convert(StringIO(), BytesIO(), to='obj')
+
+    def test_corrupt_source(self):
+        workdir = tempfile.mkdtemp()
+        try:
+            src = os.path.join(workdir, 'src.stl')
+            dst = os.path.join(workdir, 'dst.stl')
+            with open(src, 'w') as f:
+                f.write(self._ascii()[:-30])
+            with self.assertRaises(ValueError):
+                convert(src, dst, to='binary', batch_size=3)
+            self.assertEqual(os.listdir(workdir), ['src.stl'])
+
+            # An existing file is left alone.
+            with open(dst, 'wb') as f:
+                f.write(b'old')
+            with self.assertRaises(ValueError):
+                convert(src, dst, to='binary', batch_size=3)
+            with open(dst, 'rb') as f:
+                self.assertEqual(f.read(), b'old')
+        finally:
+            shutil.rmtree(workdir)
+
+    def test_main(self):
+        workdir = tempfile.mkdtemp()
+        try:
+            src = os.path.join(workdir, 'src.stl')
+            dst = os.path.join(workdir, 'dst.stl')
+            with open(src, 'w') as f:
+                f.write(self._ascii())
+            self.assertEqual(main([src, dst, '--to', 'binary', '--quiet']),
+                             0)
+            with open(dst, 'rb') as f:
+                self.assertEqual(read_binary_file(f).facets, SOLID.facets)
+        finally:
+            shutil.rmtree(workdir)
@@ -0,0 +1,82 @@
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import stl
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(*args):
+    """
+    Run the interpreter with ``args`` in a fresh process, returning its
+    standard output and error.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT
+    process = subprocess.Popen(
+        (sys.executable,) + args, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    out, err = process.communicate()
+    if process.returncode:
+        raise AssertionError(err.decode())
+    return out.decode(), err.decode()
+
+
+def _import_times(code):
+    """
+    Return the cumulative import time, in microseconds, of each module
+    imported by ``code``, as reported by ``python -X importtime``.
+    """
+    _, err = _run('-X', 'importtime', '-c', code)
+    times = {}
+    for line in err.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            times[fields[2].strip()] = int(fields[1])
+        except (IndexError, ValueError):
+            continue
+    return times
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "Needs module __getattr__")
+class TestImports(unittest.TestCase):
+
+    def test_import_time(self):
+        times = _import_times('import stl')
+        self.assertIn('stl', times)
+        self.assertEqual(
+            [name for name in times if name.split('.')[0] == 'numpy'], [],
+        )
+        self.assertLess(times['stl'], _import_times('import numpy')['numpy'])
+
+    def test_read_info_header(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'empty.stl')
+            with open(path, 'wb') as f:
+                f.write(b'\0' * 84)
+            out, _ = _run('-c', (
+                'import sys, stl\n'
+                'info = stl.read_info(%r)\n'
+                'print(info.format, "numpy" in sys.modules)\n'
+            ) % path)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(out.split(), ['binary', 'False'])
+
+    def test_lazy_names(self):
+        for name in ('ascii', 'binary', 'convert', 'compare', 'read_info'):
+            self.assertIn(name, dir(stl))
+            self.assertTrue(getattr(stl, name) is not None)
+        self.assertEqual(stl.binary.RECORD_DTYPE.itemsize,
+                         stl.binary.RECORD_SIZE)
+        with self.assertRaises(AttributeError):
+            stl.no_such_name
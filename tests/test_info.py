@@ -0,0 +1,79 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+import stl
+from stl.info import *
+from stl.types import *
+
+
+SOLID = Solid(
+    name='part',
+    facets=[
+        Facet((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)]),
+        Facet((0, 0, 1), [(-2, 0, 0.5), (1, 0, 3), (0, 4, 0)]),
+    ],
+)
+
+
+class TestReadInfo(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_binary(self):
+        f = stl.convert_to_stream('')
+        SOLID.write_binary(f)
+        path = self._write('part.stl', f.getvalue())
+
+        info = stl.read_info(path)
+        self.assertEqual(info.format, 'binary')
+        self.assertEqual(info.facet_count, 2)
+        self.assertEqual(info.bounds, None)
+        self.assertEqual(
+            stl.read_info(path, bbox=True).bounds,
+            ((-2, 0, 0), (1, 4, 3)),
+        )
+
+        # A header starting with "solid" is still recognized by its size.
+        data = b'solid named' + f.getvalue()[11:]
+        info = stl.read_info(self._write('named.stl', data))
+        self.assertEqual(info.format, 'binary')
+        self.assertEqual(info.name, 'named')
+
+    def test_ascii(self):
+        f = stl.convert_to_stream('')
+        SOLID.write_ascii(_TextWriter(f))
+        path = self._write('part.stl', f.getvalue())
+
+        info = stl.read_info(path, bbox=True)
+        self.assertEqual(info.format, 'ascii')
+        self.assertEqual(info.name, 'part')
+        self.assertEqual(info.facet_count, 2)
+        self.assertEqual(info.bounds, ((-2, 0, 0), (1, 4, 3)))
+
+        empty = stl.read_info(self._write('empty.stl', b'solid empty\n'
+                                          b'endsolid empty\n'), bbox=True)
+        self.assertEqual(
+            (empty.name, empty.facet_count, empty.bounds),
+            ('empty', 0, None),
+        )
+
+
+class _TextWriter(object):
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, data):
+        self.file.write(data.encode())
@@ -0,0 +1,79 @@
+
+import unittest
+import stl
+from stl import convert_to_stream
+from stl.types import *
+from sys import version_info
+if version_info.major < 3:
+    from StringIO import StringIO
+else:
+    from io import StringIO
+
+
+def _make_solid(count):
+    return Solid(
+        name='Instrumented',
+        facets=[
+            Facet(
+                (0, 0, 1),
+                [(i, 0, 0), (i + 1, 0, 0), (i, 1, 0)],
+            )
+            for i in range(count)
+        ],
+    )
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_binary_roundtrip(self):
+        solid = _make_solid(5)
+        f = convert_to_stream('')
+        progress = []
+        write_stats = stl.Instrumentation(
+            on_progress=lambda i: progress.append(i.facets),
+            progress_interval=2,
+        )
+        solid.write_binary(f, instrument=write_stats)
+
+        self.assertEqual(write_stats.facets, 5)
+        self.assertEqual(write_stats.bytes_written, 84 + 50 * 5)
+        self.assertEqual(progress, [2, 4])
+        self.assertEqual(
+            sorted(write_stats.stages),
+            ['encode', 'header', 'write'],
+        )
+
+        with stl.Instrumentation() as read_stats:
+            result = stl.read_binary_string(
+                f.getvalue(), instrument=read_stats,
+            )
+        self.assertEqual(len(result.facets), 5)
+        self.assertEqual(read_stats.facets, 5)
+        self.assertEqual(read_stats.bytes_read, 84 + 50 * 5)
+        self.assertEqual(
+            sorted(read_stats.stages),
+            ['build', 'decode', 'header', 'read', 'total'],
+        )
+        for seconds in read_stats.stages.values():
+            self.assertTrue(seconds >= 0)
+        self.assertEqual(read_stats.report()['facets'], 5)
+
+    def test_ascii_roundtrip(self):
+        solid = _make_solid(3)
+        f = StringIO('')
+        write_stats = stl.Instrumentation()
+        solid.write_ascii(f, instrument=write_stats)
+        self.assertEqual(write_stats.facets, 3)
+        self.assertEqual(write_stats.bytes_written, len(f.getvalue()))
+
+        read_stats = stl.Instrumentation()
+        result = stl.read_ascii_file(
+            StringIO(f.getvalue()), instrument=read_stats,
+        )
+        self.assertEqual(result, solid)
+        self.assertEqual(read_stats.facets, 3)
+        self.assertEqual(read_stats.bytes_read, len(f.getvalue()))
+        self.assertEqual(
+            sorted(read_stats.stages),
+            ['build', 'decode', 'header', 'read'],
+        )
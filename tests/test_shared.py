@@ -0,0 +1,67 @@
+
+import gc
+import multiprocessing
+import unittest
+import numpy
+import stl.shared
+from stl.types import *
+
+
+SOLID = Solid(
+    name='shared',
+    facets=[
+        Facet(
+            normal=(0.0, 0.0, 1.0),
+            vertices=[(float(i), 0.0, 0.0), (i + 1.0, 0.0, 0.0),
+                      (float(i), 1.0, 0.0)],
+        )
+        for i in range(4)
+    ],
+)
+
+
+def _surface_area(name):
+    return Solid.from_shared_memory(name).surface_area
+
+
+@unittest.skipIf(stl.shared.shared_memory is None,
+                 "multiprocessing.shared_memory is not available")
+class TestSharedMemory(unittest.TestCase):
+
+    def test_round_trip(self):
+        with SOLID.to_shared_memory() as shared:
+            self.assertEqual(shared.facet_count, 4)
+            solid = Solid.from_shared_memory(shared.name)
+            normals, vertices, attributes = solid.to_arrays()
+            self.assertFalse(vertices.flags.writeable)
+            self.assertRaises(ValueError, vertices.fill, 0.0)
+            self.assertEqual(solid, SOLID)
+
+            unnamed = Solid(facets=SOLID.facets).to_shared_memory()
+            self.assertEqual(
+                Solid.from_shared_memory(unnamed.name).name, None,
+            )
+            unnamed.close()
+
+    def test_close(self):
+        shared = SOLID.to_shared_memory()
+        solid = Solid.from_shared_memory(shared.name)
+        vertices = solid.to_arrays()[1]
+        del solid
+        gc.collect()
+
+        shared.close()
+        shared.close()
+        self.assertRaises(OSError, Solid.from_shared_memory, shared.name)
+        # Existing views stay usable after the segment is removed.
+        self.assertEqual(vertices[1, 1, 0], 2.0)
+
+    def test_worker_processes(self):
+        pool = multiprocessing.Pool(2)
+        try:
+            with SOLID.to_shared_memory() as shared:
+                areas = pool.map(_surface_area, [shared.name] * 4)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(areas, [SOLID.surface_area] * 4)
@@ -0,0 +1,85 @@
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import stl
+from stl.tiles import *
+from stl.types import *
+
+
+def _grid(size):
+    """
+    A flat square of 2 * size * size facets.
+    """
+    facets = []
+    for i in range(size):
+        for j in range(size):
+            a, b = (i, j, 0.0), (i + 1, j, 0.0)
+            c, d = (i + 1, j + 1, 0.0), (i, j + 1, 0.0)
+            facets.append(Facet((0, 0, 1), [a, b, c]))
+            facets.append(Facet((0, 0, 1), [a, c, d]))
+    return Solid("grid", facets)
+
+
+class TestWriteTiles(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_files(self):
+        solid = _grid(8)
+        index = write_tiles(solid, self.directory, max_facets=40)
+        with open(os.path.join(self.directory, INDEX_NAME)) as f:
+            self.assertEqual(json.load(f), index)
+
+        self.assertEqual(index['name'], 'grid')
+        self.assertEqual(index['bounds'], [[0, 0, 0], [8, 8, 0]])
+        level, = index['levels']
+        self.assertEqual(level['facets'], 128)
+        self.assertEqual(len(level['tiles']), 4)
+
+        facets = []
+        for tile in level['tiles']:
+            self.assertEqual(tile['depth'], 1)
+            self.assertEqual(tile['cell'][2], 0)
+            with open(os.path.join(self.directory, tile['file']), 'rb') as f:
+                part = stl.read_binary_file(f)
+            self.assertEqual(len(part.facets), tile['facets'])
+            low, high = tile['bounds']
+            for facet in part.facets:
+                for vertex in facet.vertices:
+                    for axis in range(3):
+                        self.assertTrue(
+                            low[axis] <= vertex[axis] <= high[axis]
+                        )
+            facets.extend(part.facets)
+        self.assertEqual(sorted(facets), sorted(solid.facets))
+
+    def test_packed_levels(self):
+        index = write_tiles(_grid(8), self.directory, max_facets=40,
+                            levels=(1.0, 0.5), packed=True)
+        self.assertEqual(
+            sorted(os.listdir(self.directory)),
+            sorted([INDEX_NAME, CONTAINER_NAME]),
+        )
+        with open(os.path.join(self.directory, CONTAINER_NAME), 'rb') as f:
+            data = f.read()
+
+        full, coarse = index['levels']
+        self.assertEqual(coarse['ratio'], 0.5)
+        self.assertTrue(coarse['facets'] < full['facets'])
+        end = 0
+        for level in index['levels']:
+            for tile in level['tiles']:
+                self.assertEqual(tile['offset'], end)
+                end += tile['length']
+                part = stl.read_binary_string(
+                    data[tile['offset']:end]
+                )
+                self.assertEqual(len(part.facets), tile['facets'])
+        self.assertEqual(end, len(data))
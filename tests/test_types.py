@@ -1,6 +1,9 @@
 import unittest
 import itertools
+import math
+import numpy
 from stl.types import *
+from shapes import icosphere, unit_cube
 
 
 class TestTypes(unittest.TestCase):
@@ -156,3 +159,400 @@ class TestTypes(unittest.TestCase):
         solid = Solid("test", list(facet.split_to_triangles()))
         self.assertEqual(solid.remove_planar_edges(), 1)
         self.assertEqual(solid, 0)
+
+    def test_split_concave_to_triangles(self):
+        # An L-shaped hexagon whose only reflex vertex is (1, 1).
+        facet = Facet(None, [[0, 0, 0], [2, 0, 0], [2, 1, 0],
+                             [1, 1, 0], [1, 2, 0], [0, 2, 0]])
+        triangles = facet.split_to_triangles()
+        self.assertEqual(len(triangles), 4)
+        for triangle in triangles:
+            triangle.recalculate_normal()
+            self.assertEqual(triangle.normal, Vector3d(0, 0, 1))
+        self.assertAlmostEqual(facet.area, 3.0)
+
+    def test_triangle_indices(self):
+        facet = Facet(None, [[0, 0, 0], [0, 1, 0], [1, 1, 0], [1, 0, 0]])
+        self.assertEqual(facet.triangle_indices(), [(0, 1, 2), (0, 2, 3)])
+
+        # A many-pointed star in the y-z plane, wound clockwise when
+        # viewed from +x.
+        points = 200
+        vertices = []
+        for i in range(points):
+            radius = 1.0 if i % 2 == 0 else 0.5
+            angle = -2 * math.pi * i / points
+            vertices.append((5, radius * math.cos(angle),
+                             radius * math.sin(angle)))
+        facet = Facet(None, vertices)
+        indices = facet.triangle_indices()
+        self.assertEqual(len(indices), points - 2)
+        expected_area = points / 2 * math.sin(2 * math.pi / points) * 0.5
+        self.assertAlmostEqual(facet.area, expected_area)
+        for triangle in facet.split_to_triangles():
+            triangle.recalculate_normal()
+            if triangle.normal is not None:
+                self.assertAlmostEqual(triangle.normal.x, -1.0)
+
+    def test_facet_slots(self):
+        facet = Facet((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)],
+                      attributes=b'\x01\x02')
+        self.assertFalse(hasattr(facet, '__dict__'))
+        self.assertFalse(hasattr(facet.normal, '__dict__'))
+        self.assertEqual(type(facet.vertices), tuple)
+        self.assertEqual(facet.attributes, b'\x01\x02')
+
+        vertices = tuple(Vector3d(*v) for v in facet.vertices)
+        fast = Facet.from_vectors(Vector3d(0, 0, 1), vertices)
+        self.assertEqual(fast, facet)
+        self.assertIs(fast.vertices, vertices)
+        self.assertIsNone(fast.attributes)
+
+    def test_solid_arrays(self):
+        solid = Solid("test", [
+            Facet((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)]),
+            Facet(None, [(0, 0, 0), (0, 0, 0), (0, 0, 0)]),
+        ])
+        normals, vertices, attributes = solid.to_arrays()
+        self.assertEqual(normals.shape, (2, 3))
+        self.assertEqual(vertices.shape, (2, 3, 3))
+        self.assertEqual(list(normals[1]), [0, 0, 0])
+        self.assertEqual(list(attributes), [0, 0])
+
+        copy = Solid.from_arrays("test", normals, vertices)
+        self.assertEqual(copy.facet_count, 2)
+        self.assertIs(copy.to_arrays()[1], vertices)
+        self.assertEqual(copy.facets[0], solid.facets[0])
+        self.assertEqual(copy.facet_count, 2)
+
+        with self.assertRaises(ValueError):
+            Solid("test", [
+                Facet((0, 0, 1), [(0, 0, 0), (1, 0, 0), (1, 1, 0),
+                                  (0, 1, 0)]),
+            ]).to_arrays()
+
+    def test_transform(self):
+        def triangle():
+            return Solid("test", [
+                Facet((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)]),
+            ])
+
+        solid = triangle()
+        solid.translate((1, 2, 3))
+        self.assertEqual(solid.facets[0].vertices,
+                         ((1, 2, 3), (2, 2, 3), (1, 3, 3)))
+        self.assertEqual(solid.facets[0].normal, (0, 0, 1))
+
+        # Normals stay perpendicular under non-uniform scaling.
+        solid = Solid("test", [
+            Facet(None, [(0, 0, 0), (1, 0, 0), (0, 1, 1)]),
+        ])
+        solid.scale((1, 1, 2))
+        facet = solid.facets[0]
+        expected = Facet(None, facet.vertices).normal
+        for actual, wanted in zip(facet.normal, expected):
+            self.assertAlmostEqual(actual, wanted)
+
+        # A reflection reverses the winding to match the normal.
+        solid = triangle()
+        solid.scale((1, 1, -1))
+        facet = solid.facets[0]
+        self.assertEqual(facet.normal, (0, 0, -1))
+        self.assertEqual(facet.vertices, ((0, 1, 0), (1, 0, 0), (0, 0, 0)))
+        self.assertEqual(Facet(None, facet.vertices).normal, (0, 0, -1))
+
+        rotation = [[0, -1, 0, 0], [1, 0, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]
+        square = Solid("test", [
+            Facet((0, 0, 1), [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]),
+        ])
+        square.transform(rotation)
+        self.assertEqual(square.facets[0].vertices,
+                         ((0, 0, 0), (0, 1, 0), (-1, 1, 0), (-1, 0, 0)))
+
+        # Missing normals are calculated from the transformed vertices,
+        # whether the facets are triangles or polygons.
+        for vertices in [
+            [(0, 0, 0), (1, 0, 0), (0, 1, 0)],
+            [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)],
+        ]:
+            solid = Solid("test", [Facet.from_vectors(None, vertices)])
+            solid.transform(rotation)
+            solid.scale((1, 1, -1))
+            self.assertEqual(solid.facets[0].normal, (0, 0, -1))
+
+        # A projection has no inverse for the normals, so they're calculated
+        # from the projected vertices; facets seen edge on get none.
+        projection = [[1, 0, 0, 0], [0, 0, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]
+        for vertices in [
+            [(0, 0, 0), (1, 0, 0), (0, 1, 1)],
+            [(0, 0, 0), (1, 0, 0), (1, 1, 1), (0, 1, 1)],
+        ]:
+            solid = Solid("test", [
+                Facet(None, vertices), Facet((0, 0, 1), vertices[:3]),
+            ] + triangle().facets)
+            solid.transform(projection)
+            self.assertEqual(solid.facets[0].normal, (0, -1, 0))
+            self.assertEqual(solid.facets[0].vertices[2][1], 0)
+            self.assertEqual(solid.facets[1].normal, (0, -1, 0))
+            if len(vertices) == 3:
+                self.assertEqual(solid.facets[2].normal, (0, 0, 0))
+            else:
+                self.assertIsNone(solid.facets[2].normal)
+
+        with self.assertRaises(ValueError):
+            triangle().transform([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+
+    def test_merge(self):
+        a = Solid("a", [
+            Facet((0, 0, 1), [(0, 0, 0), (1, 0, 0), (0, 1, 0)]),
+        ])
+        b = Solid.from_arrays("b", *a.to_arrays())
+        b.translate((5, 0, 0))
+        merged = merge([a, b], name="plate")
+        self.assertEqual(merged.name, "plate")
+        self.assertEqual(merged.facet_count, 2)
+        self.assertEqual(merged.facets[0], a.facets[0])
+        self.assertEqual(merged.facets[1].vertices[1], (6, 0, 0))
+        self.assertEqual(merge([]).facets, [])
+
+    def test_slice(self):
+        solid = Solid("cubes", unit_cube(0) + unit_cube(2))
+        layers = solid.slice([0.5, 2, -1])
+        self.assertEqual(len(layers), 3)
+        self.assertEqual(layers[1:], [[], []])
+        self.assertEqual(len(layers[0]), 2)
+        for contour in layers[0]:
+            points = contour.tolist()
+            self.assertEqual(points[0], points[-1])
+            self.assertEqual(set(p[2] for p in points), set([0.5]))
+            # Anticlockwise viewed from above.
+            area = sum(a[0] * b[1] - b[0] * a[1]
+                       for a, b in zip(points, points[1:]))
+            self.assertAlmostEqual(area, 2.0)
+
+        # A vertex on the plane counts as above it.
+        self.assertEqual(len(solid.slice([1])[0]), 2)
+        self.assertEqual(solid.slice([0])[0], [])
+
+        # Open surfaces give open polylines.
+        triangle = Solid("open", [
+            Facet(None, [(0, 0, 0), (1, 0, 0), (0, 0, 1)]),
+        ])
+        contour, = triangle.slice([0.5])[0]
+        self.assertEqual(contour.tolist(), [[0, 0, 0.5], [0.5, 0, 0.5]])
+
+    def test_decimate(self):
+        # A flat grid of 2 * 8 * 8 triangles, with a raised middle vertex.
+        def z(i, j):
+            return 1.0 if (i, j) == (4, 4) else 0.0
+
+        facets = []
+        for i in range(8):
+            for j in range(8):
+                a = (i, j, z(i, j))
+                b = (i + 1, j, z(i + 1, j))
+                c = (i + 1, j + 1, z(i + 1, j + 1))
+                d = (i, j + 1, z(i, j + 1))
+                facets.append(Facet(None, [a, b, c]))
+                facets.append(Facet(None, [a, c, d]))
+        solid = Solid("grid", facets)
+
+        removed = solid.decimate(ratio=0.5)
+        self.assertEqual(removed + solid.facet_count, 128)
+        self.assertTrue(solid.facet_count < 128)
+        vertices = solid.to_arrays()[1].reshape(-1, 3).tolist()
+        # The boundary and the peak are kept.
+        self.assertIn([4.0, 4.0, 1.0], vertices)
+        for corner in ([0, 0, 0], [8, 0, 0], [8, 8, 0], [0, 8, 0]):
+            self.assertIn(corner, vertices)
+        for facet in solid.facets:
+            self.assertTrue(facet.normal[2] > 0)
+
+        with self.assertRaises(ValueError):
+            solid.decimate()
+
+        # Closed surfaces stay closed and reach the target.
+        for bump in (0.1, 0.2):
+            solid = Solid("sphere", icosphere(3, bump))
+            self.assertEqual(solid.facet_count, 1280)
+            solid.decimate(ratio=0.1)
+            self.assertTrue(120 <= solid.facet_count <= 128)
+            edges = {}
+            for facet in solid.facets:
+                corners = [tuple(vertex) for vertex in facet.vertices]
+                for k in range(3):
+                    edge = frozenset((corners[k], corners[k - 1]))
+                    edges[edge] = edges.get(edge, 0) + 1
+            self.assertEqual(set(edges.values()), set([2]))
+            vertices = set().union(*edges)
+            self.assertEqual(
+                len(vertices) - len(edges) + solid.facet_count, 2,
+            )
+
+    def test_split_components(self):
+        # Two cubes sharing a face are one component.
+        facets = unit_cube(0) + unit_cube(3) + unit_cube(1) + [
+            Facet(None, [(5, 0, 0), (6, 0, 0), (6, 1, 0), (5, 1, 0)]),
+        ]
+        solid = Solid("plate", facets)
+        indices = solid.split_components(return_indices=True)
+        self.assertEqual([list(group) for group in indices], [
+            list(range(12)) + list(range(24, 36)),
+            list(range(12, 24)),
+            [36],
+        ])
+        parts = solid.split_components()
+        self.assertEqual([part.name for part in parts], ["plate"] * 3)
+        self.assertEqual(parts[1].facets, facets[12:24])
+        self.assertEqual(parts[2].facets, facets[36:])
+
+        arrays = Solid.from_arrays("plate", *Solid(
+            facets=facets[:36]).to_arrays())
+        parts = arrays.split_components()
+        self.assertEqual([part.facet_count for part in parts], [24, 12])
+        self.assertIsNone(parts[0]._facets)
+        self.assertEqual(parts[1].facets, facets[12:24])
+        self.assertEqual(Solid().split_components(), [])
+
+        # Attribute bytes go with their facets.
+        normals, vertices, attributes = arrays.to_arrays()
+        attributes = numpy.zeros(36, dtype=numpy.uint16)
+        attributes[[5, 13, 30]] = [1, 2, 3]
+        arrays = Solid.from_arrays(
+            "plate", normals, vertices, attributes,
+            numpy.frombuffer(b'abbccc', dtype=numpy.uint8),
+        )
+        parts = arrays.split_components()
+        self.assertEqual(
+            [[(i, facet.attributes) for i, facet in enumerate(part.facets)
+              if facet.attributes] for part in parts],
+            [[(5, b'a'), (18, b'ccc')], [(1, b'bb')]],
+        )
+
+        # Sharing just an edge or just a vertex joins components too.
+        def shifted(dy, dz):
+            return [
+                Facet(None, [(x, y + dy, z + dz) for x, y, z in f.vertices])
+                for f in unit_cube(1)
+            ]
+
+        for other in (shifted(1, 0), shifted(1, 1)):
+            indices = Solid(facets=unit_cube(0) + other).split_components(
+                return_indices=True,
+            )
+            self.assertEqual([list(group) for group in indices],
+                             [list(range(24))])
+        indices = Solid(facets=unit_cube(0) + shifted(1.5, 0)) \
+            .split_components(return_indices=True)
+        self.assertEqual(len(indices), 2)
+
+    def test_orient_consistently(self):
+        def reverse(facet):
+            return Facet(None, facet.vertices[::-1])
+
+        cube = unit_cube(0)
+        # An inside out cube with two facets the right way round, and a
+        # cube with two facets reversed.
+        facets = [reverse(facet) for facet in cube[:10]] + cube[10:] + [
+            reverse(facet) if i in (3, 7) else facet
+            for i, facet in enumerate(unit_cube(2))
+        ]
+        arrays = Solid.from_arrays("cubes", *Solid(
+            facets=facets).to_arrays())
+        solid = Solid("cubes", facets)
+        self.assertEqual(solid.orient_consistently(), 12)
+        self.assertEqual(solid.facets, cube + unit_cube(2))
+        self.assertEqual(solid.orient_consistently(), 0)
+
+        arrays._arrays[1].flags.writeable = False
+        self.assertEqual(arrays.orient_consistently(), 12)
+        self.assertEqual(arrays.facets, cube + unit_cube(2))
+
+        # A flat square made of a polygon and two triangles.
+        square = Solid("square", [
+            Facet(None, [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]),
+            Facet(None, [(1, 0, 0), (2, 0, 0), (2, 1, 0)]),
+            Facet(None, [(1, 0, 0), (1, 1, 0), (2, 1, 0)]),
+        ])
+        self.assertEqual(square.orient_consistently(), 1)
+        for facet in square.facets:
+            self.assertEqual(facet.normal, (0, 0, 1))
+
+    def test_find_self_intersections(self):
+        # Cubes which share edges and vertices with their own facets, one
+        # of which pokes through another.
+        cube = unit_cube(0)
+        poke = Facet(None, [(0.5, 0.5, 0.5), (0.5, 0.6, 1.5),
+                            (0.6, 0.5, 1.5)])
+        solid = Solid("cubes", cube + unit_cube(3) + [poke])
+        # It crosses the diagonal of the top of the first cube, which is
+        # made of facets 2 and 3.
+        self.assertEqual(solid.find_self_intersections().tolist(),
+                         [[2, 24], [3, 24]])
+        self.assertEqual(len(Solid("cube", cube).find_self_intersections()),
+                         0)
+
+        # Two crossing triangles sharing a vertex, and a polygon.
+        solid = Solid("fold", [
+            Facet(None, [(0, 0, 0), (2, -1, 0), (2, 1, 0)]),
+            Facet(None, [(0, 0, 0), (1, 0, -1), (1, 0, 1)]),
+            Facet(None, [(5, 0, 0), (6, 0, 0), (6, 1, 0), (5, 1, 0)]),
+            Facet(None, [(5.5, 0.5, -1), (5.5, 0.5, 1), (5.6, 0.6, 0)]),
+        ])
+        self.assertEqual(solid.find_self_intersections().tolist(),
+                         [[0, 1], [2, 3]])
+        self.assertEqual(Solid().find_self_intersections().shape, (0, 2))
+
+    def test_sample_points(self):
+        # A unit square and a triangle of a quarter of its area above it.
+        solid = Solid("samples", [
+            Facet(None, [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]),
+            Facet(None, [(0, 0, 1), (0, 0.5, 1), (1, 0, 1)]),
+        ])
+        points, normals, indices = solid.sample_points(
+            5000, seed=1, return_normals=True, return_indices=True,
+        )
+        self.assertEqual(points.shape, (5000, 3))
+        self.assertEqual(set(indices.tolist()), set([0, 1]))
+        self.assertTrue(0.75 < (indices == 0).mean() < 0.85)
+        self.assertTrue(numpy.allclose(points[:, 2], indices))
+        self.assertTrue(numpy.all((points >= 0) & (points <= 1)))
+        square = points[indices == 0]
+        self.assertTrue(0.45 < square[:, 0].mean() < 0.55)
+        triangle = points[indices == 1]
+        self.assertTrue(numpy.all(2 * triangle[:, 1] + triangle[:, 0] <=
+                                  1 + 1e-12))
+        self.assertEqual(normals[indices == 0].tolist()[0], [0, 0, 1])
+        self.assertEqual(normals[indices == 1].tolist()[0], [0, 0, -1])
+
+        self.assertTrue(numpy.array_equal(
+            solid.sample_points(10, seed=7), solid.sample_points(10, seed=7),
+        ))
+        with self.assertRaises(ValueError):
+            Solid().sample_points(1)
+
+    def test_voxelize(self):
+        solid = Solid("voxels", unit_cube(0) + unit_cube(3))
+        grid = solid.voxelize(0.25)
+        self.assertEqual(grid.shape, (16, 4, 4))
+        self.assertEqual(grid.origin.tolist(), [0, 0, 0])
+        self.assertEqual(grid.count, 128)
+        self.assertEqual(grid.volume, 2)
+        self.assertEqual(grid.runs.tolist()[:2], [[0, 0, 0, 4], [0, 1, 0, 4]])
+        expected = numpy.zeros((16, 4, 4), dtype=bool)
+        expected[:4] = expected[12:] = True
+        self.assertTrue(numpy.array_equal(grid.occupancy, expected))
+
+        sparse = solid.voxelize(0.25, sparse=True)
+        self.assertIsNone(sparse.occupancy)
+        self.assertTrue(numpy.array_equal(sparse.runs, grid.runs))
+        self.assertTrue(numpy.array_equal(sparse.to_dense(), expected))
+
+        # Without its top, only the surface of the cube is kept.
+        cube = unit_cube(0)
+        grid = Solid("open", cube[:2] + cube[4:]).voxelize(0.25)
+        self.assertEqual(grid.count, 64 - 12)
+        self.assertFalse(grid.occupancy[1:3, 1:3, 1:].any())
+
+        with self.assertRaises(ValueError):
+            solid.voxelize(0)